@@ -5,22 +5,37 @@
 """Benchmark: Google ADK + LiteLLM tool calling."""
 
 import os
-import sys
 import time
-import asyncio
+import uuid
+import litellm
 from google.adk.agents import Agent
+from google.adk.agents.invocation_context import LlmCallsLimitExceededError
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import InMemoryRunner
 from google.genai import types
-from utils import MODEL, QUESTIONS, SEP, setup_db, make_query_runner, print_summary, append_log
+from compaction import compacting, enabled, older
+from harness import Adapter, run_script
+from residency import sampling
+from timing import current_log, new_log, stream_metrics
+from transport import async_http_client, http_client
+from utils import MODEL, OLLAMA_HOST, SEP, setup_db, make_query_runner
 
 ADK_MODEL = f"openai/{MODEL}"
-os.environ.setdefault("OPENAI_API_BASE", "http://localhost:11434/v1")
+os.environ.setdefault("OPENAI_API_BASE", f"{OLLAMA_HOST}/v1")
 os.environ.setdefault("OPENAI_API_KEY",  "ollama")
 
+# LiteLLM hands these to the OpenAI client: same connection pool policy as
+# every other benchmark (transport.py)
+litellm.client_session  = http_client()
+litellm.aclient_session = async_http_client()
+
 con    = setup_db()
 _run_q = make_query_runner(con)
 
+# Stream model output (SSE) so partial responses reach the callbacks as they arrive
+RUN_CONFIG = RunConfig(streaming_mode=StreamingMode.SSE)
+
 
 def run_duckdb_query(sql: str) -> str:
     """Execute a SQL query on DuckDB and return results as a table.
@@ -39,85 +54,157 @@ def run_duckdb_query(sql: str) -> str:
     return _run_q(sql)
 
 
-agent = Agent(
-    model=LiteLlm(model=ADK_MODEL),
-    name="data_analyst",
-    description="A data analyst that queries a DuckDB sales database.",
-    instruction=(
-        "/no_think\n"
-        "You are a data analyst. Use run_duckdb_query to answer questions. "
-        "Always query the database - never guess numbers."
-    ),
-    tools=[run_duckdb_query],
-)
+def _compact(llm_request) -> None:
+    """Shorten function responses the model has already answered (``--compact``), in place."""
+    contents = llm_request.contents or []
+    roles    = ["tool" if any(p.function_response for p in c.parts or []) else c.role for c in contents]
+    idx      = older(roles, model="model")
+    if not idx:
+        return
+    with compacting() as run:
+        for i in idx:
+            for part in contents[i].parts:
+                res = part.function_response.response if part.function_response else None
+                if isinstance(res, dict) and isinstance(res.get("result"), str):
+                    part.function_response.response = {**res, "result": run(res["result"])}
+
+
+def _before_model(callback_context, llm_request):
+    """Compact older tool results, then open an LLM span for the round-trip LiteLLM is about to make."""
+    if enabled():
+        _compact(llm_request)
+    log = current_log()
+    if log is not None:
+        log.begin(callback_context.invocation_id, "llm")
+    return None
 
 
-async def run_test(question: str, runner: InMemoryRunner) -> dict:
+def _after_model(callback_context, llm_response):
+    """Stamp streamed partials; close the LLM span on the final response.
+
+    Only token usage is available via OpenAI-compat, no Ollama durations.
+    """
+    log = current_log()
+    if log is not None and getattr(llm_response, "partial", False):
+        if llm_response.content and llm_response.content.parts:
+            log.tick(callback_context.invocation_id)
+    elif log is not None:
+        usage = getattr(llm_response, "usage_metadata", None)
+        attrs = {}
+        if usage is not None:
+            attrs = {
+                "prompt_tokens": getattr(usage, "prompt_token_count", None),
+                "eval_tokens":   getattr(usage, "candidates_token_count", None),
+            }
+        log.end(callback_context.invocation_id, **attrs)
+    return None
+
+
+def build_agent() -> Agent:
+    return Agent(
+        # OpenAI-compatible path: only sampling can be pinned (residency.py)
+        model=LiteLlm(model=ADK_MODEL, **sampling()),
+        name="data_analyst",
+        description="A data analyst that queries a DuckDB sales database.",
+        instruction=(
+            "/no_think\n"
+            "You are a data analyst. Use run_duckdb_query to answer questions. "
+            "Always query the database - never guess numbers."
+        ),
+        tools=[run_duckdb_query],
+        before_model_callback=_before_model,
+        after_model_callback=_after_model,
+    )
+
+
+async def run_test(
+    question: str, runner: InMemoryRunner, session_id: str = "session", max_iterations: int | None = None
+) -> dict:
     print()
     print(SEP)
     print(f"  Q: {question}")
     print(SEP)
     tool_calls_made = 0
     final_answer    = ""
-    ttft            = None
-    t_start         = time.time()
+    log             = new_log()
+    run_config      = RUN_CONFIG.model_copy(update={"max_llm_calls": max_iterations}) if max_iterations else RUN_CONFIG
 
-    async for event in runner.run_async(
-        user_id="user", session_id="session",
+    events = runner.run_async(
+        user_id="user", session_id=session_id,
         new_message=types.Content(role="user", parts=[types.Part(text=question)]),
-    ):
-        # Capture TTFT on first event that carries content
-        if ttft is None and event.content and event.content.parts:
-            ttft = time.time() - t_start
-
-        if event.content and event.content.parts:
-            for part in event.content.parts:
-                if hasattr(part, "function_call") and part.function_call:
-                    tool_calls_made += 1
-                    fc  = part.function_call
-                    sql = fc.args.get("sql", "")
-                    res = _run_q(sql)
-                    print()
-                    print(f"  [tool call #{tool_calls_made}] {fc.name}")
-                    print(f"  SQL: {sql}")
-                    print("  Result:")
-                    print(res)
-                elif hasattr(part, "text") and part.text and event.is_final_response():
-                    final_answer = part.text.strip()
+        run_config=run_config,
+    )
+    try:
+        async for event in events:
+            if event.partial:           # streamed text; the aggregated event follows
+                continue
+            if event.content and event.content.parts:
+                for part in event.content.parts:
+                    if hasattr(part, "function_call") and part.function_call:
+                        tool_calls_made += 1
+                        fc  = part.function_call
+                        sql = fc.args.get("sql", "")
+                        print()
+                        print(f"  [tool call #{tool_calls_made}] {fc.name}")
+                        print(f"  SQL: {sql}")
+                    elif hasattr(part, "function_response") and part.function_response:
+                        # ADK already ran the tool; print its result, don't re-run the query
+                        res = part.function_response.response or {}
+                        print("  Result:")
+                        print(res.get("result", res))
+                    elif hasattr(part, "text") and part.text and event.is_final_response():
+                        final_answer = part.text.strip()
+    except LlmCallsLimitExceededError:
+        print()
+        print("  [!] Max iterations reached.")
+        final_answer = ""
 
     if final_answer:
         print()
         print("  [answer]")
         print(final_answer)
-    return {"success": bool(final_answer), "tool_calls": tool_calls_made, "ttft": ttft}
+    ttft = stream_metrics(log.spans).get("ttft")
+    return {
+        "success": bool(final_answer), "tool_calls": tool_calls_made, "ttft": ttft,
+        "answer": final_answer, "spans": log.spans,
+    }
 
 
-async def main():
-    runner         = InMemoryRunner(agent=agent, app_name="bench")
-    results, times, ttfts = [], [], []
-    for q in QUESTIONS:
-        await runner.session_service.create_session(
-            app_name="bench", user_id="user", session_id="session"
+class ADKAdapter(Adapter):
+    name     = "google_adk"
+    label    = f"Google ADK ({MODEL})"
+    is_async = True
+
+    def build(self) -> None:
+        self.runner = InMemoryRunner(agent=build_agent(), app_name="bench")
+
+    async def open_session(self) -> str:
+        session_id = f"session-{uuid.uuid4().hex[:8]}"
+        await self.runner.session_service.create_session(
+            app_name="bench", user_id="user", session_id=session_id
         )
-        t0      = time.time()
-        r       = await run_test(q, runner)
-        elapsed = time.time() - t0
-        r["time"] = elapsed
-        results.append(r)
-        times.append(elapsed)
-        if r.get("ttft") is not None:
-            ttfts.append(r["ttft"])
-        await runner.session_service.delete_session(
-            app_name="bench", user_id="user", session_id="session"
+        return session_id
+
+    async def close_session(self, session_id: str) -> None:
+        await self.runner.session_service.delete_session(
+            app_name="bench", user_id="user", session_id=session_id
         )
-    print_summary(f"Google ADK ({MODEL})", results, times, ttfts or None)
-    append_log("google_adk", results, times, ttfts or None)
-    con.close()
 
+    async def run(self, question: str, max_iterations: int | None = None, session: str | None = None) -> dict:
+        if session is not None:
+            return await run_test(question, self.runner, session, max_iterations)
+        session = await self.open_session()                 # one session per question
+        try:
+            t0      = time.time()
+            r       = await run_test(question, self.runner, session, max_iterations)
+            r["time"] = time.time() - t0                    # session setup/teardown excluded
+            return r
+        finally:
+            await self.close_session(session)
+
+    def close(self) -> None:
+        con.close()
 
-if __name__ == "__main__":
-    if os.getenv("BENCH_WARMUP"):
-        print("  (packages ready)")
-        sys.exit(0)
 
-    asyncio.run(main())
+if __name__ == "__main__":
+    run_script(ADKAdapter(), __doc__)
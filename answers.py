@@ -0,0 +1,171 @@
+"""Reference answers and answer checking: accuracy and goodput next to latency.
+
+``success`` only says that a framework produced an answer.  Here each
+question's reference result is computed once in DuckDB, against the same
+``sales`` table the agents query (``utils.setup_db``, so ``BENCH_DATASET``
+applies too), and every result is graded:
+
+- ``answer_ok``: every value of the reference result (first ``CHECK_ROWS``
+  rows) appears in the answer text.  Numbers match within ``BENCH_ANSWER_TOL``
+  (relative, default 0.5%), so rounding, thousands separators and ``76.7K``
+  pass.  Labels match case-insensitively;
+- ``sql_ok``: at least one query the agent ran returns all of those values
+  when run again here;
+- ``correct``: ``answer_ok``, since the answer is what a user gets.
+
+Built-in questions take their reference query from ``REFERENCE_SQL``.  A
+workload record brings its own ``sql``, or ``expected`` text whose numbers
+are checked.  A question with neither stays ungraded (``correct`` is
+``None``).  Goodput is correct answers per second.  A cache, a tighter
+``fmt_table`` cap or more concurrency only helps if goodput goes up.
+
+The grader reads the agents' own database through a cursor from
+``utils.setup_db``, so a large ``BENCH_DATASET`` is not generated a second
+time.  It runs the agent's queries again in a transaction it rolls back,
+so grading never changes ``sales``.
+"""
+
+import functools
+import math
+import os
+import re
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+import duckdb
+
+from utils import setup_db
+
+TOLERANCE  = float(os.getenv("BENCH_ANSWER_TOL", "0.005"))
+CHECK_ROWS = 20             # reference rows an answer has to cover
+FETCH_ROWS = 10_000         # rows read back from an agent's query
+
+# The five built-in questions -> the values a correct answer has to state
+REFERENCE_SQL = {
+    "What is the total revenue per category?":
+        "SELECT category, SUM(quantity * price) AS revenue FROM sales GROUP BY category ORDER BY revenue DESC",
+    "Which region had the highest total revenue?":
+        "SELECT region FROM sales GROUP BY region ORDER BY SUM(quantity * price) DESC LIMIT 1",
+    "Show monthly revenue for each month.":
+        "SELECT SUM(quantity * price) AS revenue FROM sales GROUP BY date_trunc('month', date)"
+        " ORDER BY date_trunc('month', date)",
+    "What are the top 3 best-selling products by quantity?":
+        "SELECT product FROM sales GROUP BY product ORDER BY SUM(quantity) DESC LIMIT 3",
+    "Which product has the best revenue-to-quantity ratio?":
+        "SELECT product FROM sales GROUP BY product ORDER BY SUM(quantity * price) / SUM(quantity) DESC LIMIT 1",
+}
+
+_NUMBER = re.compile(r"(?<![\w.])-?\d[\d,]*(?:\.\d+)?(?:\s?([kKmM])(?![A-Za-z]))?")
+_SCALE  = {"k": 1e3, "m": 1e6}
+
+
+@functools.lru_cache(maxsize=1024)
+def _rows(sql: str, limit: int) -> Optional[tuple]:
+    """Rows of ``sql`` on the agents' ``sales``, rolled back; ``None`` if it fails."""
+    cur = setup_db()
+    try:
+        cur.begin()
+        rel  = cur.sql(sql)
+        rows = tuple(rel.fetchmany(limit)) if rel is not None else ()
+    except duckdb.Error:
+        return None
+    finally:
+        cur.rollback()
+        cur.close()
+    return rows
+
+
+def _values(rows: tuple) -> list:
+    """Cells as floats (numbers) or strings (labels, dates); NULLs dropped."""
+    out = []
+    for row in rows:
+        for v in row:
+            if v is None or isinstance(v, bool):
+                continue
+            if isinstance(v, (int, float, Decimal)):
+                out.append(float(v))
+            elif isinstance(v, date):
+                out.append(v.isoformat())
+            else:
+                out.append(str(v).strip())
+    return out
+
+
+def numbers(text: str) -> list[float]:
+    """Numbers in free text: ``76,698.54``, ``-3``, ``76.7K``."""
+    out = []
+    for m in _NUMBER.finditer(text):
+        value = float(m.group(0).rstrip("kKmM ").replace(",", ""))
+        out.append(value * _SCALE[m.group(1).lower()] if m.group(1) else value)
+    return out
+
+
+def _close(a: float, b: float) -> bool:
+    return math.isclose(a, b, rel_tol=TOLERANCE, abs_tol=0.005)
+
+
+def missing(expected: list, text: str) -> list:
+    """Reference values that ``text`` does not state."""
+    found = numbers(text)
+    lower = text.lower()
+    out   = []
+    for v in expected:
+        if isinstance(v, float):
+            ok = any(_close(v, x) for x in found)
+        else:
+            ok = re.search(rf"(?<!\w){re.escape(v.lower())}(?!\w)", lower) is not None
+        if not ok:
+            out.append(v)
+    return out
+
+
+def _covers(result: list, expected: list) -> bool:
+    """Every expected value is a cell of ``result`` (numbers within tolerance)."""
+    nums   = [v for v in result if isinstance(v, float)]
+    labels = {v.lower() for v in result if isinstance(v, str)}
+    return all(
+        any(_close(v, x) for x in nums) if isinstance(v, float) else v.lower() in labels
+        for v in expected
+    )
+
+
+def reference(r: dict) -> Optional[list]:
+    """Values a correct answer to ``r`` states; ``None`` if the question has no reference."""
+    sql = r.get("sql") or REFERENCE_SQL.get(r.get("question", ""))
+    if sql:
+        rows = _rows(sql, CHECK_ROWS)
+        return _values(rows) if rows is not None else None
+    expected = r.get("expected")
+    if expected:
+        return numbers(str(expected)) or [str(expected).strip()]
+    return None
+
+
+def grade(r: dict) -> dict:
+    """Set ``correct``, ``answer_ok``, ``sql_ok`` (and ``missing``) on a result, in place."""
+    expected = reference(r)
+    if expected is None:
+        r["correct"] = None
+        return r
+    gaps           = missing(expected, r.get("answer") or "")
+    r["answer_ok"] = not gaps
+    r["correct"]   = r["answer_ok"]
+    if gaps:
+        r["missing"] = gaps[:5]
+    executed = [s["sql"] for s in r.get("spans") or [] if s["kind"] == "tool" and s.get("sql")]
+    if executed:
+        results     = (_rows(sql, FETCH_ROWS) for sql in executed)
+        r["sql_ok"] = any(rows is not None and _covers(_values(rows), expected) for rows in results)
+    return r
+
+
+def grade_all(results: list[dict]) -> list[dict]:
+    for r in results:
+        grade(r)
+    return results
+
+
+def good_answer(r: dict) -> bool:
+    """Correct when graded, else merely answered."""
+    return r["correct"] if r.get("correct") is not None else bool(r.get("success"))
@@ -0,0 +1,113 @@
+"""Compaction of older tool results before the next model call (``--compact``).
+
+Every agent loop sends the whole conversation again on each turn: the
+system prompt, the question, every assistant message and every full
+``fmt_table`` result.  The prompt grows with each tool call, and so does
+prompt evaluation.  ``timing.turn_prompts`` shows the growth per turn for
+every adapter.  With ``--compact`` each adapter rewrites tool results the
+model has already answered (any before its latest reply) through its own
+hook:
+
+- raw loop:    the message list before each ``chat`` call;
+- Deep Agents: a ``wrap_model_call`` middleware;
+- ADK:         ``before_model_callback`` on the ``LlmRequest``;
+- Pydantic AI: a history processor.
+
+Modes (``BENCH_COMPACT``):
+
+- ``off`` (default): results stay as they are;
+- ``truncate``: keep the first ``BENCH_COMPACT_CHARS`` characters (default
+  200) of the result, cut at a line break;
+- ``digest``: keep the header and the first ``BENCH_COMPACT_ROWS`` rows
+  (default 3) of the table and any ``Summary:`` line, then give a count of
+  the dropped rows.
+
+A result is replaced only if the new text is shorter.  Each compaction
+pass records a ``compact`` span with ``results`` (how many were rewritten)
+and ``chars`` (how many characters were removed).  Rewriting an old message
+also changes the prompt prefix the server could otherwise reuse.  The
+prompt-prefix line shows that cost, and ``results_db.py compaction`` weighs
+prompt-eval time saved against correct answers lost.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from timing import span
+
+MODES = ("off", "truncate", "digest")
+MODE  = os.getenv("BENCH_COMPACT", "off")
+CHARS = int(os.getenv("BENCH_COMPACT_CHARS", "200"))
+ROWS  = int(os.getenv("BENCH_COMPACT_ROWS", "3"))
+
+
+def configure_compaction(mode: str) -> None:
+    """Set the compaction mode every adapter's hook reads."""
+    global MODE
+    if mode not in MODES:
+        raise ValueError(f"unknown compaction mode {mode!r} (one of {', '.join(MODES)})")
+    MODE = mode
+
+
+def enabled() -> bool:
+    return MODE != "off"
+
+
+def _truncate(text: str) -> str:
+    if len(text) <= CHARS:
+        return text
+    head = text[:CHARS]
+    head = head[:head.rfind("\n")] if "\n" in head else head
+    return f"{head}\n[compacted: {len(text) - len(head):,} more chars]"
+
+
+def _digest(text: str) -> str:
+    lines   = text.splitlines()
+    summary = [line for line in lines if line.startswith("Summary:")]
+    body    = [line for line in lines[2:] if not line.startswith(("Summary:", "... truncated:"))]
+    if len(body) <= ROWS:
+        return text
+    kept = lines[:2] + body[:ROWS]
+    return "\n".join([*kept, f"[compacted: {len(body) - ROWS} more rows]", *summary])
+
+
+def compact(text: str) -> str:
+    """``text`` compacted under the current mode (unchanged if that is not shorter)."""
+    if MODE == "truncate":
+        out = _truncate(text)
+    elif MODE == "digest":
+        out = _digest(text)
+    else:
+        return text
+    return out if len(out) < len(text) else text
+
+
+@contextmanager
+def compacting() -> Iterator[Callable[[str], str]]:
+    """Yield ``compact`` that also counts what it removed, into a ``compact`` span."""
+    with span("compact", mode=MODE, results=0, chars=0) as s:
+        def run(text: str) -> str:
+            out = compact(text)
+            if out is not text:
+                s["results"] += 1
+                s["chars"]   += len(text) - len(out)
+            return out
+        yield run
+
+
+def older(roles: list[str], tool: str = "tool", model: str = "assistant") -> list[int]:
+    """Indexes of ``tool`` messages that come before the latest ``model`` message."""
+    last = max((i for i, r in enumerate(roles) if r == model), default=-1)
+    return [i for i, r in enumerate(roles[:last]) if r == tool]
+
+
+def compact_messages(messages: list[dict]) -> list[dict]:
+    """Ollama-style message dicts with older tool results compacted (a new list)."""
+    if not enabled():
+        return messages
+    idx = set(older([m["role"] for m in messages]))
+    if not idx:
+        return messages
+    with compacting() as run:
+        return [{**m, "content": run(m["content"])} if i in idx else m for i, m in enumerate(messages)]
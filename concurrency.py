@@ -0,0 +1,152 @@
+"""Run questions in parallel and report throughput vs concurrency.
+
+Each concurrency level runs ``max(len(questions), 2 * level)`` jobs (the
+question list cycled), so every worker handles at least two questions.
+Threads drive the synchronous benchmarks (raw client, Deep Agents); an
+asyncio semaphore drives ADK and Pydantic AI.  Per-question output from
+``run_test`` is silenced while a level runs so the table stays readable.
+Goodput is correct answers (``answers.py``) per second of wall clock.
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from answers import good_answer, grade_all
+from results_db import RESULTS_DB, store_scaling
+from stats import percentile
+from utils import BACKEND, DATASET, LOG_FILE, MODEL, SEP
+
+# A level "scales" if it beats the previous level's throughput by this much
+SCALING_GAIN = 0.10
+
+
+def _jobs(questions: list[str], level: int) -> list[str]:
+    return list(itertools.islice(itertools.cycle(questions), max(len(questions), 2 * level)))
+
+
+def _timed(run_one: Callable[[str], dict], question: str) -> dict:
+    t0 = time.perf_counter()
+    try:
+        r = run_one(question)
+    except Exception as e:      # one failed question must not sink the level
+        r = {"success": False, "tool_calls": 0, "error": repr(e)}
+    r.setdefault("time", time.perf_counter() - t0)
+    r["question"] = question
+    return r
+
+
+def level_stats(level: int, results: list[dict], wall: float) -> dict:
+    lat  = [r["time"] for r in results]
+    good = sum(1 for r in grade_all(results) if good_answer(r))
+    return {
+        "concurrency": level,
+        "jobs":        len(results),
+        "passed":      sum(1 for r in results if r["success"]),
+        "correct":     good,
+        "wall":        wall,
+        "throughput":  len(results) / wall if wall > 0 else 0.0,
+        "goodput":     good / wall if wall > 0 else 0.0,
+        "p50":         percentile(lat, 50),
+        "p95":         percentile(lat, 95),
+        "p99":         percentile(lat, 99),
+    }
+
+
+def sweep_threads(
+    run_one: Callable[[str], dict], questions: list[str], levels: list[int]
+) -> list[dict]:
+    """Run each level on a thread pool of that size; return per-level stats."""
+    rows = []
+    for level in levels:
+        jobs = _jobs(questions, level)
+        with open(os.devnull, "w") as sink, redirect_stdout(sink):
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level) as pool:
+                results = list(pool.map(lambda q: _timed(run_one, q), jobs))
+            wall = time.perf_counter() - t0
+        rows.append(level_stats(level, results, wall))
+        print(f"  c={level:<3} done  {rows[-1]['throughput']:.2f} q/s")
+    return rows
+
+
+async def sweep_async(
+    run_one: Callable[[str], Awaitable[dict]], questions: list[str], levels: list[int]
+) -> list[dict]:
+    """Run each level as tasks bounded by a semaphore; return per-level stats."""
+    rows = []
+    for level in levels:
+        sem = asyncio.Semaphore(level)
+
+        async def job(q: str) -> dict:
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    r = await run_one(q)
+                except Exception as e:
+                    r = {"success": False, "tool_calls": 0, "error": repr(e)}
+                r.setdefault("time", time.perf_counter() - t0)
+                r["question"] = q
+                return r
+
+        with open(os.devnull, "w") as sink, redirect_stdout(sink):
+            t0      = time.perf_counter()
+            results = await asyncio.gather(*(job(q) for q in _jobs(questions, level)))
+            wall    = time.perf_counter() - t0
+        rows.append(level_stats(level, list(results), wall))
+        print(f"  c={level:<3} done  {rows[-1]['throughput']:.2f} q/s")
+    return rows
+
+
+def saturation_level(rows: list[dict]) -> int:
+    """Highest level reached while each step still added >= SCALING_GAIN throughput."""
+    best = rows[0]["concurrency"]
+    for prev, cur in zip(rows, rows[1:]):
+        if cur["throughput"] < prev["throughput"] * (1 + SCALING_GAIN):
+            break
+        best = cur["concurrency"]
+    return best
+
+
+def print_scaling(name: str, rows: list[dict]) -> None:
+    base = rows[0]["throughput"] or 1.0
+    print()
+    print(SEP)
+    print(f"  SCALING  ({name})")
+    print(SEP)
+    print(f"  {'conc':>4}  {'jobs':>4}  {'passed':>6}  {'correct':>7}  {'q/s':>6}  {'good':>6}  {'speedup':>7}"
+          f"  {'p50':>7}  {'p95':>7}  {'p99':>7}")
+    for r in rows:
+        print(
+            f"  {r['concurrency']:>4}  {r['jobs']:>4}  {r['passed']:>3}/{r['jobs']:<2}  {r['correct']:>4}/{r['jobs']:<2}"
+            f"  {r['throughput']:6.2f}  {r['goodput']:6.2f}  {r['throughput'] / base:6.2f}x"
+            f"  {r['p50']:6.2f}s  {r['p95']:6.2f}s  {r['p99']:6.2f}s"
+        )
+    knee = saturation_level(rows)
+    if knee == rows[-1]["concurrency"]:
+        print(f"  Still scaling at c={knee} (highest level tested)")
+    else:
+        print(f"  Stops scaling after c={knee} (next level adds < {SCALING_GAIN:.0%} throughput)")
+    print()
+
+
+def append_scaling_log(name: str, rows: list[dict]) -> None:
+    """Append one line per level to bench_results.log and store the sweep."""
+    ts        = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    back_part = f" | backend {BACKEND}" if BACKEND != "ollama" else ""
+    back_part += f" | dataset {DATASET}" if DATASET else ""
+    with open(LOG_FILE, "a") as f:
+        for r in rows:
+            f.write(
+                f"{ts} | {name:<26} | c={r['concurrency']:<3} | {r['passed']}/{r['jobs']} passed {r['correct']} correct"
+                f" | {r['throughput']:5.2f} q/s goodput {r['goodput']:5.2f} | p50 {r['p50']:5.2f}s p95 {r['p95']:5.2f}s"
+                f" p99 {r['p99']:5.2f}s{back_part}\n"
+            )
+        f.write(f"{ts} | {name:<26} | saturates at c={saturation_level(rows)}{back_part}\n")
+    run_id = store_scaling(name, rows, model=MODEL, backend=BACKEND)
+    print(f"  appended to {LOG_FILE.name}; sweep {run_id} stored in {RESULTS_DB.name}")
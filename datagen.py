@@ -0,0 +1,170 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["duckdb"]
+# ///
+"""Synthetic ``sales`` data at any scale, generated in bulk inside DuckDB.
+
+Same schema as ``utils.setup_db`` (date, product, category, quantity, price,
+region), from a thousand to a hundred million rows, built by one
+``CREATE TABLE ... AS SELECT`` over ``range(n)``.  Every column is a hash of
+the row number and the seed, so a (rows, seed) pair always yields the same
+table no matter how many threads DuckDB uses.
+
+    uv run datagen.py --rows 10M --out data/sales_10m.parquet
+    uv run datagen.py --rows 1M --seed 7 --out data/sales_1m.duckdb
+    BENCH_DATASET=data/sales_10m.parquet uv run tool_calling_test.py
+    BENCH_DATASET=100K uv run adk_test.py          # generate in memory each run
+
+Distributions: products are weighted (phones and keyboards sell most often,
+desks least); each product has its own list price with occasional
+discounts; quantities are skewed towards small orders; regions are uneven;
+dates span 2024 with a Q4 peak.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import duckdb
+
+# product -> (category, list price, relative weight)
+PRODUCTS = {
+    "Laptop":     ("Electronics", 999.99, 8),
+    "Phone":      ("Electronics", 699.99, 14),
+    "Monitor":    ("Electronics", 399.99, 9),
+    "Keyboard":   ("Electronics", 79.99, 14),
+    "Mouse":      ("Electronics", 29.99, 12),
+    "Headphones": ("Electronics", 149.99, 10),
+    "Desk":       ("Furniture", 299.99, 5),
+    "Chair":      ("Furniture", 149.99, 9),
+    "Bookshelf":  ("Furniture", 119.99, 4),
+    "Lamp":       ("Furniture", 39.99, 7),
+}
+REGIONS = {"North": 30, "South": 27, "East": 23, "West": 20}
+# relative sales per calendar month, Q4 peak
+MONTHS  = [7, 6, 8, 8, 8, 8, 7, 8, 8, 9, 11, 14]
+
+SEED      = 42
+START     = "2024-01-01"
+MAX_ROWS  = 100_000_000
+_SUFFIXES = {"": 1, "K": 1_000, "M": 1_000_000}
+
+
+def parse_rows(value: str) -> int:
+    """``"5000"``, ``"100K"``, ``"10M"`` -> row count."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kKmM]?)\s*", str(value))
+    if not m:
+        raise ValueError(f"not a row count: {value!r} (e.g. 5000, 100K, 10M)")
+    rows = int(float(m.group(1)) * _SUFFIXES[m.group(2).upper()])
+    if not 1 <= rows <= MAX_ROWS:
+        raise ValueError(f"row count must be between 1 and {MAX_ROWS:,}")
+    return rows
+
+
+def _slots(weights: list[int]) -> str:
+    """SQL list literal repeating each index by its weight (weighted pick)."""
+    return "[" + ", ".join(str(i) for i, w in enumerate(weights) for _ in range(w)) + "]"
+
+
+def _list(values: list[str], quote: bool = True) -> str:
+    """SQL list literal of strings (or raw numbers)."""
+    return "[" + ", ".join(f"'{v}'" if quote else v for v in values) + "]"
+
+
+def generate_sales(con: duckdb.DuckDBPyConnection, rows: int, seed: int = SEED) -> None:
+    """(Re)create ``sales`` with ``rows`` synthetic rows."""
+    names   = list(PRODUCTS)
+    regions = list(REGIONS)
+    # u(k): uniform [0, 1) from the row number, the seed and a per-column salt
+    u = "((hash(i, {seed}, {k}) % 1000000)::DOUBLE / 1000000)"
+    con.execute(f"""
+        CREATE OR REPLACE TABLE sales AS
+        WITH picks AS (
+            SELECT
+                i,
+                {_slots([w for _, _, w in PRODUCTS.values()])}[1 + (hash(i, {seed}, 1) % {sum(w for *_, w in PRODUCTS.values())})::INT] AS p,
+                {_slots(list(REGIONS.values()))}[1 + (hash(i, {seed}, 2) % {sum(REGIONS.values())})::INT] AS r,
+                {_slots(MONTHS)}[1 + (hash(i, {seed}, 3) % {sum(MONTHS)})::INT] AS m,
+                {u.format(seed=seed, k=4)} AS u_day,
+                {u.format(seed=seed, k=5)} AS u_qty,
+                {u.format(seed=seed, k=6)} AS u_disc
+            FROM range({rows}) t(i)
+        )
+        SELECT
+            (DATE '{START}' + to_months(m) + to_days(floor(u_day * 28)::INT))::DATE AS date,
+            {_list(names)}[p + 1]                                                     AS product,
+            {_list([c for c, _, _ in PRODUCTS.values()])}[p + 1]                      AS category,
+            least(50, 1 + floor(-ln(1 - u_qty) * 6))::INTEGER                         AS quantity,
+            round({_list([str(pr) for _, pr, _ in PRODUCTS.values()], quote=False)}[p + 1]
+                  * CASE WHEN u_disc < 0.15 THEN 0.9 ELSE 1.0 END, 2)::DECIMAL(10, 2) AS price,
+            {_list(regions)}[r + 1]                                                   AS region
+        FROM picks
+    """)
+
+
+def load_dataset(spec: str, seed: int = SEED) -> duckdb.DuckDBPyConnection:
+    """Connection with ``sales`` from a row count, a Parquet file or a DuckDB file.
+
+    A row count is generated in memory; ``.parquet`` is exposed as a view
+    (nothing loaded up front); a DuckDB file is opened read-only.
+    """
+    path = Path(spec)
+    if path.suffix == ".parquet":
+        if not path.exists():
+            sys.exit(f"dataset not found: {path} (create it with datagen.py --out)")
+        con = duckdb.connect()
+        con.execute(f"CREATE VIEW sales AS SELECT * FROM read_parquet('{path.as_posix()}')")
+        return con
+    if path.suffix in (".duckdb", ".db"):
+        if not path.exists():
+            sys.exit(f"dataset not found: {path} (create it with datagen.py --out)")
+        return duckdb.connect(str(path), read_only=True)
+    con = duckdb.connect()
+    generate_sales(con, parse_rows(spec), seed=seed)
+    return con
+
+
+def save(con: duckdb.DuckDBPyConnection, out: Path) -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix == ".parquet":
+        con.execute(f"COPY sales TO '{out.as_posix()}' (FORMAT parquet, COMPRESSION zstd)")
+    elif out.suffix in (".duckdb", ".db"):
+        out.unlink(missing_ok=True)
+        con.execute(f"ATTACH '{out.as_posix()}' AS out")
+        con.execute("CREATE TABLE out.sales AS SELECT * FROM sales")
+        con.execute("DETACH out")
+    else:
+        sys.exit(f"unsupported output {out.suffix!r}: use .parquet or .duckdb")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="100K", help="row count, e.g. 1K, 250K, 10M, 100M (default 100K)")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"generator seed (default {SEED})")
+    parser.add_argument("--out", type=Path, help="write to a .parquet or .duckdb file")
+    args = parser.parse_args()
+    try:
+        rows = parse_rows(args.rows)
+    except ValueError as e:
+        parser.error(str(e))
+
+    con = duckdb.connect()
+    t0  = time.perf_counter()
+    generate_sales(con, rows, seed=args.seed)
+    n   = con.execute("SELECT count(*) FROM sales").fetchone()[0]
+    print(f"  generated {n:,} rows in {time.perf_counter() - t0:.2f}s (seed {args.seed})")
+    if args.out:
+        t0 = time.perf_counter()
+        save(con, args.out)
+        size = args.out.stat().st_size / 2**20
+        print(f"  wrote {args.out} ({size:,.1f} MB) in {time.perf_counter() - t0:.2f}s")
+    con.sql("""
+        SELECT category, count(*) AS rows, sum(quantity) AS units, round(sum(quantity * price), 2) AS revenue
+        FROM sales GROUP BY ALL ORDER BY revenue DESC
+    """).show()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,21 @@
 # ///
 """Benchmark: Deep Agents (LangGraph) tool calling."""
 
-import os
-import sys
-import time
+from contextvars import ContextVar
 from typing import Any
 from langchain_ollama import ChatOllama
+from langchain.agents.middleware import ModelRequest, wrap_model_call
 from langchain.tools import tool
 from langchain_core.callbacks.base import BaseCallbackHandler
 from deepagents import create_deep_agent
 from langchain_core.messages import AIMessage, ToolMessage
-from utils import MODEL, QUESTIONS, SEP, setup_db, make_query_runner, print_summary, append_log
+from langgraph.errors import GraphRecursionError
+from compaction import compacting, enabled, older
+from harness import Adapter, run_script
+from residency import KEEP_ALIVE, NUM_CTX, SEED, TEMPERATURE
+from timing import current_log, new_log, ollama_stats, stream_metrics
+from transport import client_kwargs
+from utils import MODEL, OLLAMA_HOST, SEP, setup_db, make_query_runner
 
 con    = setup_db()
 _run_q = make_query_runner(con)
@@ -35,48 +40,125 @@ def run_duckdb_query(sql: str) -> str:
 
 
 class TTFTCallback(BaseCallbackHandler):
-    """Records time-to-first-token for the first LLM call per question."""
+    """Opens/closes an LLM span per call (keyed by ``run_id``) and stamps tokens.
 
-    def reset(self) -> None:
-        self._t_start: float | None = None
-        self.ttft:     float | None = None
-        self._done:    bool         = False
-
-    def __init__(self) -> None:
-        super().__init__()
-        self.reset()
+    Spans land on the current question's span log with Ollama's own timing
+    fields; TTFT and inter-token latency come from the token stamps
+    (``timing.stream_metrics``).  All state lives on that log, so one
+    handler serves concurrent questions.
+    """
 
     def on_llm_start(self, serialized: dict, prompts: list, **kwargs: Any) -> None:
-        if self._t_start is None:
-            self._t_start = time.time()
+        log = current_log()
+        if log is not None:
+            log.begin(kwargs.get("run_id"), "llm")
 
     def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
-        if self.ttft is None and self._t_start is not None:
-            self.ttft  = time.time() - self._t_start
-            self._done = True   # only capture first call
+        log   = current_log()
+        chunk = kwargs.get("chunk")
+        msg   = getattr(chunk, "message", None)
+        if log is not None and (token or getattr(msg, "tool_call_chunks", None)):
+            log.tick(kwargs.get("run_id"))
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        log = current_log()
+        if log is None:
+            return
+        stats = {}
+        for gens in getattr(response, "generations", []):
+            for gen in gens:
+                msg   = getattr(gen, "message", None)
+                stats = ollama_stats(getattr(msg, "response_metadata", None) or gen.generation_info or {})
+        log.end(kwargs.get("run_id"), **stats)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        log = current_log()
+        if log is not None:
+            log.end(kwargs.get("run_id"), error=str(error))
 
 
 ttft_cb = TTFTCallback()
-llm     = ChatOllama(model=MODEL, temperature=0, streaming=True, callbacks=[ttft_cb])
-agent   = create_deep_agent(
-    model=llm,
-    tools=[run_duckdb_query],
-    system_prompt=(
-        "You are a data analyst. Use run_duckdb_query to answer questions. "
-        "Always query the database - never guess numbers."
-    ),
-)
-
-
-def run_test(question: str) -> dict:
+
+# Model turns allowed for the current question (``None``: no cap of our own)
+_max_calls: ContextVar[int | None] = ContextVar("max_model_calls", default=None)
+# Backstop only: the cap below counts model calls, whatever nodes Deep Agents adds per step
+RECURSION_LIMIT = 10_000
+
+
+class MaxIterations(Exception):
+    """A question used up its ``max_iterations`` model turns."""
+
+
+@wrap_model_call
+def cap_model_calls(request: ModelRequest, handler):
+    """Stop before the model call past ``max_iterations`` (counted from the question's LLM spans)."""
+    cap = _max_calls.get()
+    log = current_log()
+    if cap is not None and log is not None and sum(1 for s in log.spans if s["kind"] == "llm") >= cap:
+        raise MaxIterations(cap)
+    return handler(request)
+
+
+@wrap_model_call
+def compact_tool_results(request: ModelRequest, handler):
+    """Shorten tool results the model has already answered (``--compact``) before the call."""
+    if not enabled():
+        return handler(request)
+    messages = request.messages
+    roles    = ["tool" if isinstance(m, ToolMessage) else "assistant" if isinstance(m, AIMessage) else "" for m in messages]
+    idx      = set(older(roles))
+    if not idx:
+        return handler(request)
+    with compacting() as run:
+        messages = [
+            m.model_copy(update={"content": run(m.content)}) if i in idx and isinstance(m.content, str) else m
+            for i, m in enumerate(messages)
+        ]
+    return handler(request.override(messages=messages))
+
+
+def build_agent():
+    """Compile the Deep Agents graph (ChatOllama + planning/filesystem tools)."""
+    llm = ChatOllama(
+        model=MODEL, base_url=OLLAMA_HOST, streaming=True, callbacks=[ttft_cb],
+        # pinned model options (residency.py): same as every other benchmark
+        temperature=TEMPERATURE, seed=SEED, num_ctx=NUM_CTX, keep_alive=KEEP_ALIVE,
+        sync_client_kwargs=client_kwargs(), async_client_kwargs=client_kwargs(is_async=True),
+    )
+    return create_deep_agent(
+        model=llm,
+        tools=[run_duckdb_query],
+        middleware=[cap_model_calls, compact_tool_results],
+        system_prompt=(
+            "You are a data analyst. Use run_duckdb_query to answer questions. "
+            "Always query the database - never guess numbers."
+        ),
+    )
+
+
+def run_test(question: str, agent, max_iterations: int | None = None, history: list | None = None) -> dict:
+    """Answer one question; ``history`` (a session's messages) goes in first and is updated in place."""
     print()
     print(SEP)
     print(f"  Q: {question}")
     print(SEP)
-    ttft_cb.reset()
-    result          = agent.invoke({"messages": [{"role": "user", "content": question}]})
-    messages        = result.get("messages", [])
+    log    = new_log()
+    prior  = list(history or [])
+    config = {"recursion_limit": RECURSION_LIMIT} if max_iterations else {}
+    token  = _max_calls.set(max_iterations)
+    try:
+        result = agent.invoke({"messages": [*prior, {"role": "user", "content": question}]}, config=config)
+    except (MaxIterations, GraphRecursionError):
+        print()
+        print("  [!] Max iterations reached.")
+        made = sum(1 for s in log.spans if s["kind"] == "tool")      # calls that did run
+        return {"success": False, "tool_calls": made, "ttft": stream_metrics(log.spans).get("ttft"), "spans": log.spans}
+    finally:
+        _max_calls.reset(token)
+    messages        = result.get("messages", [])[len(prior):]
     tool_calls_made = 0
+    if history is not None:
+        history[:] = result.get("messages", [])
     for msg in messages:
         if isinstance(msg, AIMessage) and msg.tool_calls:
             for tc in msg.tool_calls:
@@ -92,25 +174,29 @@ def run_test(question: str) -> dict:
     print()
     print("  [answer]")
     print(answer)
-    return {"success": bool(final), "tool_calls": tool_calls_made, "ttft": ttft_cb.ttft}
+    ttft = stream_metrics(log.spans).get("ttft")
+    return {
+        "success": bool(final), "tool_calls": tool_calls_made, "ttft": ttft,
+        "answer": answer if final else "", "spans": log.spans,
+    }
+
+
+class DeepAgentsAdapter(Adapter):
+    name  = "deep_agents"
+    label = f"Deep Agents ({MODEL})"
+
+    def build(self) -> None:
+        self.agent = build_agent()
+
+    def open_session(self) -> list:
+        return []
+
+    def run(self, question: str, max_iterations: int | None = None, session: list | None = None) -> dict:
+        return run_test(question, self.agent, max_iterations, session)
+
+    def close(self) -> None:
+        con.close()
 
 
 if __name__ == "__main__":
-    if os.getenv("BENCH_WARMUP"):
-        print("  (packages ready)")
-        sys.exit(0)
-
-    results, times, ttfts = [], [], []
-    for q in QUESTIONS:
-        t0      = time.time()
-        r       = run_test(q)
-        elapsed = time.time() - t0
-        r["time"] = elapsed
-        results.append(r)
-        times.append(elapsed)
-        if r.get("ttft") is not None:
-            ttfts.append(r["ttft"])
-
-    print_summary(f"Deep Agents ({MODEL})", results, times, ttfts or None)
-    append_log("deep_agents", results, times, ttfts or None)
-    con.close()
+    run_script(DeepAgentsAdapter(), __doc__)
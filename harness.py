@@ -0,0 +1,386 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "ollama",
+#     "duckdb",
+#     "deepagents",
+#     "langchain-ollama",
+#     "google-adk[extensions]",
+#     "pydantic-ai",
+# ]
+# ///
+"""Single-process harness: every framework behind one adapter interface.
+
+Each benchmark script exposes an ``Adapter`` (build the agent, run one
+question, close).  Run standalone, a script hands its adapter to
+``run_script``; this harness instead loads several adapters into one
+interpreter and interleaves them per question, rotating the starting
+framework each time (A B C D, B C D A, ...), so thermal or GPU-clock drift
+is spread over all frameworks instead of biasing whichever runs last.
+
+    uv run harness.py                                  # all four, round-robin
+    uv run harness.py --frameworks raw,pydantic_ai --iterations 10
+    uv run harness.py --schedule sequential            # one framework at a time
+
+Events: while ``run`` executes, adapters record LLM/tool spans on the current
+``timing.SpanLog`` and return them in the result dict (``spans``).
+
+Lifecycle (``--lifecycle``): what each question starts from, applied the
+same way to every adapter by ``Lifecycle``:
+
+- ``fresh``:   a new agent (``build``) and a new session for every question;
+- ``shared``:  one agent, a new session per question (default);
+- ``session``: one agent and one session for the whole run, so each question
+  sees the conversation so far.
+
+Building the agent and opening the session is timed as ``setup``, closing
+the session as ``teardown``.  Both are kept apart from ``time``, which covers
+the question alone.  Their sum is what pooling agents and sessions saves per
+question.
+"""
+
+import abc
+import asyncio
+import importlib
+import inspect
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Union
+
+from answers import grade_all
+from compaction import configure_compaction
+from concurrency import append_scaling_log, print_scaling, sweep_async, sweep_threads
+from loadgen import append_load_log, open_loop_async, open_loop_threads, print_load
+from memory import MemoryProbe
+from profiler import ProfileProbe
+from proxy import mark
+from residency import ResidencyProbe, warm_up
+from utils import (
+    OLLAMA_HOST, append_log, configure_query_cache, make_parser, print_summary,
+    run_rounds, run_rounds_async, tag_result, workload_from_args,
+)
+from workload import Checkpoint, Workload, as_workload, limits
+
+# --frameworks key -> (module, adapter class); imported only when selected
+ADAPTERS = {
+    "raw":         ("tool_calling_test",       "RawOllamaAdapter"),
+    "raw_async":   ("tool_calling_async_test", "AsyncRawOllamaAdapter"),
+    "deep_agents": ("deepagents_test",         "DeepAgentsAdapter"),
+    "adk":         ("adk_test",                "ADKAdapter"),
+    "pydantic_ai": ("pydanticai_test",         "PydanticAIAdapter"),
+}
+
+
+class Adapter(abc.ABC):
+    """Interface every framework benchmark implements.
+
+    ``name`` is the log/store key, ``label`` the summary heading.  ``build``
+    constructs the agent (outside any timed region); ``run`` answers one
+    question and returns the result dict (``success``, ``tool_calls``,
+    ``ttft``, ``spans``, optionally ``time``); it is a coroutine function
+    when ``is_async`` is set.  ``max_iterations`` caps model turns for one
+    question (a workload record's limit); ``None`` keeps the default.
+
+    ``open_session`` returns what one conversation carries between
+    questions (message history, an ADK session id) and ``close_session``
+    releases it; both are coroutine functions on async adapters that need
+    the loop.  ``run`` continues the ``session`` it is given; without one it
+    answers the question on its own, as in a concurrency sweep.  ``run`` is
+    abstract, so a subclass without it fails when it is created.
+    """
+
+    name:     str  = ""
+    label:    str  = ""
+    is_async: bool = False
+
+    def build(self) -> None:
+        pass
+
+    def open_session(self):
+        return None
+
+    def close_session(self, session) -> None:
+        pass
+
+    @abc.abstractmethod
+    def run(self, question: str, max_iterations: int | None = None, session=None) -> Union[dict, Awaitable[dict]]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+def load_adapter(key: str) -> Adapter:
+    module, cls = ADAPTERS[key]
+    return getattr(importlib.import_module(module), cls)()
+
+
+def _marked(adapter: Adapter):
+    """``adapter.run`` that first tells a tracing proxy which question is next."""
+    if not os.getenv("BENCH_WIRE_TRACE"):
+        return adapter.run
+    if adapter.is_async:
+        async def run(question: str, **kwargs) -> dict:
+            mark(OLLAMA_HOST, framework=adapter.name, question=question)
+            return await adapter.run(question, **kwargs)
+    else:
+        def run(question: str, **kwargs) -> dict:
+            mark(OLLAMA_HOST, framework=adapter.name, question=question)
+            return adapter.run(question, **kwargs)
+    return run
+
+
+async def _settle(value):
+    return await value if inspect.isawaitable(value) else value
+
+
+class Lifecycle:
+    """``run_one`` for ``run_rounds``/``interleave`` that gives every question its agent and session."""
+
+    def __init__(self, adapter: Adapter, mode: str = "shared", run=None) -> None:
+        self.adapter = adapter
+        self.mode    = mode
+        self.run_fn  = run or adapter.run
+        self.session = None
+        self._open   = False
+
+    def _record(self, r: dict, t0: float, t1: float, t2: float, t3: float) -> dict:
+        r.setdefault("time", t2 - t1)
+        r["lifecycle"] = self.mode
+        r["setup"]     = t1 - t0
+        r["teardown"]  = t3 - t2
+        return r
+
+    def run(self, question: str, **kwargs) -> Union[dict, Awaitable[dict]]:
+        if self.adapter.is_async:
+            return self._arun(question, **kwargs)
+        t0 = time.perf_counter()
+        if self.mode == "fresh":
+            self.adapter.build()
+        if not self._open:
+            self.session = self.adapter.open_session()
+        t1 = time.perf_counter()
+        try:
+            r = self.run_fn(question, session=self.session, **kwargs)
+        finally:
+            t2 = time.perf_counter()
+            if self.mode == "session":
+                self._open = True
+            else:
+                self.adapter.close_session(self.session)
+        return self._record(r, t0, t1, t2, time.perf_counter())
+
+    async def _arun(self, question: str, **kwargs) -> dict:
+        t0 = time.perf_counter()
+        if self.mode == "fresh":
+            self.adapter.build()
+        if not self._open:
+            self.session = await _settle(self.adapter.open_session())
+        t1 = time.perf_counter()
+        try:
+            r = await self.run_fn(question, session=self.session, **kwargs)
+        finally:
+            t2 = time.perf_counter()
+            if self.mode == "session":
+                self._open = True
+            else:
+                await _settle(self.adapter.close_session(self.session))
+        return self._record(r, t0, t1, t2, time.perf_counter())
+
+    def close(self):
+        """End the long-lived session of ``session`` mode (a coroutine for async adapters)."""
+        if not self._open:
+            return None
+        self._open = False
+        return self.adapter.close_session(self.session)
+
+
+def _probe(args) -> ResidencyProbe | ProfileProbe:
+    probe = ResidencyProbe(MemoryProbe(trace=args.memory), args.model_state)
+    return ProfileProbe(probe, args.profile_interval) if args.profile else probe
+
+
+def _report(adapter: Adapter, results: list, allocators: list | None = None, probe=None) -> None:
+    grade_all(results)
+    times = [r["time"] for r in results]
+    ttfts = [r["ttft"] for r in results if r.get("ttft") is not None]
+    print_summary(adapter.label, results, times, ttfts or None, allocators)
+    if isinstance(probe, ProfileProbe):
+        probe.report(adapter.label, adapter.name, results)
+    append_log(adapter.name, results, times, ttfts or None, allocators)
+
+
+def run_script(adapter: Adapter, description: str | None = None) -> None:
+    """Shared ``__main__`` for a standalone benchmark script."""
+    if os.getenv("BENCH_WARMUP"):
+        print("  (packages ready)")
+        sys.exit(0)
+
+    parser     = make_parser(description)
+    args       = parser.parse_args()
+    if args.model_state == "cold" and (args.rate or args.concurrency):
+        parser.error("--model-state cold unloads between sequential questions; it does not apply to --rate/--concurrency")
+    if args.lifecycle != "shared" and (args.rate or args.concurrency):
+        parser.error("--lifecycle applies to sequential questions; --rate/--concurrency always share one agent")
+    probe      = _probe(args)
+    questions  = workload_from_args(args)
+    checkpoint = Checkpoint(args.checkpoint) if args.checkpoint else None
+    configure_query_cache(args.query_cache)
+    configure_compaction(args.compact)
+    adapter.build()
+    run   = _marked(adapter)
+    try:
+        if args.rate or args.concurrency:
+            warm_up()
+        if args.rate:
+            load = (questions.texts(), args.rate, args.duration, args.arrivals, args.max_inflight, args.slo)
+            if adapter.is_async:
+                rows = asyncio.run(open_loop_async(run, *load))
+            else:
+                rows = open_loop_threads(run, *load)
+            print_load(adapter.label, rows, args.arrivals, args.max_inflight, args.slo)
+            append_load_log(adapter.name, rows, args.arrivals)
+        elif args.concurrency:
+            if adapter.is_async:
+                rows = asyncio.run(sweep_async(run, list(questions.texts()), args.concurrency))
+            else:
+                rows = sweep_threads(run, list(questions.texts()), args.concurrency)
+            print_scaling(adapter.label, rows)
+            append_scaling_log(adapter.name, rows)
+        else:
+            probe.start()
+            life   = Lifecycle(adapter, args.lifecycle, run)
+            rounds = (questions, args.warmup, args.iterations, probe, checkpoint)
+            with asyncio.Runner() as loop:
+                if adapter.is_async:
+                    results = loop.run(run_rounds_async(life.run, *rounds))
+                else:
+                    results = run_rounds(life.run, *rounds)
+                loop.run(_settle(life.close()))
+            _report(adapter, results, probe.stop(), probe)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        adapter.close()
+
+
+def _checkpoints(path: Path | None, adapters: list[Adapter]) -> dict[str, Checkpoint]:
+    """One checkpoint per framework next to ``path``: ``ckpt.jsonl`` -> ``ckpt-raw_ollama.jsonl``."""
+    if path is None:
+        return {}
+    return {a.name: Checkpoint(path.with_name(f"{path.stem}-{a.name}{path.suffix or '.jsonl'}")) for a in adapters}
+
+
+def interleave(
+    adapters: list[Adapter],
+    questions: list[str] | Workload,
+    warmup: int = 0,
+    iterations: int = 1,
+    probe: MemoryProbe | ResidencyProbe | ProfileProbe | None = None,
+    checkpoints: dict[str, Checkpoint] | None = None,
+    lifecycle: str = "shared",
+) -> dict[str, list]:
+    """Run every question on every adapter, rotating who goes first.
+
+    Async adapters share one event loop for the whole run.  Returns measured
+    results per adapter name, tagged like ``run_rounds`` output; questions an
+    adapter's checkpoint already holds are skipped for that adapter.  Each
+    adapter gets its own ``Lifecycle`` (and long-lived session).
+    """
+    probe       = probe or MemoryProbe()
+    checkpoints = checkpoints or {}
+    runs        = {a.name: Lifecycle(a, lifecycle, _marked(a)) for a in adapters}
+    results     = {a.name: list(checkpoints[a.name].results) if a.name in checkpoints else [] for a in adapters}
+    step        = 0
+    with asyncio.Runner() as loop:
+        for rnd in range(-warmup, iterations):
+            label = f"warmup {rnd + warmup + 1}/{warmup}" if rnd < 0 else f"iteration {rnd + 1}/{iterations}"
+            print(f"\n  --- {label} ---")
+            for rec in as_workload(questions):
+                k     = step % len(adapters)
+                order = adapters[k:] + adapters[:k]
+                step += 1
+                for a in order:
+                    ckpt = checkpoints.get(a.name)
+                    if rnd >= 0 and ckpt and ckpt.has(rec["id"], rnd):
+                        continue
+                    print(f"\n  >>> {a.label}")
+                    probe.before()
+                    t0 = time.time()
+                    r  = runs[a.name].run(rec["question"], **limits(rec))
+                    r  = loop.run(r) if a.is_async else r
+                    elapsed = time.time() - t0
+                    probe.after(r, measured=rnd >= 0)
+                    if rnd >= 0:
+                        results[a.name].append(tag_result(r, rec, rnd, elapsed))
+                        if ckpt:
+                            ckpt.add(r)
+        for life in runs.values():
+            loop.run(_settle(life.close()))
+    return results
+
+
+def main() -> None:
+    parser = make_parser(__doc__.splitlines()[0])
+    parser.add_argument(
+        "--frameworks", default=",".join(ADAPTERS),
+        help=f"comma-separated subset of: {', '.join(ADAPTERS)}",
+    )
+    parser.add_argument(
+        "--schedule", choices=["round-robin", "sequential"], default="round-robin",
+        help="interleave frameworks per question (default) or run them one after another",
+    )
+    args = parser.parse_args()
+    keys = [k.strip() for k in args.frameworks.split(",") if k.strip()]
+    unknown = [k for k in keys if k not in ADAPTERS]
+    if unknown:
+        parser.error(f"unknown framework(s): {', '.join(unknown)}")
+    if args.concurrency or args.rate:
+        parser.error("--concurrency and --rate are per framework; run the framework scripts directly")
+
+    os.environ.setdefault("BENCH_SESSION", time.strftime("%Y%m%d-%H%M%S"))
+    adapters    = [load_adapter(k) for k in keys]
+    probe       = _probe(args)
+    questions   = workload_from_args(args)
+    checkpoints = _checkpoints(args.checkpoint, adapters)
+    configure_query_cache(args.query_cache)
+    configure_compaction(args.compact)
+    for a in adapters:
+        a.build()
+    try:
+        if args.schedule == "round-robin":
+            # one process-wide heap: allocators cannot be split per framework
+            probe.start()
+            by_name = interleave(
+                adapters, questions, args.warmup, args.iterations, probe, checkpoints, args.lifecycle,
+            )
+            shared  = probe.stop()
+            for a in adapters:
+                _report(a, by_name[a.name], probe=probe)
+            if shared:
+                print("  Top allocators, all frameworks (live growth since the first measured question):")
+                for x in shared:
+                    print(f"     {x['size'] * 1024:+8.0f}KB {x['count']:+7d} blocks  {x['where']}")
+        else:
+            with asyncio.Runner() as loop:
+                for a in adapters:
+                    probe.start()
+                    life   = Lifecycle(a, args.lifecycle, _marked(a))
+                    rounds = (questions, args.warmup, args.iterations, probe, checkpoints.get(a.name))
+                    if a.is_async:
+                        results = loop.run(run_rounds_async(life.run, *rounds))
+                    else:
+                        results = run_rounds(life.run, *rounds)
+                    loop.run(_settle(life.close()))
+                    _report(a, results, probe.stop(), probe)
+    finally:
+        for c in checkpoints.values():
+            c.close()
+        for a in adapters:
+            a.close()
+
+
+if __name__ == "__main__":
+    main()
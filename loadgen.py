@@ -0,0 +1,229 @@
+"""Open-loop load: questions arrive on a clock, not when the last one finished.
+
+A closed-loop run (``run_rounds``, ``--concurrency``) sends the next question
+only after a previous one returns, so a slow server slows the offered load
+down with it and queueing never shows.  Here arrivals follow a schedule at
+a target rate, independent of completions:
+
+- ``poisson``: exponential gaps, the usual model of independent users;
+- ``bursty``:  groups of ``BURST`` questions at once, exponential gaps between
+  groups (same mean rate, much higher peaks);
+- ``uniform``: evenly spaced.
+
+Each arrival waits for one of ``--max-inflight`` slots (default
+``OLLAMA_NUM_PARALLEL`` when set, else unbounded), so the time spent
+waiting is the client-side queueing delay.  Service time runs from the
+moment it gets a slot to its answer, and response time is the two added
+together.  Goodput counts correct answers within ``--slo`` seconds per
+second of the arrival window (``--duration``), so the drain after the last
+arrival does not dilute it.  A seeded schedule sends a random number of
+arrivals (30s at 0.5/s Poisson is 21 questions, not 15), so a rate is
+judged against what was actually offered, arrivals over the window.  It is
+sustained while goodput keeps up with that; the saturation point is the
+last sustained rate.
+
+    uv run tool_calling_test.py --rate 0.5,1,2,4 --duration 60
+    uv run pydanticai_test.py --rate 2 --arrivals bursty --slo 5
+    OLLAMA_NUM_PARALLEL=4 uv run adk_test.py --rate 1,2,4,8
+    uv run tool_calling_test.py --rate 2 --workload data/questions.jsonl
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable
+
+from answers import good_answer, grade_all
+from results_db import RESULTS_DB, store_load
+from stats import percentile
+from utils import BACKEND, DATASET, LOG_FILE, MODEL, SEP
+
+ARRIVALS = ("poisson", "bursty", "uniform")
+BURST    = 5
+SEED     = 42
+# A rate is sustained while goodput stays within this fraction of the offered rate
+SUSTAINED = 0.90
+
+
+def schedule(rate: float, duration: float, arrivals: str = "poisson", seed: int = SEED) -> list[float]:
+    """Arrival offsets (seconds from the start) for ``duration`` seconds at ``rate``/s."""
+    rng = random.Random(seed)
+    out: list[float] = []
+    t   = 0.0
+    while True:
+        if arrivals == "uniform":
+            t += 1 / rate
+            batch = 1
+        elif arrivals == "bursty":
+            t += rng.expovariate(rate / BURST)
+            batch = BURST
+        else:
+            t += rng.expovariate(rate)
+            batch = 1
+        if t >= duration:
+            return out or [0.0]
+        out.extend([t] * batch)
+
+
+def _record(r: dict, arrival: float, started: float, done: float, question: str) -> dict:
+    r["queue"]    = started - arrival
+    r["service"]  = done - started
+    r["time"]     = done - arrival
+    r["question"] = question
+    return r
+
+
+def _failed(e: Exception) -> dict:
+    return {"success": False, "tool_calls": 0, "error": repr(e)}
+
+
+def rate_stats(rate: float, results: list[dict], wall: float, slo: float, window: float) -> dict:
+    """One rate's row; ``window`` is the arrival window, ``wall`` includes the drain."""
+    good = [r for r in grade_all(results) if good_answer(r) and r["time"] <= slo]
+    row  = {
+        "rate":       rate,
+        "offered":    len(results) / window if window > 0 else 0.0,
+        "sent":       len(results),
+        "passed":     sum(1 for r in results if r["success"]),
+        "correct":    sum(1 for r in results if good_answer(r)),
+        "wall":       wall,
+        "throughput": len(results) / wall if wall > 0 else 0.0,
+        "goodput":    len(good) / window if window > 0 else 0.0,
+    }
+    for key in ("queue", "service", "time"):
+        values = [r[key] for r in results]
+        row[f"{key}_p50"] = percentile(values, 50)
+        row[f"{key}_p95"] = percentile(values, 95)
+    row["time_p99"] = percentile([r["time"] for r in results], 99)
+    return row
+
+
+def open_loop_threads(
+    run_one: Callable[[str], dict], questions: Iterable[str], rates: list[float],
+    duration: float, arrivals: str, max_inflight: int, slo: float,
+) -> list[dict]:
+    """Fire each rate's schedule at a sync ``run_one`` from a dispatcher thread."""
+    source = itertools.cycle(questions)
+    rows   = []
+    for rate in rates:
+        times   = schedule(rate, duration, arrivals)
+        results = []
+        lock    = threading.Lock()
+
+        def job(arrival: float, t0: float, q: str) -> None:
+            started = time.perf_counter() - t0
+            try:
+                r = run_one(q)
+            except Exception as e:      # one failed question must not sink the rate
+                r = _failed(e)
+            with lock:
+                results.append(_record(r, arrival, started, time.perf_counter() - t0, q))
+
+        with open(os.devnull, "w") as sink, redirect_stdout(sink):
+            # the executor's work queue is the client-side queue
+            with ThreadPoolExecutor(max_workers=max_inflight or len(times)) as pool:
+                t0 = time.perf_counter()
+                for arrival in times:
+                    time.sleep(max(0.0, arrival - (time.perf_counter() - t0)))
+                    pool.submit(job, arrival, t0, next(source))
+            wall = time.perf_counter() - t0
+        rows.append(rate_stats(rate, results, wall, slo, duration))
+        print(f"  rate={rate:<5g} done  {rows[-1]['goodput']:.2f} good q/s")
+    return rows
+
+
+async def open_loop_async(
+    run_one: Callable[[str], Awaitable[dict]], questions: Iterable[str], rates: list[float],
+    duration: float, arrivals: str, max_inflight: int, slo: float,
+) -> list[dict]:
+    """Fire each rate's schedule as tasks on the running event loop."""
+    source = itertools.cycle(questions)
+    rows   = []
+    for rate in rates:
+        times = schedule(rate, duration, arrivals)
+        slots = asyncio.Semaphore(max_inflight) if max_inflight else None
+
+        async def job(arrival: float, t0: float, q: str) -> dict:
+            if slots:
+                await slots.acquire()
+            started = time.perf_counter() - t0
+            try:
+                r = await run_one(q)
+            except Exception as e:
+                r = _failed(e)
+            finally:
+                if slots:
+                    slots.release()
+            return _record(r, arrival, started, time.perf_counter() - t0, q)
+
+        with open(os.devnull, "w") as sink, redirect_stdout(sink):
+            t0    = time.perf_counter()
+            tasks = []
+            for arrival in times:
+                await asyncio.sleep(max(0.0, arrival - (time.perf_counter() - t0)))
+                tasks.append(asyncio.create_task(job(arrival, t0, next(source))))
+            results = await asyncio.gather(*tasks)
+            wall    = time.perf_counter() - t0
+        rows.append(rate_stats(rate, list(results), wall, slo, duration))
+        print(f"  rate={rate:<5g} done  {rows[-1]['goodput']:.2f} good q/s")
+    return rows
+
+
+def saturation_rate(rows: list[dict]) -> float | None:
+    """Highest target rate whose goodput kept up with the arrivals actually sent (``None`` if even the first did not)."""
+    best = None
+    for r in rows:
+        if r["goodput"] < r["offered"] * SUSTAINED:
+            break
+        best = r["rate"]
+    return best
+
+
+def print_load(name: str, rows: list[dict], arrivals: str, max_inflight: int, slo: float) -> None:
+    print()
+    print(SEP)
+    inflight = max_inflight or "unbounded"
+    print(f"  OPEN LOOP  ({name}; {arrivals} arrivals, in-flight {inflight}, SLO {slo:g}s)")
+    print(SEP)
+    print(f"  {'rate':>5}  {'offer':>5}  {'sent':>4}  {'passed':>6}  {'correct':>7}  {'q/s':>5}  {'good':>5}"
+          f"  {'queue p50/p95':>13}  {'service p50/p95':>15}  {'resp p95':>8}  {'p99':>7}")
+    for r in rows:
+        print(
+            f"  {r['rate']:5g}  {r['offered']:5.2f}  {r['sent']:>4}  {r['passed']:>3}/{r['sent']:<2}  {r['correct']:>4}/{r['sent']:<2}"
+            f"  {r['throughput']:5.2f}  {r['goodput']:5.2f}"
+            f"  {r['queue_p50']:5.2f}/{r['queue_p95']:5.2f}s  {r['service_p50']:6.2f}/{r['service_p95']:6.2f}s"
+            f"  {r['time_p95']:7.2f}s  {r['time_p99']:6.2f}s"
+        )
+    knee = saturation_rate(rows)
+    if knee is None:
+        print(f"  Saturated already at {rows[0]['rate']:g} q/s (goodput < {SUSTAINED:.0%} of offered)")
+    elif knee == rows[-1]["rate"]:
+        print(f"  Sustains {knee:g} q/s (highest rate tested)")
+    else:
+        print(f"  Saturates above {knee:g} q/s (goodput < {SUSTAINED:.0%} of offered beyond it)")
+    print()
+
+
+def append_load_log(name: str, rows: list[dict], arrivals: str) -> None:
+    """Append one line per rate to bench_results.log and store the run."""
+    ts        = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    back_part = f" | backend {BACKEND}" if BACKEND != "ollama" else ""
+    back_part += f" | dataset {DATASET}" if DATASET else ""
+    with open(LOG_FILE, "a") as f:
+        for r in rows:
+            f.write(
+                f"{ts} | {name:<26} | open {arrivals} {r['rate']:g}/s | {r['passed']}/{r['sent']} passed {r['correct']} correct"
+                f" | offered {r['offered']:5.2f} q/s"
+                f" | goodput {r['goodput']:5.2f} q/s | queue p95 {r['queue_p95']:5.2f}s"
+                f" service p95 {r['service_p95']:5.2f}s | resp p99 {r['time_p99']:5.2f}s{back_part}\n"
+            )
+        knee = saturation_rate(rows)
+        f.write(f"{ts} | {name:<26} | sustains {'-' if knee is None else f'{knee:g}'} q/s{back_part}\n")
+    run_id = store_load(name, rows, arrivals, model=MODEL, backend=BACKEND)
+    print(f"  appended to {LOG_FILE.name}; load run {run_id} stored in {RESULTS_DB.name}")
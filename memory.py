@@ -0,0 +1,139 @@
+"""Memory per question: RSS, Python allocations and retained growth.
+
+``MemoryProbe`` samples around every measured question.  RSS (current and
+the process high-water mark) is cheap and always recorded.  With
+``--memory`` it also runs ``tracemalloc``:
+
+- ``py_peak``: peak traced Python memory while the question ran, above
+  what was live when it started (transient allocations);
+- ``py_retained``: traced memory still live after the question and a full
+  ``gc.collect()``; its slope across questions is the per-question leak
+  (ADK session churn, Deep Agents message state);
+- top allocators: source lines holding the most memory allocated since
+  the first measured question.
+
+tracemalloc slows allocation-heavy code noticeably, so keep ``--memory``
+runs apart from latency runs.  Sampling happens outside the timed region.
+"""
+
+import gc
+import os
+import resource
+import sys
+import tracemalloc
+from typing import Optional
+
+MB = 2**20
+
+# Frames that only reflect the probe itself or the import system
+_IGNORE = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def peak_rss_mb() -> float:
+    """Process high-water RSS so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / MB if sys.platform == "darwin" else peak / 2**10     # bytes vs KiB
+
+
+def rss_mb() -> float:
+    """Current RSS (Linux ``/proc``); falls back to the high-water mark."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def slope(values: list[float]) -> float:
+    """Least-squares growth per step; 0.0 for fewer than two values."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mx  = (n - 1) / 2
+    my  = sum(values) / n
+    num = sum((i - mx) * (v - my) for i, v in enumerate(values))
+    den = sum((i - mx) ** 2 for i in range(n))
+    return num / den
+
+
+class MemoryProbe:
+    """Record memory fields onto each measured result dict."""
+
+    def __init__(self, trace: bool = False, frames: int = 8, top: int = 10) -> None:
+        self.trace  = trace
+        self.frames = frames
+        self.top    = top
+        self._base: Optional[tracemalloc.Snapshot] = None
+        self._py0   = 0
+
+    def start(self) -> None:
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def before(self) -> None:
+        """Call right before the timed question starts."""
+        if self.trace:
+            tracemalloc.reset_peak()
+            self._py0 = tracemalloc.get_traced_memory()[0]
+
+    def after(self, r: dict, measured: bool = True) -> None:
+        """Call after the question's time is taken; annotates ``r`` in place."""
+        if not self.trace:
+            if measured:
+                r["rss"], r["peak_rss"] = rss_mb(), peak_rss_mb()
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        gc.collect()
+        if measured:
+            r["rss"], r["peak_rss"] = rss_mb(), peak_rss_mb()
+            r["py_peak"]     = (peak - self._py0) / MB
+            r["py_retained"] = tracemalloc.get_traced_memory()[0] / MB
+            if self._base is None:
+                self._base = self._snapshot()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORE]
+        )
+
+    def top_allocators(self) -> list[dict]:
+        """Source lines whose live memory grew most since the first measured question."""
+        if not self.trace or self._base is None:
+            return []
+        gc.collect()
+        diffs = self._snapshot().compare_to(self._base, "lineno")
+        return [
+            {
+                "where": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                "size":  d.size_diff / MB,
+                "count": d.count_diff,
+            }
+            for d in diffs[: self.top]
+            if d.size_diff > 0
+        ]
+
+    def stop(self) -> list[dict]:
+        """Top allocators, then stop tracing."""
+        top = self.top_allocators()
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._base = None
+        return top
+
+
+def memory_summary(results: list) -> dict:
+    """Run-level memory numbers from annotated results (empty if none)."""
+    rows = [r for r in results if "rss" in r]
+    if not rows:
+        return {}
+    out = {
+        "rss":        rows[-1]["rss"],
+        "peak_rss":   max(r["peak_rss"] for r in rows),
+        "rss_growth": slope([r["rss"] for r in rows]),
+    }
+    traced = [r for r in rows if "py_retained" in r]
+    if traced:
+        out["py_peak"]     = max(r["py_peak"] for r in traced)
+        out["py_retained"] = traced[-1]["py_retained"]
+        out["py_growth"]   = slope([r["py_retained"] for r in traced])
+    return out
@@ -0,0 +1,413 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""Deterministic stand-in for Ollama: scripted tool calls and answers, no GPU.
+
+Speaks the native streaming ``/api/chat`` protocol (raw client, LangChain
+Ollama) and the OpenAI-compatible ``/v1/chat/completions`` path (LiteLLM in
+ADK, Pydantic AI Ollama provider).  Every question in ``QUESTIONS`` has a
+scripted SQL tool call followed by a scripted answer, emitted token by token
+with a fixed per-token latency, so the time left over in a benchmark run is
+framework overhead.
+
+With ``--load-time`` the mock also keeps track of which model is resident
+and with what context size, as Ollama does.  A request that finds the model
+unloaded, or loaded with a different ``num_ctx``, waits ``--load-time``
+seconds and reports it as ``load_duration``.  The OpenAI-compatible path
+cannot set ``num_ctx`` and always gets ``--num-ctx``.  ``/api/ps`` lists the
+resident model; ``/api/generate`` without a prompt loads it, or unloads it
+with ``keep_alive: 0``.
+
+    uv run mock_ollama.py --port 11435 --ttft 0.05 --token-latency 0.01
+    uv run mock_ollama.py --port 11435 --load-time 2      # model loads and reloads
+    OLLAMA_HOST=http://127.0.0.1:11435 uv run tool_calling_test.py
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 11435
+DEFAULT_CTX  = 4096
+TOOL_NAME    = "run_duckdb_query"
+
+# question -> (sql, answer); answers match the 18-row table from setup_db()
+SCRIPTS = {
+    "What is the total revenue per category?": (
+        "SELECT category, SUM(quantity * price) AS revenue FROM sales GROUP BY category ORDER BY revenue DESC",
+        "Total revenue per category: Electronics 76698.54, Furniture 8849.53.",
+    ),
+    "Which region had the highest total revenue?": (
+        "SELECT region, SUM(quantity * price) AS revenue FROM sales GROUP BY region ORDER BY revenue DESC LIMIT 1",
+        "The South region had the highest total revenue at 29899.40.",
+    ),
+    "Show monthly revenue for each month.": (
+        "SELECT strftime(date, '%Y-%m') AS month, SUM(quantity * price) AS revenue FROM sales GROUP BY month ORDER BY month",
+        "Monthly revenue: 2024-01 28099.35, 2024-02 25199.53, 2024-03 32249.19.",
+    ),
+    "What are the top 3 best-selling products by quantity?": (
+        "SELECT product, SUM(quantity) AS total_quantity FROM sales GROUP BY product ORDER BY total_quantity DESC LIMIT 3",
+        "Top 3 products by quantity: Phone 45, Keyboard 45, Chair 35.",
+    ),
+    "Which product has the best revenue-to-quantity ratio?": (
+        "SELECT product, SUM(quantity * price) / SUM(quantity) AS ratio FROM sales GROUP BY product ORDER BY ratio DESC LIMIT 1",
+        "Laptop has the best revenue-to-quantity ratio at 999.99 per unit.",
+    ),
+}
+FALLBACK = ("SELECT COUNT(*) AS row_count FROM sales", "The sales table has 18 rows.")
+
+
+def _text(content) -> str:
+    """Flatten OpenAI-style content (string or list of parts) to plain text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+
+def _tokens(text: str) -> list[str]:
+    """Split text into word-ish tokens that concatenate back to the original."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def plan_reply(messages: list[dict]) -> dict:
+    """Decide the scripted reply for a conversation.
+
+    Returns ``{"sql": ...}`` for a tool-call turn, or ``{"answer": ...}`` once
+    a tool result follows the latest user message.
+    """
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+    question  = _text(messages[last_user].get("content")).strip() if last_user >= 0 else ""
+    sql, answer = next(
+        (s for q, s in SCRIPTS.items() if q in question), FALLBACK
+    )
+    if any(m.get("role") == "tool" for m in messages[last_user + 1:]):
+        return {"answer": answer}
+    return {"sql": sql}
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockOllamaServer"
+
+    def log_message(self, format, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # -- plumbing -------------------------------------------------------------
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body   = self.rfile.read(length) if length else b""
+        return json.loads(body or b"{}")
+
+    def _send_json(self, obj: dict, status: int = 200) -> None:
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _emit(self, reply: dict):
+        """Yield (kind, payload) pieces of a reply, sleeping like a model would.
+
+        ``kind`` is ``"token"`` for answer text or ``"tool"`` for the complete
+        tool call, which Ollama only emits once its arguments are decoded.
+        """
+        time.sleep(self.server.ttft)
+        if "sql" in reply:
+            args = json.dumps({"sql": reply["sql"]})
+            time.sleep(self.server.token_latency * len(_tokens(args)))
+            yield "tool", args
+        else:
+            for i, tok in enumerate(_tokens(reply["answer"])):
+                if i:
+                    time.sleep(self.server.token_latency)
+                yield "token", tok
+
+    def _usage(self, reply: dict, prompt_chars: int) -> tuple[int, int]:
+        text = json.dumps({"sql": reply["sql"]}) if "sql" in reply else reply["answer"]
+        return max(1, prompt_chars // 4), len(_tokens(text))
+
+    def _load(self, model: str, num_ctx: int | None) -> float:
+        """Make ``model`` resident with ``num_ctx``; seconds spent loading (0 if it already was)."""
+        num_ctx = num_ctx or self.server.num_ctx
+        with self.server.lock:
+            if self.server.loaded.get(model) == num_ctx:
+                return 0.0
+            time.sleep(self.server.load_time)
+            self.server.loaded = {model: num_ctx}      # one model fits at a time
+            return self.server.load_time
+
+    # -- routes ---------------------------------------------------------------
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/api/tags"):
+            self._send_json({"models": [{"name": self.server.model, "model": self.server.model}]})
+        elif self.path.startswith("/api/ps"):
+            self._send_json({"models": [
+                {"name": m, "model": m, "size": 0, "size_vram": 0, "context_length": ctx}
+                for m, ctx in self.server.loaded.items()
+            ]})
+        elif self.path.startswith("/api/version"):
+            self._send_json({"version": "0.0.0-mock"})
+        elif self.path.startswith("/v1/models"):
+            self._send_json({"object": "list", "data": [
+                {"id": self.server.model, "object": "model", "owned_by": "mock"},
+            ]})
+        elif self.path == "/":
+            self._send_json({"status": "Ollama is running"})
+        else:
+            self._send_json({"error": f"not found: {self.path}"}, status=404)
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self) -> None:
+        try:
+            req = self._read_json()
+        except ValueError as e:
+            self._send_json({"error": f"invalid JSON: {e}"}, status=400)
+            return
+        if self.path.startswith("/api/chat"):
+            self._native_chat(req)
+        elif self.path.startswith("/v1/chat/completions"):
+            self._openai_chat(req)
+        elif self.path.startswith("/api/generate"):
+            self._generate(req)
+        elif self.path.startswith("/api/show"):
+            self._send_json({"details": {"family": "mock"}, "model_info": {}, "capabilities": ["completion", "tools"]})
+        else:
+            self._send_json({"error": f"not found: {self.path}"}, status=404)
+
+    def _generate(self, req: dict) -> None:
+        """Load or unload only (an empty prompt, as Ollama clients use to preload)."""
+        model = req.get("model") or self.server.model
+        if str(req.get("keep_alive")) in ("0", "0s"):
+            with self.server.lock:
+                self.server.loaded.pop(model, None)
+            self._send_json({"model": model, "response": "", "done": True, "done_reason": "unload"})
+            return
+        load = self._load(model, (req.get("options") or {}).get("num_ctx"))
+        self._send_json({
+            "model": model, "response": "", "done": True, "done_reason": "load",
+            "load_duration": int(load * 1e9),
+        })
+
+    def _native_chat(self, req: dict) -> None:
+        messages     = req.get("messages") or []
+        reply        = plan_reply(messages)
+        model        = req.get("model") or self.server.model
+        load         = self._load(model, (req.get("options") or {}).get("num_ctx"))
+        prompt_chars = len(json.dumps(messages)) + len(json.dumps(req.get("tools") or []))
+        stream       = req.get("stream", True)
+        t0           = time.perf_counter()
+
+        def frame(message: dict, done: bool = False) -> dict:
+            return {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": "", **message},
+                "done": done,
+            }
+
+        def final(message: dict) -> dict:
+            n_prompt, n_eval = self._usage(reply, prompt_chars)
+            total    = int((time.perf_counter() - t0) * 1e9)
+            prompt_d = int(self.server.ttft * 1e9)
+            return {
+                **frame(message, done=True),
+                "done_reason": "stop",
+                "total_duration": total,
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": n_prompt,
+                "prompt_eval_duration": prompt_d,
+                "eval_count": n_eval,
+                "eval_duration": max(0, total - prompt_d),
+            }
+
+        def tool_message(args: str) -> dict:
+            return {"tool_calls": [{"function": {"name": TOOL_NAME, "arguments": json.loads(args)}}]}
+
+        if not stream:
+            message, parts = {}, []
+            for kind, payload in self._emit(reply):
+                if kind == "tool":
+                    message = tool_message(payload)
+                else:
+                    parts.append(payload)
+            self._send_json(final({**message, "content": "".join(parts)}))
+            return
+
+        self._start_stream("application/x-ndjson")
+        for kind, payload in self._emit(reply):
+            msg = tool_message(payload) if kind == "tool" else {"content": payload}
+            self._write_chunk(json.dumps(frame(msg)).encode() + b"\n")
+        self._write_chunk(json.dumps(final({})).encode() + b"\n")
+        self._end_stream()
+
+    def _openai_chat(self, req: dict) -> None:
+        messages     = req.get("messages") or []
+        reply        = plan_reply(messages)
+        model        = req.get("model") or self.server.model
+        prompt_chars = len(json.dumps(messages)) + len(json.dumps(req.get("tools") or []))
+        self._load(model, None)                 # no num_ctx on this path
+        completion   = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created      = int(time.time())
+        finish       = "tool_calls" if "sql" in reply else "stop"
+        n_prompt, n_eval = self._usage(reply, prompt_chars)
+        usage = {"prompt_tokens": n_prompt, "completion_tokens": n_eval, "total_tokens": n_prompt + n_eval}
+
+        def tool_call(args: str, index: int | None = None) -> dict:
+            call = {
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+                "type": "function",
+                "function": {"name": TOOL_NAME, "arguments": args},
+            }
+            return call if index is None else {"index": index, **call}
+
+        def chunk(delta: dict, finish_reason: str | None = None, **extra) -> bytes:
+            obj = {
+                "id": completion, "object": "chat.completion.chunk",
+                "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return b"data: " + json.dumps(obj).encode() + b"\n\n"
+
+        if not req.get("stream"):
+            message: dict = {"role": "assistant", "content": ""}
+            parts = []
+            for kind, payload in self._emit(reply):
+                if kind == "tool":
+                    message["content"]    = None
+                    message["tool_calls"] = [tool_call(payload)]
+                else:
+                    parts.append(payload)
+            if parts:
+                message["content"] = "".join(parts)
+            self._send_json({
+                "id": completion, "object": "chat.completion",
+                "created": created, "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                "usage": usage,
+            })
+            return
+
+        self._start_stream("text/event-stream")
+        first = True
+        for kind, payload in self._emit(reply):
+            delta: dict = {"role": "assistant"} if first else {}
+            if kind == "tool":
+                delta.update(content=None, tool_calls=[tool_call(payload, index=0)])
+            else:
+                delta["content"] = payload
+            self._write_chunk(chunk(delta))
+            first = False
+        self._write_chunk(chunk({}, finish))
+        if (req.get("stream_options") or {}).get("include_usage"):
+            usage_chunk = {
+                "id": completion, "object": "chat.completion.chunk",
+                "created": created, "model": model, "choices": [], "usage": usage,
+            }
+            self._write_chunk(b"data: " + json.dumps(usage_chunk).encode() + b"\n\n")
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._end_stream()
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        ttft: float = 0.0,
+        token_latency: float = 0.0,
+        model: str = "qwen3:8b",
+        verbose: bool = False,
+        load_time: float = 0.0,
+        num_ctx: int = DEFAULT_CTX,
+    ) -> None:
+        super().__init__(address, MockOllamaHandler)
+        self.ttft          = ttft
+        self.token_latency = token_latency
+        self.model         = model
+        self.verbose       = verbose
+        self.load_time     = load_time
+        self.num_ctx       = num_ctx
+        self.loaded: dict[str, int] = {}        # resident model -> num_ctx
+        self.lock          = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_mock(
+    port: int = 0,
+    ttft: float = 0.0,
+    token_latency: float = 0.0,
+    host: str = "127.0.0.1",
+) -> MockOllamaServer:
+    """Start a mock server on a daemon thread and return it (see ``.url``)."""
+    server = MockOllamaServer((host, port), ttft=ttft, token_latency=token_latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--ttft", type=float, default=0.0,
+                        help="seconds before the first token of every reply (prompt eval)")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="seconds per generated token")
+    parser.add_argument("--load-time", type=float, default=0.0,
+                        help="seconds to load the model when it is not resident with the requested num_ctx")
+    parser.add_argument("--num-ctx", type=int, default=DEFAULT_CTX,
+                        help=f"context size when a request sets none (default {DEFAULT_CTX})")
+    parser.add_argument("--model", default="qwen3:8b")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = MockOllamaServer(
+        (args.host, args.port), ttft=args.ttft, token_latency=args.token_latency,
+        model=args.model, verbose=args.verbose, load_time=args.load_time, num_ctx=args.num_ctx,
+    )
+    print(f"  mock ollama on {server.url}  (ttft={args.ttft}s, token={args.token_latency}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
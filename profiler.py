@@ -0,0 +1,267 @@
+"""Sampling CPU profiler for the framework side of each question (``--profile``).
+
+A background thread wakes every ``--profile-interval`` ms and reads every
+other thread's Python stack (``sys._current_frames``) and its own CPU clock
+(``pthread_getcpuclockid``).  A thread is charged the CPU time it used since
+the previous pass, capped at the wall time between passes, so the totals
+estimate CPU seconds.  Time spent waiting for the model uses no CPU and
+drops out.  What remains is client-side work: request and response
+serialization, validation, graph scheduling and callback dispatch.
+
+The CPU goes to the stack the thread is running now.  If its innermost
+frame is a known blocking call (socket read, ``select``, lock or queue
+wait, sleep), the thread did that work before it started waiting, for
+example parsing the last response.  It then goes to the last running
+stack seen for the thread or, before there is one, to the caller of the
+blocking call.  While sampling, the interpreter's switch interval is
+lowered to a tenth of the sampling interval, so a busy thread hands the
+GIL to the sampler soon after it wakes.  Where per-thread CPU clocks are
+not available (macOS), a thread outside a blocking call is charged the
+wall time since the previous pass, and a blocked one nothing.
+
+``ProfileProbe`` wraps the ``MemoryProbe`` that ``run_rounds`` and the
+harness already call around every question, so sampling starts and stops
+outside the timed region.  Each measured question gives one speedscope
+file, ``profiles/<framework>/<iteration>-<question id>.speedscope.json``,
+which opens at https://www.speedscope.app.  ``report`` prints self time per
+package and the hottest functions.  The sampler has overhead, so keep
+``--profile`` runs apart from latency runs.
+"""
+
+import json
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from memory import MemoryProbe
+
+PROFILE_DIR = Path(os.getenv("BENCH_PROFILE_DIR", Path(__file__).parent / "profiles"))
+ROOT        = str(Path(__file__).parent)
+STDLIB      = sysconfig.get_paths()["stdlib"]
+
+# Innermost Python frames that mean the thread is waiting, not computing
+BLOCKING = {
+    ("selectors.py", "select"), ("socket.py", "readinto"), ("ssl.py", "recv_into"), ("ssl.py", "read"),
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("_base.py", "result"), ("sync.py", "read"), ("time.py", "sleep"),
+}
+
+Frame = tuple[str, int, str]        # (filename, first line, qualified name)
+
+
+def _cpu_clock(ident: int) -> Optional[int]:
+    try:
+        return time.pthread_getcpuclockid(ident)
+    except (AttributeError, OSError):
+        return None
+
+
+def _blocked(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in BLOCKING
+
+
+def _caller(frame):
+    """The innermost frame outside the blocking call ``frame`` is parked in."""
+    while frame is not None and _blocked(frame):
+        frame = frame.f_back
+    return frame
+
+
+class Sampler:
+    """Collect on-CPU stacks of all other threads until ``stop``."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: dict[tuple[Frame, ...], float] = defaultdict(float)
+        self._cpu: dict[int, float] = {}
+        self._last: dict[int, tuple[Frame, ...]] = {}    # latest running stack per thread
+        self._names: dict[int, str] = {}
+        self._switch  = sys.getswitchinterval()
+        self._stop    = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        # A busy thread keeps the GIL for the whole switch interval (5ms), so
+        # by the time the sampler gets it the thread is usually waiting again.
+        sys.setswitchinterval(min(self._switch, self.interval / 10))
+        self._thread = threading.Thread(target=self._run, name="bench-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict[tuple[Frame, ...], float]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        sys.setswitchinterval(self._switch)
+        return dict(self.stacks)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        for ident in sys._current_frames():         # CPU baseline for every thread
+            clock = _cpu_clock(ident)
+            if clock is not None and ident != me:
+                try:
+                    self._cpu[ident] = time.clock_gettime(clock)
+                except OSError:
+                    pass
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now           = time.perf_counter()
+            elapsed, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                cpu = self._running(ident, frame, elapsed)
+                if not cpu:
+                    continue
+                if _blocked(frame):     # CPU used before the wait: charge where it ran
+                    stack = self._last.get(ident) or self._stack(ident, _caller(frame))
+                else:
+                    stack = self._last[ident] = self._stack(ident, frame)
+                self.stacks[stack] += cpu
+
+    def _stack(self, ident: int, frame) -> tuple[Frame, ...]:
+        """``frame`` (may be ``None``) and its callers, outermost first, under a ``<thread>`` root."""
+        if ident not in self._names:
+            self._names = {t.ident: t.name for t in threading.enumerate()}
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_qualname))
+            frame = frame.f_back
+        root = ("<thread>", 0, self._names.get(ident, f"thread-{ident}"))
+        return (root, *reversed(stack))
+
+    def _running(self, ident: int, frame, elapsed: float) -> float:
+        """CPU seconds the thread used since the last pass, capped at ``elapsed``.
+
+        Without a per-thread CPU clock: ``elapsed``, or 0 if the thread is
+        parked in a blocking call.
+        """
+        clock = _cpu_clock(ident)
+        if clock is None:
+            return 0.0 if _blocked(frame) else elapsed
+        try:
+            now = time.clock_gettime(clock)
+        except OSError:             # thread exited between listing and reading
+            return 0.0
+        prev = self._cpu.get(ident)
+        self._cpu[ident] = now
+        if prev is None:
+            return 0.0
+        return min(max(now - prev, 0.0), elapsed)
+
+
+def package(filename: str) -> str:
+    """Top-level package a source file belongs to (``stdlib``, ``bench``, ...)."""
+    parts = Path(filename).parts
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            i = parts.index(marker)
+            return parts[i + 1].removesuffix(".py") if i + 1 < len(parts) else marker
+    if filename.startswith("<frozen") or filename.startswith(STDLIB):
+        return "stdlib"
+    if filename.startswith(ROOT):
+        return "bench"
+    return "other"
+
+
+def speedscope(name: str, stacks: dict[tuple[Frame, ...], float]) -> dict:
+    """A speedscope "sampled" profile (weights in seconds of CPU)."""
+    index: dict[Frame, int] = {}
+    frames, samples, weights = [], [], []
+    for stack, weight in stacks.items():
+        ids = []
+        for f in stack:
+            if f not in index:
+                index[f] = len(frames)
+                frames.append({"name": f[2], "file": f[0], "line": f[1]})
+            ids.append(index[f])
+        samples.append(ids)
+        weights.append(weight)
+    return {
+        "$schema":  "https://www.speedscope.app/file-format-schema.json",
+        "shared":   {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "seconds",
+            "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights,
+        }],
+        "name":     name,
+        "exporter": "llm-agent-benchmark profiler.py",
+    }
+
+
+def self_time(stacks: dict[tuple[Frame, ...], float]) -> tuple[dict[str, float], dict[Frame, float]]:
+    """CPU seconds by package and by function, attributed to the innermost frame."""
+    by_package: dict[str, float] = defaultdict(float)
+    by_func: dict[Frame, float]  = defaultdict(float)
+    for stack, weight in stacks.items():
+        leaf = stack[-1]
+        by_package[package(leaf[0])] += weight
+        by_func[leaf]                += weight
+    return by_package, by_func
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-")[:40] or "q"
+
+
+class ProfileProbe:
+    """``MemoryProbe`` stand-in that also samples the CPU around each question."""
+
+    def __init__(self, inner: MemoryProbe, interval_ms: float = 5.0, out_dir: Path = PROFILE_DIR) -> None:
+        self.inner    = inner
+        self.interval = interval_ms / 1000
+        self.out_dir  = Path(out_dir)
+        self.profiles: dict[int, dict] = {}     # id(result) -> stacks
+        self._sampler: Optional[Sampler] = None
+
+    def start(self) -> None:
+        self.inner.start()
+
+    def before(self) -> None:
+        self.inner.before()
+        self._sampler = Sampler(self.interval)
+        self._sampler.start()
+
+    def after(self, r: dict, measured: bool = True) -> None:
+        stacks = self._sampler.stop() if self._sampler else {}
+        self._sampler = None
+        if measured:
+            self.profiles[id(r)] = stacks
+        self.inner.after(r, measured)
+
+    def stop(self) -> list[dict]:
+        return self.inner.stop()
+
+    def report(self, label: str, name: str, results: list) -> None:
+        """Write one speedscope file per measured question and print the hot spots."""
+        mine = [(r, self.profiles.pop(id(r))) for r in results if id(r) in self.profiles]
+        if not mine:
+            return
+        out = self.out_dir / name
+        out.mkdir(parents=True, exist_ok=True)
+        total: dict[tuple[Frame, ...], float] = defaultdict(float)
+        for r, stacks in mine:
+            qid  = r.get("qid") or _slug(r.get("question", ""))
+            path = out / f"{r.get('iteration', 0)}-{_slug(qid)}.speedscope.json"
+            path.write_text(json.dumps(speedscope(f"{label} | {r.get('question', '')}", stacks)))
+            for stack, weight in stacks.items():
+                total[stack] += weight
+        cpu = sum(total.values())
+        by_package, by_func = self_time(total)
+        print(f"  CPU profile      : {cpu:.3f}s client CPU over {len(mine)} questions"
+              f" ({cpu / len(mine) * 1000:.1f}ms/Q, model wait excluded)")
+        print("  Self time by package:")
+        for pkg, secs in sorted(by_package.items(), key=lambda kv: -kv[1])[:10]:
+            print(f"     {secs / cpu if cpu else 0:6.1%}  {secs * 1000:8.1f}ms  {pkg}")
+        print("  Hottest functions (self):")
+        for (filename, line, func), secs in sorted(by_func.items(), key=lambda kv: -kv[1])[:10]:
+            print(f"     {secs / cpu if cpu else 0:6.1%}  {secs * 1000:8.1f}ms  {func}  ({package(filename)}: {Path(filename).name}:{line})")
+        print(f"  speedscope files : {out}/ ({len(mine)} files)")
+        print()
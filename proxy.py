@@ -0,0 +1,511 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""Record/replay and wire-tracing proxy for model traffic.
+
+Sits between any benchmark script and the model endpoint.  In ``record`` mode
+every request is forwarded upstream and the streamed response is captured
+chunk by chunk, with its arrival offset, into a gzip'd JSONL cassette keyed by
+a normalized request hash.  In ``replay`` mode the same bytes are served back
+with their original timing (or none at all), so the whole suite runs without
+Ollama or a GPU.
+
+``trace`` mode forwards like ``record`` but writes one JSONL line per request
+instead: request/response bytes, prompt/eval tokens, the size of the system
+prompt and tool schemas the framework injected, upstream time to first byte,
+and the client-side gap before the request went out.  Benchmarks started with
+``BENCH_WIRE_TRACE=1`` tell the proxy which framework and question is running
+(``POST /__proxy__/mark``), so ``report`` can count round-trips per question.
+
+    uv run proxy.py record --cassette cassettes/run.jsonl.gz --port 11436
+    uv run proxy.py replay --cassette cassettes/run.jsonl.gz --timing none
+    uv run proxy.py trace --trace traces/wire.jsonl
+    OLLAMA_HOST=http://127.0.0.1:11436 uv run adk_test.py
+    uv run proxy.py report --trace traces/wire.jsonl
+"""
+
+import argparse
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PORT  = 11436
+HEALTH_PATH   = "/__proxy__/health"
+MARK_PATH     = "/__proxy__/mark"
+SEP           = chr(9552) * 62
+# Fields that change between otherwise identical runs (server-generated ids)
+VOLATILE_KEYS = {"id", "tool_call_id", "created", "created_at"}
+FORWARD_HEADERS = ("Content-Type", "Accept", "Authorization", "User-Agent")
+
+
+def _normalize(obj):
+    if isinstance(obj, dict):
+        return {k: _normalize(v) for k, v in obj.items() if k not in VOLATILE_KEYS}
+    if isinstance(obj, list):
+        return [_normalize(v) for v in obj]
+    if isinstance(obj, str):
+        return obj.strip()
+    return obj
+
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    """Hash a request so reruns of the same conversation map to the same key.
+
+    JSON bodies are canonicalised (sorted keys, volatile ids dropped, string
+    whitespace stripped); anything else is hashed verbatim.
+    """
+    try:
+        canon = json.dumps(_normalize(json.loads(body)), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        canon = body.decode("utf-8", "surrogateescape")
+    digest = hashlib.sha256(f"{method} {path}\n{canon}".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()[:32]
+
+
+class Cassette:
+    """On-disk list of recorded exchanges, looked up by request key.
+
+    A key may be recorded several times (repeated runs); replay hands the
+    recordings out in order and wraps around, so one cassette serves any
+    number of iterations.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path     = Path(path)
+        self.entries  = defaultdict(list)
+        self._cursor  = defaultdict(int)
+        self._lock    = threading.Lock()
+        self.hits     = 0
+        self.misses   = 0
+        self.recorded = 0
+        if self.path.exists():
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.entries.values())
+
+    def record(self, entry: dict) -> None:
+        with self._lock:
+            self.entries[entry["key"]].append(entry)
+            self.recorded += 1
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # one gzip member per entry: append-safe if the run is killed
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def lookup(self, key: str) -> dict | None:
+        with self._lock:
+            recs = self.entries.get(key)
+            if not recs:
+                self.misses += 1
+                return None
+            i = self._cursor[key]
+            self._cursor[key] = i + 1
+            self.hits += 1
+            return recs[i % len(recs)]
+
+
+def _text(content) -> str:
+    """Message content as text (plain string or OpenAI content parts)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+
+def describe_request(body: bytes) -> dict:
+    """Sizes of what a framework put into one chat request."""
+    try:
+        req = json.loads(body)
+    except ValueError:
+        return {}
+    if not isinstance(req, dict):
+        return {}
+    msgs  = req.get("messages") or []
+    tools = req.get("tools") or []
+    users = [_text(m.get("content")) for m in msgs if m.get("role") == "user"]
+    return {
+        "model":         req.get("model"),
+        "messages":      len(msgs),
+        "system_chars":  sum(len(_text(m.get("content"))) for m in msgs if m.get("role") in ("system", "developer")),
+        "history_chars": sum(len(_text(m.get("content"))) for m in msgs if m.get("role") not in ("system", "developer")),
+        "tools":         len(tools),
+        "tools_bytes":   len(json.dumps(tools, separators=(",", ":"))) if tools else 0,
+        "first_user":    users[0][:200] if users else None,
+    }
+
+
+def response_usage(text: str) -> dict:
+    """Token counts from an Ollama NDJSON/JSON or OpenAI SSE/JSON response."""
+    usage = {}
+    for line in text.splitlines():
+        line = line.strip().removeprefix("data:").strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if "prompt_eval_count" in obj or "eval_count" in obj:
+            usage = {"prompt_tokens": obj.get("prompt_eval_count"), "eval_tokens": obj.get("eval_count")}
+        elif isinstance(obj.get("usage"), dict):
+            u     = obj["usage"]
+            usage = {"prompt_tokens": u.get("prompt_tokens"), "eval_tokens": u.get("completion_tokens")}
+    return usage
+
+
+class WireTrace:
+    """Per-request wire log (JSONL), attributed to the current question mark."""
+
+    def __init__(self, path: Path) -> None:
+        self.path      = Path(path)
+        self.requests  = 0
+        self._lock     = threading.Lock()
+        self._mark     = {}
+        self._marks    = 0
+        self._mark_t   = None
+        self._last_end = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def set_mark(self, mark: dict) -> None:
+        with self._lock:
+            self._marks   += 1
+            self._mark     = {**mark, "mark": self._marks}
+            self._mark_t   = time.perf_counter()
+            self._last_end = None
+
+    def log(
+        self, method: str, path: str, user_agent: str, body: bytes, status: int,
+        resp_text: str, t_start: float, ttfb: Optional[float], t_end: float,
+    ) -> None:
+        with self._lock:
+            since = self._last_end if self._last_end is not None else self._mark_t
+            entry = {
+                "ts":        time.time(),
+                **{k: self._mark.get(k) for k in ("framework", "question", "mark")},
+                "client":    user_agent.split(" ")[0],
+                "method":    method,
+                "path":      path,
+                "status":    status,
+                "req_bytes": len(body),
+                "resp_bytes": len(resp_text.encode("utf-8", "surrogateescape")),
+                # client-side time since the question started / the last response ended
+                "gap":       t_start - since if since is not None else None,
+                "ttfb":      ttfb,
+                "duration":  t_end - t_start,
+                **describe_request(body),
+                **response_usage(resp_text),
+            }
+            self._last_end = t_end
+            self.requests += 1
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def mark(base_url: str, **fields) -> None:
+    """Tell a tracing proxy which framework/question the next requests belong to.
+
+    No-op unless ``BENCH_WIRE_TRACE`` is set; errors are ignored so a run
+    against a plain endpoint is unaffected.
+    """
+    if not os.getenv("BENCH_WIRE_TRACE"):
+        return
+    req = urllib.request.Request(
+        base_url.rstrip("/") + MARK_PATH, data=json.dumps(fields).encode(),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    try:
+        urllib.request.urlopen(req, timeout=2).close()
+    except OSError:
+        pass
+
+
+def load_trace(path: Path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _avg(values: list) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def report(entries: list[dict]) -> None:
+    """Per-framework wire summary: round-trips, prompt sizes, tokens, waits."""
+    chats  = [e for e in entries if e["method"] == "POST" and "messages" in e]
+    groups = defaultdict(list)
+    for e in chats:
+        groups[e.get("framework") or e["client"]].append(e)
+
+    def fmt(v, spec):
+        return format(v, spec) if v is not None else "-"
+
+    print()
+    print(SEP)
+    print(f"  WIRE TRACE  ({len(chats)} chat requests)")
+    print(SEP)
+    for name, rows in groups.items():
+        questions = defaultdict(list)
+        for e in rows:
+            questions[e.get("mark") or e.get("first_user")].append(e)
+        firsts = [qs[0]["gap"] for qs in questions.values()]
+        gaps   = [e["gap"] for qs in questions.values() for e in qs[1:]]
+        print(f"  {name}  ({rows[0]['client']}, {rows[0]['path']})")
+        print(f"    round-trips/Q    : {len(rows) / len(questions):.2f}  ({len(rows)} requests, {len(questions)} questions)")
+        print(f"    request bytes    : {fmt(_avg([e['req_bytes'] for e in rows]), ',.0f')} avg"
+              f"  (system prompt {fmt(_avg([e['system_chars'] for e in rows]), ',.0f')} chars,"
+              f" {fmt(_avg([e['tools'] for e in rows]), '.1f')} tools / {fmt(_avg([e['tools_bytes'] for e in rows]), ',.0f')} B schema)")
+        print(f"    history chars    : {fmt(_avg([e['history_chars'] for e in rows]), ',.0f')} avg,"
+              f" {fmt(_avg([e['messages'] for e in rows]), '.1f')} messages")
+        print(f"    prompt tokens    : {fmt(_avg([e.get('prompt_tokens') for e in rows]), ',.0f')} avg/call,"
+              f" eval {fmt(_avg([e.get('eval_tokens') for e in rows]), ',.0f')}")
+        print(f"    response bytes   : {fmt(_avg([e['resp_bytes'] for e in rows]), ',.0f')} avg")
+        print(f"    upstream TTFB    : {fmt(_avg([e['ttfb'] for e in rows]), '.3f')}s avg,"
+              f" request {fmt(_avg([e['duration'] for e in rows]), '.3f')}s")
+        print(f"    before 1st call  : {fmt(_avg(firsts), '.3f')}s  (question start -> first byte out)")
+        print(f"    between calls    : {fmt(_avg(gaps), '.3f')}s  (response end -> next request)")
+    print()
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ProxyServer"
+
+    def log_message(self, format, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        self._handle()
+
+    def do_POST(self) -> None:
+        self._handle()
+
+    def do_DELETE(self) -> None:
+        self._handle()
+
+    # -- plumbing -------------------------------------------------------------
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, status: int, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: bytes) -> None:
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    def _end_stream(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    # -- modes ----------------------------------------------------------------
+
+    def _handle(self) -> None:
+        t_start = time.perf_counter()
+        body    = self._read_body()
+        if self.path == HEALTH_PATH:
+            self._send(200, "application/json", json.dumps({"mode": self.server.mode}).encode())
+            return
+        if self.path == MARK_PATH:
+            if self.server.trace is not None:
+                self.server.trace.set_mark(json.loads(body or b"{}"))
+            self._send(200, "application/json", b"{}")
+            return
+        if self.server.mode == "trace":
+            self._forward(None, body, t_start)
+            return
+        key = request_key(self.command, self.path, body)
+        if self.server.mode == "replay":
+            self._replay(key)
+        else:
+            self._forward(key, body)
+
+    def _forward(self, key: Optional[str], body: bytes, t_start: Optional[float] = None) -> None:
+        up      = self.server.upstream
+        conn    = http.client.HTTPConnection(up.hostname, up.port or 80, timeout=self.server.timeout_s)
+        headers = {h: self.headers[h] for h in FORWARD_HEADERS if self.headers.get(h)}
+        try:
+            conn.request(self.command, self.path, body=body or None, headers=headers)
+            t0   = time.perf_counter()
+            resp = conn.getresponse()
+        except OSError as e:
+            conn.close()
+            msg = json.dumps({"error": f"upstream {up.geturl()} unreachable: {e}"}).encode()
+            self._send(502, "application/json", msg)
+            return
+
+        content_type = resp.getheader("Content-Type", "application/json")
+        chunks = []
+        self._start_stream(resp.status, content_type)
+        try:
+            while data := resp.read1(65536):
+                chunks.append([round(time.perf_counter() - t0, 6), data.decode("utf-8", "surrogateescape")])
+                self._write_chunk(data)
+        finally:
+            conn.close()
+
+        # persist before closing the stream so a finished request is on disk
+        if self.server.mode == "trace":
+            self.server.trace.log(
+                self.command, self.path, self.headers.get("User-Agent", "-"), body, resp.status,
+                "".join(text for _, text in chunks), t_start, chunks[0][0] if chunks else None,
+                time.perf_counter(),
+            )
+            self._end_stream()
+            return
+        self.server.cassette.record({
+            "key": key,
+            "method": self.command,
+            "path": self.path,
+            "status": resp.status,
+            "content_type": content_type,
+            "chunks": chunks,
+        })
+        self._end_stream()
+
+    def _replay(self, key: str) -> None:
+        entry = self.server.cassette.lookup(key)
+        if entry is None:
+            msg = json.dumps({"error": f"cassette miss for {self.command} {self.path} ({key})"}).encode()
+            self._send(404, "application/json", msg)
+            return
+
+        realtime = self.server.timing == "original"
+        t0       = time.perf_counter()
+        self._start_stream(entry["status"], entry["content_type"])
+        for offset, text in entry["chunks"]:
+            if realtime:
+                delay = offset - (time.perf_counter() - t0)
+                if delay > 0:
+                    time.sleep(delay)
+            self._write_chunk(text.encode("utf-8", "surrogateescape"))
+        self._end_stream()
+
+
+class ProxyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        mode: str,
+        cassette: Optional[Cassette],
+        upstream: str = "http://localhost:11434",
+        timing: str = "original",
+        timeout_s: float = 600.0,
+        verbose: bool = False,
+        trace: Optional[WireTrace] = None,
+    ) -> None:
+        super().__init__(address, ProxyHandler)
+        self.mode      = mode
+        self.cassette  = cassette
+        self.trace     = trace
+        self.upstream  = urlsplit(upstream)
+        self.timing    = timing
+        self.timeout_s = timeout_s
+        self.verbose   = verbose
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_proxy(
+    mode: str,
+    cassette: str | Path | None = None,
+    upstream: str = "http://localhost:11434",
+    timing: str = "original",
+    port: int = 0,
+    host: str = "127.0.0.1",
+    trace: str | Path | None = None,
+) -> ProxyServer:
+    """Start a proxy on a daemon thread and return it (see ``.url``)."""
+    server = ProxyServer(
+        (host, port), mode, Cassette(Path(cassette)) if cassette else None,
+        upstream=upstream, timing=timing, trace=WireTrace(Path(trace)) if trace else None,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["record", "replay", "trace", "report"])
+    parser.add_argument("--cassette", type=Path, help="gzip'd JSONL cassette file (record/replay)")
+    parser.add_argument("--trace", type=Path, default=Path("traces/wire.jsonl"),
+                        help="JSONL wire log (trace/report, default traces/wire.jsonl)")
+    parser.add_argument("--upstream", default="http://localhost:11434", help="model endpoint to forward to")
+    parser.add_argument("--timing", choices=["original", "none"], default="original",
+                        help="replay chunks at their recorded offsets, or as fast as possible")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    if args.mode == "report":
+        if not args.trace.exists():
+            parser.error(f"trace not found: {args.trace}")
+        report(load_trace(args.trace))
+        return
+    if args.mode in ("record", "replay") and args.cassette is None:
+        parser.error(f"{args.mode} needs --cassette")
+    if args.mode == "replay" and not args.cassette.exists():
+        parser.error(f"cassette not found: {args.cassette}")
+
+    cassette = Cassette(args.cassette) if args.mode != "trace" else None
+    trace    = WireTrace(args.trace) if args.mode == "trace" else None
+    server   = ProxyServer(
+        (args.host, args.port), args.mode, cassette,
+        upstream=args.upstream, timing=args.timing, verbose=args.verbose, trace=trace,
+    )
+    target = args.upstream if args.mode != "replay" else f"{len(cassette)} recorded exchanges"
+    print(f"  {args.mode} proxy on {server.url} -> {target}", flush=True)
+    # run_all.sh stops background servers with SIGTERM (SIGINT is ignored there)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if trace is not None:
+            print(f"  trace: {trace.requests} requests logged to {trace.path}")
+        else:
+            print(f"  {args.mode}: {cassette.recorded} recorded, {cassette.hits} hits, {cassette.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
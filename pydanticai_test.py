@@ -5,14 +5,24 @@
 """Benchmark: Pydantic AI (Ollama provider) tool calling."""
 
 import json
-import asyncio
-import os
-import sys
 import time
+from contextlib import asynccontextmanager
+from dataclasses import replace
+import httpx
 from pydantic_ai import Agent
-from utils import MODEL, QUESTIONS, SEP, setup_db, make_query_runner, print_summary, append_log
-
-os.environ.setdefault("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+from pydantic_ai.exceptions import UsageLimitExceeded
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, ToolReturnPart
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.providers.ollama import OllamaProvider
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import UsageLimits
+from compaction import compacting, enabled, older
+from harness import Adapter, run_script
+from residency import sampling
+from timing import current_log, new_log, span, stream_metrics
+from transport import async_http_client
+from utils import MODEL, OLLAMA_HOST, SEP, setup_db, make_query_runner
 
 con    = setup_db()
 _run_q = make_query_runner(con)
@@ -35,14 +45,71 @@ def run_duckdb_query(sql: str) -> str:
     return _run_q(sql)
 
 
-agent = Agent(
-    f"ollama:{MODEL}",
-    instructions=(
-        "You are a data analyst. Use run_duckdb_query to answer questions. "
-        "Always query the database - never guess numbers."
-    ),
-    tools=[run_duckdb_query],
-)
+def _usage_attrs(usage) -> dict:
+    """Token counts from a pydantic-ai usage object (field names vary by version)."""
+    prompt = getattr(usage, "input_tokens", None) or getattr(usage, "request_tokens", None)
+    output = getattr(usage, "output_tokens", None) or getattr(usage, "response_tokens", None)
+    return {"prompt_tokens": prompt, "eval_tokens": output}
+
+
+class TimedModel(WrapperModel):
+    """Wraps the Ollama model so every round-trip is recorded as an LLM span."""
+
+    async def request(self, *args, **kwargs):
+        with span("llm") as llm_span:
+            response = await super().request(*args, **kwargs)
+            llm_span.update(_usage_attrs(getattr(response, "usage", None)))
+        return response
+
+    @asynccontextmanager
+    async def request_stream(self, *args, **kwargs):
+        """Streamed round-trip; ``run_test`` stamps its tokens on the open span."""
+        log   = current_log()
+        key   = object()
+        usage = {}
+        if log is not None:
+            log.begin(key, "llm")
+        try:
+            async with super().request_stream(*args, **kwargs) as stream:
+                yield stream
+            usage = _usage_attrs(stream.usage())
+        finally:
+            if log is not None:
+                log.end(key, **usage)
+
+
+def compact_history(messages: list[ModelMessage]) -> list[ModelMessage]:
+    """History processor: shorten tool returns the model has already answered (``--compact``)."""
+    if not enabled():
+        return messages
+    roles = ["response" if isinstance(m, ModelResponse) else "request" for m in messages]
+    idx   = set(older(roles, tool="request", model="response"))
+    if not any(isinstance(p, ToolReturnPart) for i in idx for p in messages[i].parts):
+        return messages
+    with compacting() as run:
+        return [
+            replace(m, parts=[
+                replace(p, content=run(p.content)) if isinstance(p, ToolReturnPart) and isinstance(p.content, str) else p
+                for p in m.parts
+            ]) if i in idx and isinstance(m, ModelRequest) else m
+            for i, m in enumerate(messages)
+        ]
+
+
+def build_agent(client: httpx.AsyncClient) -> Agent:
+    # Same connection pool policy as every other benchmark (transport.py)
+    provider = OllamaProvider(base_url=f"{OLLAMA_HOST}/v1", http_client=client)
+    return Agent(
+        TimedModel(OpenAIChatModel(MODEL, provider=provider)),
+        instructions=(
+            "You are a data analyst. Use run_duckdb_query to answer questions. "
+            "Always query the database - never guess numbers."
+        ),
+        tools=[run_duckdb_query],
+        # OpenAI-compatible path: only sampling can be pinned (residency.py)
+        model_settings=ModelSettings(**sampling()),
+        history_processors=[compact_history],
+    )
 
 
 def _parse_tool_args(raw_args) -> dict:
@@ -60,27 +127,38 @@ def _parse_tool_args(raw_args) -> dict:
     return {}
 
 
-async def run_test(question: str) -> dict:
+async def run_test(
+    question: str, agent: Agent, max_iterations: int | None = None, history: list | None = None
+) -> dict:
+    """Answer one question; ``history`` (a session's messages) goes in first and is updated in place."""
     print()
     print(SEP)
     print(f"  Q: {question}")
     print(SEP)
 
-    t0 = time.time()
-    ttft = None
+    log    = new_log()
+    limits = UsageLimits(request_limit=max_iterations) if max_iterations else None
+    t0     = time.time()
     result = None
-    async for event in agent.run_stream_events(question):
-        if ttft is None and event.__class__.__name__ != "AgentRunResultEvent":
-            ttft = time.time() - t0
-        if hasattr(event, "result"):
-            result = event.result
+    try:
+        async for event in agent.run_stream_events(question, usage_limits=limits, message_history=history or None):
+            if event.__class__.__name__ in ("PartStartEvent", "PartDeltaEvent"):
+                log.tick()              # model output arriving on the open LLM span
+            if hasattr(event, "result"):
+                result = event.result
+    except UsageLimitExceeded:
+        print()
+        print("  [!] Max iterations reached.")
     elapsed = time.time() - t0
+    ttft    = stream_metrics(log.spans).get("ttft")
 
     if result is None:
-        return {"success": False, "tool_calls": 0, "ttft": ttft, "time": elapsed}
+        return {"success": False, "tool_calls": 0, "ttft": ttft, "time": elapsed, "spans": log.spans}
 
+    if history is not None:
+        history[:] = result.all_messages()
     tool_calls_made = 0
-    for msg in result.all_messages():
+    for msg in result.new_messages():
         for part in getattr(msg, "parts", []):
             kind = getattr(part, "part_kind", "")
             if kind == "tool-call":
@@ -104,26 +182,37 @@ async def run_test(question: str) -> dict:
         "tool_calls": tool_calls_made,
         "ttft": ttft,
         "time": elapsed,
+        "answer": answer,
+        "spans": log.spans,
     }
 
 
-async def main() -> None:
-    results, times, ttfts = [], [], []
-    for q in QUESTIONS:
-        r = await run_test(q)
-        results.append(r)
-        times.append(r["time"])
-        if r.get("ttft") is not None:
-            ttfts.append(r["ttft"])
+class PydanticAIAdapter(Adapter):
+    name     = "pydantic_ai"
+    label    = f"Pydantic AI ({MODEL})"
+    is_async = True
 
-    print_summary(f"Pydantic AI ({MODEL})", results, times, ttfts or None)
-    append_log("pydantic_ai", results, times, ttfts or None)
-    con.close()
+    def __init__(self) -> None:
+        self.client = None
+        self._stale: list[httpx.AsyncClient] = []
 
+    def build(self) -> None:
+        if self.client is not None:     # --lifecycle fresh: closed on the loop, in open_session
+            self._stale.append(self.client)
+        self.client = async_http_client()
+        self.agent  = build_agent(self.client)
 
-if __name__ == "__main__":
-    if os.getenv("BENCH_WARMUP"):
-        print("  (packages ready)")
-        sys.exit(0)
+    async def open_session(self) -> list:
+        while self._stale:
+            await self._stale.pop().aclose()
+        return []
+
+    async def run(self, question: str, max_iterations: int | None = None, session: list | None = None) -> dict:
+        return await run_test(question, self.agent, max_iterations, session)
+
+    def close(self) -> None:
+        con.close()
 
-    asyncio.run(main())
+
+if __name__ == "__main__":
+    run_script(PydanticAIAdapter(), __doc__)
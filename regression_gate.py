@@ -0,0 +1,197 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["duckdb"]
+# ///
+"""Performance regression gate against a pinned baseline per framework.
+
+    uv run regression_gate.py pin <run-or-session>       # pin baseline(s)
+    uv run regression_gate.py check [<run-or-session>]   # default: latest
+
+``check`` compares each framework in the candidate against its pinned
+baseline and exits 1 if any metric regresses.  A metric regresses only when
+it is both worse by more than its threshold *and* statistically significant:
+
+- p50 latency, TTFT, tool calls/question: one-sided Mann-Whitney U test
+  (candidate stochastically larger) with p < alpha;
+- p95 latency: the bootstrap CI of (candidate p95 - baseline p95) lies
+  entirely above the threshold.
+
+A baseline of 0 (no tool calls, say) has no relative change, so there the
+absolute difference is compared with ``--abs-time`` / ``--abs-calls``.
+
+Runs need several samples per side (``--iterations``) for the tests to
+have power; with one pass over five questions nothing can be significant.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from results_db import RESULTS_DB, SEP, connect, resolve
+from stats import bootstrap_diff_ci, mann_whitney_greater, percentile
+
+EXIT_OK, EXIT_REGRESSED, EXIT_USAGE = 0, 1, 2
+
+
+def _samples(con, run_ids: list[str], framework: str) -> dict:
+    rows = con.execute(
+        "SELECT time, ttft, tool_calls FROM questions WHERE list_contains(?, run_id) AND framework = ?",
+        [run_ids, framework],
+    ).fetchall()
+    return {
+        "time":  [r[0] for r in rows],
+        "ttft":  [r[1] for r in rows if r[1] is not None],
+        "calls": [float(r[2]) for r in rows],
+    }
+
+
+def _median(v: list[float]) -> float:
+    return percentile(v, 50)
+
+
+def _p95(v: list[float]) -> float:
+    return percentile(v, 95)
+
+
+def _mean(v: list[float]) -> float:
+    return sum(v) / len(v)
+
+
+def evaluate(base: dict, cand: dict, thresholds: dict, absolute: dict, alpha: float) -> list[dict]:
+    """One verdict row per metric with at least one sample on both sides."""
+    checks = []
+    for metric, key, stat in (
+        ("p50 latency", "time", _median),
+        ("p95 latency", "time", _p95),
+        ("TTFT p50", "ttft", _median),
+        ("tool calls/Q", "calls", _mean),
+    ):
+        a, b = base[key], cand[key]
+        if not a or not b:
+            continue
+        sa, sb = stat(a), stat(b)
+        if sa:
+            change, limit = (sb - sa) / sa, thresholds[metric]
+        else:                       # nothing to be relative to: absolute difference
+            change, limit = sb - sa, absolute[metric]
+        if metric == "p95 latency":
+            lo, _ = bootstrap_diff_ci(a, b, stat=_p95)
+            evidence    = f"CI lo {lo:+.3f}"
+            significant = (lo / sa if sa else lo) > limit
+        else:
+            p           = mann_whitney_greater(a, b)
+            evidence    = f"p={p:.4f}"
+            significant = p < alpha
+        checks.append({
+            "metric": metric, "base": sa, "cand": sb, "change": change, "limit": limit,
+            "relative": bool(sa), "evidence": evidence, "regressed": change > limit and significant,
+            "n": (len(a), len(b)),
+        })
+    return checks
+
+
+def pin(selector: str) -> int:
+    with connect() as con:
+        ids  = resolve(con, selector)
+        runs = con.execute(
+            "SELECT framework, run_id FROM runs WHERE list_contains(?, run_id) "
+            "AND run_id IN (SELECT run_id FROM questions) ORDER BY ts",
+            [ids],
+        ).fetchall()
+        if not runs:
+            print(f"  no measured questions in {selector!r}")
+            return EXIT_USAGE
+        now = datetime.now()
+        for framework, run_id in runs:     # latest run per framework wins
+            con.execute("INSERT OR REPLACE INTO baselines VALUES (?, ?, ?)", [framework, run_id, now])
+            print(f"  pinned {framework:<14} -> {run_id}")
+    return EXIT_OK
+
+
+def check(selector: str, thresholds: dict, absolute: dict, alpha: float) -> int:
+    with connect() as con:
+        ids        = resolve(con, selector)
+        frameworks = [r[0] for r in con.execute(
+            "SELECT DISTINCT framework FROM questions WHERE list_contains(?, run_id) ORDER BY 1", [ids],
+        ).fetchall()]
+        baselines  = dict(con.execute("SELECT framework, run_id FROM baselines").fetchall())
+
+        print()
+        print(SEP)
+        print(f"  REGRESSION GATE  ({selector}, alpha={alpha})")
+        print(SEP)
+        compared, regressed = 0, []
+        for fw in frameworks:
+            if fw not in baselines:
+                print(f"  {fw:<14} no pinned baseline - skipped (regression_gate.py pin ...)")
+                continue
+            if baselines[fw] in ids:
+                print(f"  {fw:<14} candidate is the baseline - skipped")
+                continue
+            compared += 1
+            base = _samples(con, [baselines[fw]], fw)
+            cand = _samples(con, ids, fw)
+            print(f"  {fw}  (baseline {baselines[fw]})")
+            for c in evaluate(base, cand, thresholds, absolute, alpha):
+                flag = "REGRESSED" if c["regressed"] else "ok"
+                if c["relative"]:
+                    change = f"{c['change']:+7.1%} (limit {c['limit']:+.0%}"
+                else:
+                    change = f"{c['change']:+7.3f} (limit {c['limit']:+.3f} abs"
+                print(
+                    f"    {c['metric']:<13} {c['base']:8.3f} -> {c['cand']:8.3f}  {change}"
+                    f", {c['evidence']}, n={c['n'][0]}/{c['n'][1]})  {flag}"
+                )
+                if c["regressed"]:
+                    regressed.append(f"{fw} {c['metric']}")
+    print()
+    if not compared:
+        print("  nothing compared")
+        return EXIT_USAGE
+    if regressed:
+        print(f"  FAIL: {', '.join(regressed)}")
+        return EXIT_REGRESSED
+    print("  PASS")
+    return EXIT_OK
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub    = parser.add_subparsers(dest="cmd", required=True)
+    p_pin  = sub.add_parser("pin", help="pin a run/session as the baseline for its framework(s)")
+    p_pin.add_argument("selector")
+    p_chk  = sub.add_parser("check", help="compare a run/session against the pinned baselines")
+    p_chk.add_argument("selector", nargs="?", default="latest")
+    p_chk.add_argument("--alpha", type=float, default=0.05, help="significance level (default 0.05)")
+    p_chk.add_argument("--max-p50", type=float, default=0.10, help="allowed relative p50 increase")
+    p_chk.add_argument("--max-p95", type=float, default=0.15, help="allowed relative p95 increase")
+    p_chk.add_argument("--max-ttft", type=float, default=0.15, help="allowed relative TTFT increase")
+    p_chk.add_argument("--max-calls", type=float, default=0.25, help="allowed relative tool-call increase")
+    p_chk.add_argument("--abs-time", type=float, default=0.05,
+                       help="allowed latency/TTFT increase in seconds over a 0 baseline (default 0.05)")
+    p_chk.add_argument("--abs-calls", type=float, default=0.5,
+                       help="allowed tool calls/question increase over a 0 baseline (default 0.5)")
+    args = parser.parse_args()
+
+    if args.cmd == "pin":
+        sys.exit(pin(args.selector))
+    if not RESULTS_DB.exists():
+        print(f"  no results store at {RESULTS_DB}")
+        sys.exit(EXIT_USAGE)
+    thresholds = {
+        "p50 latency":  args.max_p50,
+        "p95 latency":  args.max_p95,
+        "TTFT p50":     args.max_ttft,
+        "tool calls/Q": args.max_calls,
+    }
+    absolute = {
+        "p50 latency":  args.abs_time,
+        "p95 latency":  args.abs_time,
+        "TTFT p50":     args.abs_time,
+        "tool calls/Q": args.abs_calls,
+    }
+    sys.exit(check(args.selector, thresholds, absolute, args.alpha))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Model residency: one set of model options, preloading, and cold vs warm questions.
+
+Ollama keeps a model loaded for ``keep_alive`` after its last request.  It
+loads it again whenever a request asks for different runner options, above
+all a different ``num_ctx``.  Left alone, whichever benchmark runs first pays
+the load.  And two frameworks that send different options make Ollama
+reload on every switch between them.  Every adapter takes its settings from
+here:
+
+- ``BENCH_KEEP_ALIVE``: how long the model stays loaded (default ``30m``)
+- ``BENCH_NUM_CTX``: context size (default: the server's)
+- ``BENCH_TEMPERATURE``, ``BENCH_SEED``: sampling (default 0 and 42)
+
+The native API (raw client, ChatOllama) carries all four.  The
+OpenAI-compatible path (ADK through LiteLLM, Pydantic AI) only carries
+temperature and seed; Ollama gives it the server's ``OLLAMA_CONTEXT_LENGTH``
+and ``OLLAMA_KEEP_ALIVE``.  Set ``BENCH_NUM_CTX`` only together with the
+same ``OLLAMA_CONTEXT_LENGTH`` on the server, or the two paths keep evicting
+each other.
+
+``--model-state warm`` (default) loads the model with these options before
+the first question, outside the timing.  ``cold`` unloads it before every
+question, so each one pays a full load.  ``ResidencyProbe`` asks
+``/api/ps`` around every question and tags the result's ``model_state``:
+
+- ``cold``:   the model was not loaded when the question started;
+- ``reload``: it was, but got loaded again during the question (a native
+  call reported more than ``RELOAD_SECS`` of ``load_duration``, or the
+  context size changed);
+- ``warm``:   neither.
+"""
+
+import os
+import time
+from typing import Optional
+
+import httpx
+
+from memory import MemoryProbe
+from transport import TIMEOUT
+from utils import BACKEND, MODEL, OLLAMA_HOST
+
+KEEP_ALIVE  = os.getenv("BENCH_KEEP_ALIVE", "30m")
+NUM_CTX     = int(os.getenv("BENCH_NUM_CTX", "0")) or None
+TEMPERATURE = float(os.getenv("BENCH_TEMPERATURE", "0"))
+SEED        = int(os.getenv("BENCH_SEED", "42"))
+# A native call that spent longer than this in load_duration (re)loaded the model
+RELOAD_SECS = 0.5
+# Backends that answer /api/ps and /api/generate (a replayed cassette does not)
+TRACKED     = BACKEND in ("ollama", "mock")
+
+
+def sampling() -> dict:
+    """Sampling settings every path can send."""
+    return {"temperature": TEMPERATURE, "seed": SEED}
+
+
+def model_options() -> dict:
+    """Ollama ``options`` for the native API: sampling plus the pinned context size."""
+    return {**sampling(), "num_ctx": NUM_CTX} if NUM_CTX else sampling()
+
+
+def describe() -> str:
+    ctx = NUM_CTX or "server default"
+    return f"keep_alive {KEEP_ALIVE}, num_ctx {ctx}, temperature {TEMPERATURE:g}, seed {SEED}"
+
+
+def _api() -> httpx.Client:
+    # no trace hook: these requests are not part of any question
+    return httpx.Client(base_url=OLLAMA_HOST, timeout=TIMEOUT)
+
+
+def resident() -> Optional[dict]:
+    """``/api/ps`` entry of the benchmark model, or ``None`` when it is not loaded."""
+    with _api() as api:
+        models = api.get("/api/ps").raise_for_status().json().get("models") or []
+    names = (MODEL, f"{MODEL}:latest")
+    return next((m for m in models if m.get("name") in names or m.get("model") in names), None)
+
+
+def load() -> float:
+    """Load the model with the pinned options; seconds Ollama spent loading."""
+    body = {"model": MODEL, "keep_alive": KEEP_ALIVE, "options": model_options()}
+    with _api() as api:
+        reply = api.post("/api/generate", json=body).raise_for_status().json()
+    return (reply.get("load_duration") or 0) / 1e9
+
+
+def unload() -> None:
+    with _api() as api:
+        api.post("/api/generate", json={"model": MODEL, "keep_alive": 0}).raise_for_status()
+
+
+def warm_up() -> bool:
+    """Load the model before anything is measured; ``False`` when the server cannot say."""
+    if not TRACKED:
+        return False
+    t0 = time.perf_counter()
+    try:
+        secs = load()
+    except httpx.HTTPError as e:
+        print(f"  (model residency not tracked: {e})")
+        return False
+    print(f"  Model warm-up    : {MODEL} ready in {time.perf_counter() - t0:.2f}s (load {secs:.2f}s; {describe()})")
+    return True
+
+
+def model_state(before: Optional[dict], after: Optional[dict], spans: list[dict]) -> str:
+    if before is None:
+        return "cold"
+    loads = [s.get("load") or 0.0 for s in spans if s["kind"] == "llm"]
+    if max(loads, default=0.0) > RELOAD_SECS:
+        return "reload"
+    if after is not None and before.get("context_length") != after.get("context_length"):
+        return "reload"
+    return "warm"
+
+
+class ResidencyProbe:
+    """``MemoryProbe`` stand-in that also controls and records model residency."""
+
+    def __init__(self, inner: MemoryProbe, mode: str = "warm") -> None:
+        self.inner   = inner
+        self.mode    = mode
+        self.enabled = TRACKED
+        self._before: Optional[dict] = None
+
+    def _call(self, fn, *args):
+        """Run a residency request; the first failure turns residency tracking off."""
+        try:
+            return fn(*args)
+        except httpx.HTTPError as e:
+            print(f"  (model residency not tracked: {e})")
+            self.enabled = False
+            return None
+
+    def start(self) -> None:
+        if self.enabled and self.mode == "warm":
+            self.enabled = warm_up()
+        self.inner.start()
+
+    def before(self) -> None:
+        if self.enabled and self.mode == "cold":
+            self._call(unload)
+        self._before = self._call(resident) if self.enabled else None
+        self.inner.before()
+
+    def after(self, r: dict, measured: bool = True) -> None:
+        self.inner.after(r, measured)
+        if not self.enabled:
+            return
+        after = self._call(resident)
+        if measured and self.enabled:
+            r["model_state"] = model_state(self._before, after, r.get("spans") or [])
+            if after and after.get("context_length"):
+                r["num_ctx"] = after["context_length"]
+
+    def stop(self) -> list[dict]:
+        return self.inner.stop()
@@ -0,0 +1,515 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["duckdb"]
+# ///
+"""Structured results store (DuckDB) and run comparison.
+
+Every benchmark run is written to ``bench_results.duckdb`` next to the text
+log: one row in ``runs`` (metadata, framework versions), one row per measured
+question in ``questions`` and one row per LLM/tool span in ``spans``.
+Concurrency sweeps land in ``scaling``, open-loop rates in ``open_loop``,
+cold-start trials in ``startup``
+and ``--memory`` top allocators in ``allocations``; ``baselines`` holds the
+run pinned per framework for ``regression_gate.py``.
+
+    uv run results_db.py list
+    uv run results_db.py compare <run-or-session> <run-or-session>
+    uv run results_db.py compaction <run-without> <run-with-compact>
+    uv run results_db.py sql "SELECT framework, median(time) FROM questions GROUP BY ALL"
+
+A selector is a run id (or unique prefix), a ``session`` id shared by all
+frameworks of one ``run_all.sh`` invocation, or ``latest``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import uuid
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+from stats import percentile
+from timing import compaction_stats, phase_breakdown, prefix_stats, stream_metrics, turn_prompts
+
+RESULTS_DB = Path(os.getenv("BENCH_RESULTS_DB", Path(__file__).parent / "bench_results.duckdb"))
+SEP        = chr(9552) * 62
+
+# Installed versions worth tracking across upgrades (missing ones are skipped)
+TRACKED_PACKAGES = (
+    "ollama", "duckdb", "google-adk", "litellm", "pydantic-ai", "pydantic-ai-slim",
+    "deepagents", "langgraph", "langchain-ollama", "langchain-core",
+)
+SPAN_COLUMNS   = ("prompt_tokens", "eval_tokens", "load", "prompt_eval", "eval")
+MEMORY_COLUMNS = ("rss", "peak_rss", "py_peak", "py_retained")
+QUESTION_COLUMNS = (
+    "run_id", "framework", "question", "iteration", "success", "tool_calls", "time", "ttft",
+    "llm", "tool", "other", "llm_calls", "prompt_tokens", "eval_tokens", *MEMORY_COLUMNS,
+    "itl_p50", "itl_p99", "decode_tps", "qid", "tags", "model_state", "num_ctx", "prefix_reuse",
+    "lifecycle", "setup", "teardown", "correct", "sql_ok", "prompt_chars", "prompt_eval", "compacted",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id    VARCHAR PRIMARY KEY,
+    session   VARCHAR,
+    ts        TIMESTAMP,
+    framework VARCHAR,
+    model     VARCHAR,
+    backend   VARCHAR,
+    host      VARCHAR,
+    python    VARCHAR,
+    versions  JSON,
+    argv      VARCHAR,
+    dataset   VARCHAR
+);
+CREATE TABLE IF NOT EXISTS questions (
+    run_id        VARCHAR,
+    framework     VARCHAR,
+    question      VARCHAR,
+    iteration     INTEGER,
+    success       BOOLEAN,
+    tool_calls    INTEGER,
+    time          DOUBLE,
+    ttft          DOUBLE,
+    llm           DOUBLE,
+    tool          DOUBLE,
+    other         DOUBLE,
+    llm_calls     INTEGER,
+    prompt_tokens BIGINT,
+    eval_tokens   BIGINT,
+    rss           DOUBLE,
+    peak_rss      DOUBLE,
+    py_peak       DOUBLE,
+    py_retained   DOUBLE,
+    itl_p50       DOUBLE,
+    itl_p99       DOUBLE,
+    decode_tps    DOUBLE,
+    qid           VARCHAR,
+    tags          VARCHAR[],
+    model_state   VARCHAR,
+    num_ctx       INTEGER,
+    prefix_reuse  DOUBLE,
+    lifecycle     VARCHAR,
+    setup         DOUBLE,
+    teardown      DOUBLE,
+    correct       BOOLEAN,
+    sql_ok        BOOLEAN,
+    prompt_chars  BIGINT,
+    prompt_eval   DOUBLE,
+    compacted     BIGINT
+);
+CREATE TABLE IF NOT EXISTS spans (
+    run_id        VARCHAR,
+    question      VARCHAR,
+    iteration     INTEGER,
+    kind          VARCHAR,
+    start         DOUBLE,
+    duration      DOUBLE,
+    prompt_tokens BIGINT,
+    eval_tokens   BIGINT,
+    load          DOUBLE,
+    prompt_eval   DOUBLE,
+    eval          DOUBLE,
+    attrs         JSON
+);
+CREATE TABLE IF NOT EXISTS baselines (
+    framework VARCHAR PRIMARY KEY,
+    run_id    VARCHAR,
+    pinned_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS scaling (
+    run_id      VARCHAR,
+    framework   VARCHAR,
+    concurrency INTEGER,
+    jobs        INTEGER,
+    passed      INTEGER,
+    wall        DOUBLE,
+    throughput  DOUBLE,
+    p50         DOUBLE,
+    p95         DOUBLE,
+    p99         DOUBLE,
+    correct     INTEGER,
+    goodput     DOUBLE
+);
+CREATE TABLE IF NOT EXISTS open_loop (
+    run_id      VARCHAR,
+    framework   VARCHAR,
+    arrivals    VARCHAR,
+    rate        DOUBLE,
+    sent        INTEGER,
+    passed      INTEGER,
+    wall        DOUBLE,
+    throughput  DOUBLE,
+    goodput     DOUBLE,
+    queue_p50   DOUBLE,
+    queue_p95   DOUBLE,
+    service_p50 DOUBLE,
+    service_p95 DOUBLE,
+    time_p50    DOUBLE,
+    time_p95    DOUBLE,
+    time_p99    DOUBLE,
+    correct     INTEGER,
+    offered     DOUBLE
+);
+CREATE TABLE IF NOT EXISTS allocations (
+    run_id VARCHAR,
+    rank   INTEGER,
+    "where" VARCHAR,
+    size   DOUBLE,
+    count  BIGINT
+);
+CREATE TABLE IF NOT EXISTS startup (
+    run_id     VARCHAR,
+    framework  VARCHAR,
+    trial      INTEGER,
+    spawn      DOUBLE,
+    shared     DOUBLE,
+    import     DOUBLE,
+    build      DOUBLE,
+    answer     DOUBLE,
+    rss_shared DOUBLE,
+    rss_import DOUBLE,
+    rss_build  DOUBLE,
+    rss_answer DOUBLE
+);
+"""
+
+# Columns added after a table first shipped; applied to older stores on connect
+MIGRATIONS = """
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS dataset VARCHAR;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS rss DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS peak_rss DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS py_peak DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS py_retained DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS itl_p50 DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS itl_p99 DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS decode_tps DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS qid VARCHAR;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS tags VARCHAR[];
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS model_state VARCHAR;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS num_ctx INTEGER;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS prefix_reuse DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS lifecycle VARCHAR;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS setup DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS teardown DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS correct BOOLEAN;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS sql_ok BOOLEAN;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS prompt_chars BIGINT;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS prompt_eval DOUBLE;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS compacted BIGINT;
+ALTER TABLE scaling ADD COLUMN IF NOT EXISTS correct INTEGER;
+ALTER TABLE scaling ADD COLUMN IF NOT EXISTS goodput DOUBLE;
+ALTER TABLE open_loop ADD COLUMN IF NOT EXISTS correct INTEGER;
+ALTER TABLE open_loop ADD COLUMN IF NOT EXISTS offered DOUBLE;
+"""
+
+
+def connect(path: Path = RESULTS_DB, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    if read_only and not Path(path).exists():
+        sys.exit(f"no results store at {path} - run a benchmark first")
+    con = duckdb.connect(str(path), read_only=read_only)
+    if not read_only:
+        con.execute(SCHEMA)
+        con.execute(MIGRATIONS)
+    return con
+
+
+def package_versions() -> dict:
+    versions = {}
+    for pkg in TRACKED_PACKAGES:
+        try:
+            versions[pkg] = metadata.version(pkg)
+        except metadata.PackageNotFoundError:
+            pass
+    return versions
+
+
+def _new_run(con, framework: str, model: str, backend: str) -> str:
+    now    = datetime.now()
+    run_id = f"{now:%Y%m%d-%H%M%S}-{framework}-{uuid.uuid4().hex[:6]}"
+    con.execute(
+        "INSERT INTO runs (run_id, session, ts, framework, model, backend, host, python, versions, argv, dataset)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            run_id, os.getenv("BENCH_SESSION"), now, framework, model, backend,
+            platform.node(), platform.python_version(), json.dumps(package_versions()),
+            " ".join(sys.argv), os.getenv("BENCH_DATASET"),
+        ],
+    )
+    return run_id
+
+
+def store_run(
+    framework: str, results: list, model: str, backend: str, allocators: Optional[list] = None
+) -> str:
+    """Write one benchmark run (per-question rows, spans, top allocators); return its id."""
+    with connect() as con:
+        run_id = _new_run(con, framework, model, backend)
+        q_rows, s_rows = [], []
+        for r in results:
+            question  = r.get("question", "")
+            iteration = r.get("iteration", 0)
+            spans     = r.get("spans") or []
+            p         = phase_breakdown(spans, r["time"]) if "spans" in r else {}
+            st        = stream_metrics(spans)
+            itl       = st.get("itl") or []
+            chars     = [t["chars"] for t in turn_prompts(spans) if t["chars"] is not None]
+            q_rows.append([
+                run_id, framework, question, iteration, bool(r["success"]), r["tool_calls"],
+                r["time"], r.get("ttft"), p.get("llm"), p.get("tool"), p.get("other"),
+                p.get("llm_calls"), p.get("prompt_tokens"), p.get("eval_tokens"),
+                *(r.get(c) for c in MEMORY_COLUMNS),
+                percentile(itl, 50) if itl else None, percentile(itl, 99) if itl else None,
+                st.get("decode_tps"), r.get("qid"), r.get("tags") or None,
+                r.get("model_state"), r.get("num_ctx"), prefix_stats(spans).get("reuse"),
+                r.get("lifecycle"), r.get("setup"), r.get("teardown"),
+                r.get("correct"), r.get("sql_ok"), sum(chars) if chars else None, p.get("prompt_eval"),
+                compaction_stats(spans).get("chars"),
+            ])
+            for s in spans:
+                extra = {k: v for k, v in s.items() if k not in ("kind", "start", "duration", *SPAN_COLUMNS)}
+                s_rows.append([
+                    run_id, question, iteration, s["kind"], s["start"], s["duration"],
+                    *(s.get(c) for c in SPAN_COLUMNS), json.dumps(extra, default=str),
+                ])
+        if q_rows:
+            con.executemany(
+                f"INSERT INTO questions ({', '.join(QUESTION_COLUMNS)})"
+                f" VALUES ({', '.join('?' * len(QUESTION_COLUMNS))})",
+                q_rows,
+            )
+        if s_rows:
+            con.executemany(f"INSERT INTO spans VALUES ({', '.join('?' * 12)})", s_rows)
+        if allocators:
+            con.executemany(
+                "INSERT INTO allocations VALUES (?, ?, ?, ?, ?)",
+                [[run_id, i, a["where"], a["size"], a["count"]] for i, a in enumerate(allocators, 1)],
+            )
+    return run_id
+
+
+def store_scaling(framework: str, rows: list, model: str, backend: str) -> str:
+    """Write one concurrency sweep; return its run id."""
+    with connect() as con:
+        run_id = _new_run(con, framework, model, backend)
+        con.executemany(
+            "INSERT INTO scaling VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [[run_id, framework, r["concurrency"], r["jobs"], r["passed"], r["wall"],
+              r["throughput"], r["p50"], r["p95"], r["p99"], r["correct"], r["goodput"]] for r in rows],
+        )
+    return run_id
+
+
+OPEN_LOOP_COLUMNS = (
+    "rate", "sent", "passed", "wall", "throughput", "goodput", "queue_p50", "queue_p95",
+    "service_p50", "service_p95", "time_p50", "time_p95", "time_p99", "correct", "offered",
+)
+
+
+def store_load(framework: str, rows: list, arrivals: str, model: str, backend: str) -> str:
+    """Write one open-loop run (a row per offered rate); return its run id."""
+    with connect() as con:
+        run_id = _new_run(con, framework, model, backend)
+        con.executemany(
+            f"INSERT INTO open_loop VALUES ({', '.join('?' * (3 + len(OPEN_LOOP_COLUMNS)))})",
+            [[run_id, framework, arrivals, *(r[c] for c in OPEN_LOOP_COLUMNS)] for r in rows],
+        )
+    return run_id
+
+
+def store_startup(framework: str, trials: list, model: str, backend: str) -> str:
+    """Write the cold-start trials of one framework; return its run id."""
+    cols = ("spawn", "shared", "import", "build", "answer", "rss_shared", "rss_import", "rss_build", "rss_answer")
+    with connect() as con:
+        run_id = _new_run(con, framework, model, backend)
+        con.executemany(
+            f"INSERT INTO startup VALUES ({', '.join('?' * 12)})",
+            [[run_id, framework, i, *(t.get(c) for c in cols)] for i, t in enumerate(trials)],
+        )
+    return run_id
+
+
+# -- querying -----------------------------------------------------------------
+
+def resolve(con, selector: str) -> list[str]:
+    """Run ids matching a run id / prefix, a session id, or ``latest``."""
+    if selector == "latest":
+        row = con.execute("SELECT coalesce(session, run_id) FROM runs ORDER BY ts DESC LIMIT 1").fetchone()
+        if row is None:
+            sys.exit("results store is empty")
+        selector = row[0]
+    ids = [r[0] for r in con.execute(
+        "SELECT run_id FROM runs WHERE session = ? OR run_id = ? OR run_id LIKE ? ORDER BY ts",
+        [selector, selector, selector + "%"],
+    ).fetchall()]
+    if not ids:
+        sys.exit(f"no run or session matches {selector!r}")
+    return ids
+
+
+def distribution(con, run_ids: list[str]) -> dict:
+    """(framework, question) -> latency distribution; question '*' = all."""
+    marks = ", ".join("?" * len(run_ids))
+    sql = f"""
+        SELECT framework, coalesce(question, '*') AS question,
+               count(*)                  AS n,
+               avg(success::INT)         AS pass_rate,
+               quantile_cont(time, 0.5)  AS p50,
+               quantile_cont(time, 0.95) AS p95,
+               avg(time)                 AS mean,
+               quantile_cont(ttft, 0.5)  AS ttft_p50,
+               avg(tool_calls)           AS calls,
+               avg(other)                AS other
+        FROM questions
+        WHERE run_id IN ({marks})
+        GROUP BY GROUPING SETS ((framework, question), (framework))
+    """
+    cur  = con.execute(sql, run_ids)
+    cols = [d[0] for d in cur.description]
+    return {(r[0], r[1]): dict(zip(cols, r)) for r in cur.fetchall()}
+
+
+def _delta(a: Optional[float], b: Optional[float], unit: str = "s", prec: int = 2) -> str:
+    if a is None or b is None:
+        return f"{'-':>23}"
+    pct = f"{(b - a) / a * 100:+6.1f}%" if a else "    n/a"
+    return f"{a:6.{prec}f}->{b:6.{prec}f}{unit} {pct}"
+
+
+def compare(a: str, b: str, path: Path = RESULTS_DB) -> None:
+    with connect(path, read_only=True) as con:
+        ids_a, ids_b = resolve(con, a), resolve(con, b)
+        da, db = distribution(con, ids_a), distribution(con, ids_b)
+        va = con.execute("SELECT framework, versions FROM runs WHERE run_id IN (SELECT unnest(?))", [ids_a]).fetchall()
+        vb = con.execute("SELECT framework, versions FROM runs WHERE run_id IN (SELECT unnest(?))", [ids_b]).fetchall()
+
+    print()
+    print(SEP)
+    print(f"  COMPARE  {a}  ->  {b}")
+    print(SEP)
+    ver_a = {k: v for _, js in va for k, v in json.loads(js).items()}
+    ver_b = {k: v for _, js in vb for k, v in json.loads(js).items()}
+    for pkg in sorted(set(ver_a) | set(ver_b)):
+        if ver_a.get(pkg) != ver_b.get(pkg):
+            print(f"  {pkg:<18}: {ver_a.get(pkg, '-')} -> {ver_b.get(pkg, '-')}")
+
+    keys = sorted(set(da) & set(db), key=lambda k: (k[0], k[1] != "*", k[1]))
+    if not keys:
+        print("  (no framework/question in common)")
+        return
+    print(f"  {'framework / question':<40} {'n':>7}  {'p50':>23}  {'p95':>23}  {'ttft p50':>23}  {'pass':>9}")
+    for fw, q in keys:
+        x, y  = da[(fw, q)], db[(fw, q)]
+        label = fw if q == "*" else f"  {q[:36]}"
+        print(
+            f"  {label:<40} {x['n']:>3}/{y['n']:<3}  {_delta(x['p50'], y['p50'])}  {_delta(x['p95'], y['p95'])}"
+            f"  {_delta(x['ttft_p50'], y['ttft_p50'], prec=3)}  {x['pass_rate']:4.0%}/{y['pass_rate']:<4.0%}"
+        )
+    only = sorted({k[0] for k in set(da) ^ set(db)})
+    if only:
+        print(f"  (only in one side: {', '.join(only)})")
+    print()
+
+
+def compaction(a: str, b: str, min_calls: int = 2, path: Path = RESULTS_DB) -> None:
+    """Prompt size, prompt-eval time and correct answers on multi-call questions, ``a`` -> ``b``.
+
+    Meant for a run without ``--compact`` against one with it: prompt
+    characters and prompt evaluation saved per question, against answers
+    that stopped being correct.
+    """
+    sql = """
+        SELECT framework, count(*) AS n, avg(prompt_chars) AS chars, avg(prompt_tokens) AS tokens,
+               avg(prompt_eval) AS prompt_eval, avg(llm) AS llm, avg(correct::INT) AS correct,
+               avg(compacted) AS compacted
+        FROM questions
+        WHERE run_id IN (SELECT unnest(?)) AND tool_calls >= ?
+        GROUP BY framework
+    """
+    with connect(path, read_only=True) as con:
+        ids_a, ids_b = resolve(con, a), resolve(con, b)
+        cur = con.execute(sql, [ids_a, min_calls])
+        da  = {r[0]: dict(zip([d[0] for d in cur.description], r)) for r in cur.fetchall()}
+        cur = con.execute(sql, [ids_b, min_calls])
+        db  = {r[0]: dict(zip([d[0] for d in cur.description], r)) for r in cur.fetchall()}
+
+    print()
+    print(SEP)
+    print(f"  COMPACTION  {a}  ->  {b}  (questions with >= {min_calls} tool calls)")
+    print(SEP)
+    common = sorted(set(da) & set(db))
+    if not common:
+        print(f"  (no framework has questions with >= {min_calls} tool calls on both sides)")
+        return
+
+    def rate(v: Optional[float]) -> str:
+        return f"{v:4.0%}" if v is not None else f"{'-':>4}"
+
+    print(f"  {'framework':<20} {'n':>7}  {'prompt chars/Q':>23}  {'prompt tokens/Q':>23}"
+          f"  {'prompt eval/Q':>23}  {'llm/Q':>23}  {'correct':>9}")
+    for fw in common:
+        x, y = da[fw], db[fw]
+        print(
+            f"  {fw:<20} {x['n']:>3}/{y['n']:<3}  {_delta(x['chars'], y['chars'], ' ', 0)}"
+            f"  {_delta(x['tokens'], y['tokens'], ' ', 0)}  {_delta(x['prompt_eval'], y['prompt_eval'])}"
+            f"  {_delta(x['llm'], y['llm'])}  {rate(x['correct'])}/{rate(y['correct'])}"
+        )
+        saved = (x["prompt_eval"] or 0) - (y["prompt_eval"] or 0) if y["prompt_eval"] is not None else None
+        gain  = y["correct"] - x["correct"] if x["correct"] is not None and y["correct"] is not None else None
+        print(f"  {'':<20} {'':>7}  " + "; ".join(filter(None, (
+            f"{y['compacted'] or 0:,.0f} chars/Q compacted" if y["compacted"] is not None else "no compaction in b",
+            f"prompt eval saved {saved * 1000:+.0f}ms/Q" if saved is not None else "",
+            f"correct {gain * 100:+.0f} pts" if gain is not None else "",
+        ))))
+    print()
+
+
+def list_runs(limit: int, path: Path = RESULTS_DB) -> None:
+    with connect(path, read_only=True) as con:
+        rows = con.execute("""
+            SELECT r.run_id, r.session, r.ts, r.backend, count(q.run_id), median(q.time), avg(q.success::INT)
+            FROM runs r LEFT JOIN questions q USING (run_id)
+            GROUP BY ALL ORDER BY r.ts DESC LIMIT ?
+        """, [limit]).fetchall()
+    print(f"  {'run_id':<42} {'session':<16} {'backend':<8} {'n':>4} {'p50':>7} {'pass':>5}")
+    for run_id, session, _, backend, n, p50, rate in rows:
+        p50_s  = f"{p50:6.2f}s" if p50 is not None else f"{'-':>7}"
+        rate_s = f"{rate:5.0%}" if rate is not None else f"{'-':>5}"
+        print(f"  {run_id:<42} {session or '-':<16} {backend:<8} {n:>4} {p50_s} {rate_s}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=RESULTS_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="recent runs")
+    p_list.add_argument("-n", type=int, default=20)
+    p_cmp = sub.add_parser("compare", help="diff latency distributions of two runs/sessions")
+    p_cmp.add_argument("a")
+    p_cmp.add_argument("b")
+    p_cpt = sub.add_parser("compaction", help="prompt size, prompt eval and accuracy on multi-call questions, a -> b")
+    p_cpt.add_argument("a")
+    p_cpt.add_argument("b")
+    p_cpt.add_argument("--min-calls", type=int, default=2, help="questions with at least this many tool calls (default 2)")
+    p_sql = sub.add_parser("sql", help="run an ad-hoc query against the store")
+    p_sql.add_argument("query")
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        list_runs(args.n, args.db)
+    elif args.cmd == "compare":
+        compare(args.a, args.b, args.db)
+    elif args.cmd == "compaction":
+        compaction(args.a, args.b, args.min_calls, args.db)
+    else:
+        with connect(args.db, read_only=True) as con:
+            con.sql(args.query).show()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,53 +2,164 @@
 set -euo pipefail
 
 MODEL="qwen3:8b"
-OLLAMA_URL="http://localhost:11434"
+OLLAMA_URL="${OLLAMA_HOST:-http://localhost:11434}"
+
+# Options:
+#   --mock           run against mock_ollama.py instead of a real Ollama (no GPU);
+#                    MOCK_TTFT / MOCK_TOKEN_LATENCY set the simulated model speed,
+#                    MOCK_LOAD_TIME the seconds a (re)load of the model takes
+#   --record FILE    capture all model traffic into a cassette while running
+#   --replay FILE    serve model traffic from a cassette (no Ollama needed);
+#                    REPLAY_TIMING=none drops the recorded chunk delays
+#   --trace FILE     log every model request (bytes, prompt/tool sizes, tokens,
+#                    round-trips per question) and print a wire report at the end
+#   --harness        run all frameworks in one process via harness.py,
+#                    interleaved per question (round-robin)
+# Anything else is passed to every benchmark script, e.g. --concurrency 1,2,4,8
+MOCK=0
+HARNESS=0
+RECORD=""
+REPLAY=""
+TRACE=""
+SCRIPT_ARGS=()
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --mock)    MOCK=1; shift ;;
+        --harness) HARNESS=1; shift ;;
+        --record)  RECORD="$2"; shift 2 ;;
+        --replay)  REPLAY="$2"; shift 2 ;;
+        --trace)   TRACE="$2"; shift 2 ;;
+        *)         SCRIPT_ARGS+=("$1"); shift ;;
+    esac
+done
+
+# Groups the four runs in bench_results.duckdb (results_db.py compare <session>)
+export BENCH_SESSION="${BENCH_SESSION:-$(date +%Y%m%d-%H%M%S)}"
+
+PIDS=()
+trap 'for pid in ${PIDS[@]+"${PIDS[@]}"}; do kill "${pid}" 2>/dev/null || true; done' EXIT
+
+# wait_for URL: poll until a background server answers
+wait_for() {
+    for _ in $(seq 1 50); do
+        curl -sf "$1" > /dev/null && return 0
+        sleep 0.2
+    done
+    echo "FAILED"
+    exit 1
+}
 
 echo "=== LLM Agent Benchmark ==="
 echo ""
 
-# 1. Check Ollama is running
-echo -n "Checking Ollama... "
-if ! curl -sf "${OLLAMA_URL}/api/tags" > /dev/null; then
-    echo "NOT running"
-    echo "Start Ollama first:  ollama serve"
-    exit 1
+if [[ -n "${REPLAY}" ]]; then
+    # 1-2. Serve recorded traffic instead of a model
+    PROXY_PORT="${PROXY_PORT:-11436}"
+    OLLAMA_URL="http://127.0.0.1:${PROXY_PORT}"
+    echo -n "Replaying ${REPLAY} on ${OLLAMA_URL}... "
+    uv run proxy.py replay --cassette "${REPLAY}" --port "${PROXY_PORT}" \
+        --timing "${REPLAY_TIMING:-original}" > /dev/null &
+    PIDS+=($!)
+    wait_for "${OLLAMA_URL}/__proxy__/health"
+    echo "OK"
+    export BENCH_BACKEND="replay"
+elif [[ "${MOCK}" == 1 ]]; then
+    # 1-2. Start the scripted stand-in server
+    MOCK_PORT="${MOCK_PORT:-11435}"
+    OLLAMA_URL="http://127.0.0.1:${MOCK_PORT}"
+    echo -n "Starting mock Ollama on ${OLLAMA_URL}... "
+    uv run mock_ollama.py --port "${MOCK_PORT}" \
+        --ttft "${MOCK_TTFT:-0}" --token-latency "${MOCK_TOKEN_LATENCY:-0}" \
+        --load-time "${MOCK_LOAD_TIME:-0}" > /dev/null &
+    PIDS+=($!)
+    wait_for "${OLLAMA_URL}/api/tags"
+    echo "OK"
+    export BENCH_BACKEND="mock"
+else
+    # 1. Check Ollama is running
+    echo -n "Checking Ollama... "
+    if ! curl -sf "${OLLAMA_URL}/api/tags" > /dev/null; then
+        echo "NOT running"
+        echo "Start Ollama first:  ollama serve"
+        exit 1
+    fi
+    echo "OK"
+
+    # 2. Check / pull model
+    echo -n "Checking model ${MODEL}... "
+    if ollama list 2>/dev/null | grep -q "^${MODEL}"; then
+        echo "already present"
+    else
+        echo "not found - pulling..."
+        ollama pull "${MODEL}"
+    fi
 fi
-echo "OK"
 
-# 2. Check / pull model
-echo -n "Checking model ${MODEL}... "
-if ollama list 2>/dev/null | grep -q "^${MODEL}"; then
-    echo "already present"
-else
-    echo "not found - pulling..."
-    ollama pull "${MODEL}"
+if [[ -n "${RECORD}" && -z "${REPLAY}" ]]; then
+    # Put the recording proxy between the scripts and the model
+    PROXY_PORT="${PROXY_PORT:-11436}"
+    echo -n "Recording to ${RECORD} via http://127.0.0.1:${PROXY_PORT}... "
+    uv run proxy.py record --cassette "${RECORD}" --port "${PROXY_PORT}" \
+        --upstream "${OLLAMA_URL}" > /dev/null &
+    PIDS+=($!)
+    OLLAMA_URL="http://127.0.0.1:${PROXY_PORT}"
+    wait_for "${OLLAMA_URL}/__proxy__/health"
+    echo "OK"
 fi
 
-# 3. Pre-install all dependencies (warms up uv venv cache)
-echo ""
-echo "--- Pre-installing dependencies ---"
-for script in tool_calling_test.py deepagents_test.py adk_test.py pydanticai_test.py; do
-    echo -n "  ${script} ... "
-    BENCH_WARMUP=1 uv run "${script}"
-done
+if [[ -n "${TRACE}" ]]; then
+    # Outermost hop: the scripts talk to the tracing proxy
+    TRACE_PORT="${TRACE_PORT:-11437}"
+    echo -n "Tracing wire traffic to ${TRACE} via http://127.0.0.1:${TRACE_PORT}... "
+    uv run proxy.py trace --trace "${TRACE}" --port "${TRACE_PORT}" \
+        --upstream "${OLLAMA_URL}" > /dev/null &
+    PIDS+=($!)
+    OLLAMA_URL="http://127.0.0.1:${TRACE_PORT}"
+    wait_for "${OLLAMA_URL}/__proxy__/health"
+    echo "OK"
+    export BENCH_WIRE_TRACE=1
+fi
+export OLLAMA_HOST="${OLLAMA_URL}"
 
-# 4. Run benchmarks
-echo ""
-echo "--- Raw Ollama ---"
-uv run tool_calling_test.py
+if [[ "${HARNESS}" == 1 ]]; then
+    # 3-4. One interpreter, frameworks interleaved per question
+    echo ""
+    echo "--- Unified harness ---"
+    uv run harness.py ${SCRIPT_ARGS[@]+"${SCRIPT_ARGS[@]}"}
+else
+    # 3. Pre-install all dependencies (warms up uv venv cache)
+    echo ""
+    echo "--- Pre-installing dependencies ---"
+    for script in tool_calling_test.py tool_calling_async_test.py deepagents_test.py adk_test.py pydanticai_test.py; do
+        echo -n "  ${script} ... "
+        BENCH_WARMUP=1 uv run "${script}"
+    done
 
-echo ""
-echo "--- Deep Agents ---"
-uv run deepagents_test.py
+    # 4. Run benchmarks
+    echo ""
+    echo "--- Raw Ollama ---"
+    uv run tool_calling_test.py ${SCRIPT_ARGS[@]+"${SCRIPT_ARGS[@]}"}
 
-echo ""
-echo "--- Google ADK ---"
-uv run adk_test.py
+    echo ""
+    echo "--- Raw Ollama (async) ---"
+    uv run tool_calling_async_test.py ${SCRIPT_ARGS[@]+"${SCRIPT_ARGS[@]}"}
 
-echo ""
-echo "--- Pydantic AI ---"
-uv run pydanticai_test.py
+    echo ""
+    echo "--- Deep Agents ---"
+    uv run deepagents_test.py ${SCRIPT_ARGS[@]+"${SCRIPT_ARGS[@]}"}
+
+    echo ""
+    echo "--- Google ADK ---"
+    uv run adk_test.py ${SCRIPT_ARGS[@]+"${SCRIPT_ARGS[@]}"}
+
+    echo ""
+    echo "--- Pydantic AI ---"
+    uv run pydanticai_test.py ${SCRIPT_ARGS[@]+"${SCRIPT_ARGS[@]}"}
+fi
+
+if [[ -n "${TRACE}" ]]; then
+    uv run proxy.py report --trace "${TRACE}"
+fi
 
 echo ""
-echo "=== Done! Results saved to bench_results.log ==="
+echo "=== Done! Results saved to bench_results.log and bench_results.duckdb (session ${BENCH_SESSION}) ==="
@@ -0,0 +1,217 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "ollama",
+#     "duckdb",
+#     "deepagents",
+#     "langchain-ollama",
+#     "google-adk[extensions]",
+#     "pydantic-ai",
+# ]
+# ///
+"""Cold-start benchmark: import, build and first answer in fresh processes.
+
+The measured loop of every benchmark starts after the framework is imported
+and the agent is built; a serverless cold start pays both on every
+invocation.  Each trial here spawns a new interpreter per framework and
+times, from the moment the process was spawned:
+
+- spawn:  interpreter start-up until the script's first line runs
+- shared: the harness's own modules (utils, timing, results store)
+- import: the framework benchmark module (framework imports, module setup)
+- build:  ``Adapter.build()`` - ``Agent``, ``create_deep_agent``, ``InMemoryRunner``
+- answer: the first question, end to end (skipped with ``--no-answer``)
+
+plus peak RSS after each phase, and a ``python -X importtime`` breakdown of
+the heaviest packages and modules.
+
+    uv run startup_bench.py                          # all four, 5 trials
+    uv run startup_bench.py --frameworks adk,pydantic_ai --trials 10 --no-answer
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+from datetime import datetime
+
+# Only stdlib at module level: the harness modules are imported lazily so a
+# trial process can time them as the "shared" phase.
+PHASES = ("spawn", "shared", "import", "build", "answer")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10   # bytes vs KiB
+
+
+def child(key: str, answer: bool) -> None:
+    """One trial in this (fresh) process; prints a JSON line of phase timings."""
+    t_spawn = float(os.environ["BENCH_SPAWN_AT"])
+    out     = {"spawn": time.time() - t_spawn}
+
+    t0 = time.time()
+    import harness
+    import utils
+    out["shared"], out["rss_shared"] = time.time() - t0, _peak_rss_mb()
+
+    module, cls = harness.ADAPTERS[key]
+    t0 = time.time()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        adapter = getattr(importlib.import_module(module), cls)()
+        out["import"], out["rss_import"] = time.time() - t0, _peak_rss_mb()
+        out["name"],   out["label"]      = adapter.name, adapter.label
+
+        t0 = time.time()
+        adapter.build()
+        out["build"], out["rss_build"] = time.time() - t0, _peak_rss_mb()
+
+        if answer:
+            t0 = time.time()
+            r  = asyncio.run(adapter.run(utils.QUESTIONS[0])) if adapter.is_async else adapter.run(utils.QUESTIONS[0])
+            out["answer"], out["rss_answer"] = time.time() - t0, _peak_rss_mb()
+            out["success"] = bool(r["success"])
+        adapter.close()
+    print(json.dumps(out))
+
+
+def run_trial(key: str, answer: bool) -> dict:
+    cmd = [sys.executable, __file__, "--child", key]
+    if not answer:
+        cmd.append("--no-answer")
+    env  = {**os.environ, "BENCH_SPAWN_AT": repr(time.time())}
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{key} trial failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def import_profile(key: str, top: int = 10) -> dict:
+    """Self time per top-level package and the slowest modules (cumulative).
+
+    Parses ``python -X importtime`` output for the framework module only;
+    the shared harness modules are imported first so they are excluded.
+    """
+    from harness import ADAPTERS
+
+    module = ADAPTERS[key][0]
+    code   = "import harness, utils, sys; print('--', file=sys.stderr); import " + module
+    proc   = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "BENCH_WARMUP": "1"},
+    )
+    lines    = proc.stderr.split("\n--\n", 1)[-1].splitlines()
+    packages = defaultdict(float)
+    modules  = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line.removeprefix("import time:").split("|")
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us) / 1e6
+        modules.append((int(cum_us) / 1e6, name))
+    return {
+        "packages": sorted(packages.items(), key=lambda kv: -kv[1])[:top],
+        "modules":  sorted(modules, reverse=True)[:top],
+    }
+
+
+def print_report(label: str, trials: list[dict], profile: dict | None) -> None:
+    from stats import describe
+    from utils import SEP
+
+    print()
+    print(SEP)
+    print(f"  {label}  (cold start, {len(trials)} fresh processes)")
+    print(SEP)
+    print(f"  {'phase':<8} {'p50':>8} {'mean':>8} {'p90':>8}   {'peak RSS':>9}")
+    total = [0.0] * len(trials)
+    for phase in PHASES:
+        values = [t[phase] for t in trials if phase in t]
+        if not values:
+            continue
+        d     = describe(values)
+        rss   = [t.get(f"rss_{phase}") for t in trials if t.get(f"rss_{phase}") is not None]
+        rss_s = f"{max(rss):7.0f}MB" if rss else ""
+        print(f"  {phase:<8} {d['p50']:7.3f}s {d['mean']:7.3f}s {d['p90']:7.3f}s   {rss_s:>9}")
+        total = [a + t.get(phase, 0.0) for a, t in zip(total, trials)]
+    d = describe(total)
+    print(f"  {'total':<8} {d['p50']:7.3f}s {d['mean']:7.3f}s {d['p90']:7.3f}s")
+    if profile:
+        print("  heaviest packages (self import time):")
+        for pkg, secs in profile["packages"]:
+            print(f"    {secs:7.3f}s  {pkg}")
+        print("  slowest modules (cumulative import time):")
+        for secs, name in profile["modules"]:
+            print(f"    {secs:7.3f}s  {name}")
+
+
+def append_startup_log(name: str, trials: list[dict]) -> None:
+    """One line per framework in bench_results.log, all trials in the store."""
+    from results_db import RESULTS_DB, store_startup
+    from stats import percentile
+    from utils import BACKEND, LOG_FILE, MODEL
+
+    ts    = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    parts = " ".join(
+        f"{p} {percentile([t[p] for t in trials if p in t], 50):.2f}s"
+        for p in PHASES if any(p in t for t in trials)
+    )
+    rss   = max(t.get("rss_answer") or t["rss_build"] for t in trials)
+    with open(LOG_FILE, "a") as f:
+        f.write(f"{ts} | {name:<26} | cold start p50: {parts} | peak RSS {rss:.0f}MB | n={len(trials)}\n")
+    run_id = store_startup(name, trials, model=MODEL, backend=BACKEND)
+    print(f"  appended to {LOG_FILE.name}; startup {run_id} stored in {RESULTS_DB.name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frameworks", help="comma-separated subset of harness.ADAPTERS (default: all)")
+    parser.add_argument("--trials", type=int, default=5, help="measured fresh processes per framework")
+    parser.add_argument("--warmup", type=int, default=1, help="discarded trials first (pyc/page cache)")
+    parser.add_argument("--answer", action=argparse.BooleanOptionalAction, default=True,
+                        help="also time the first question (needs a model endpoint)")
+    parser.add_argument("--importtime", action=argparse.BooleanOptionalAction, default=True,
+                        help="print the -X importtime breakdown")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.answer)
+        return
+    if os.getenv("BENCH_WARMUP"):
+        print("  (packages ready)")
+        sys.exit(0)
+
+    from harness import ADAPTERS
+
+    keys = [k.strip() for k in (args.frameworks or ",".join(ADAPTERS)).split(",") if k.strip()]
+    unknown = [k for k in keys if k not in ADAPTERS]
+    if unknown:
+        parser.error(f"unknown framework(s): {', '.join(unknown)}")
+
+    os.environ.setdefault("BENCH_SESSION", time.strftime("%Y%m%d-%H%M%S"))
+    for key in keys:
+        print(f"\n  {key}: ", end="", flush=True)
+        trials = []
+        for i in range(args.warmup + args.trials):
+            t = run_trial(key, args.answer)
+            print("w" if i < args.warmup else ".", end="", flush=True)
+            if i >= args.warmup:
+                trials.append(t)
+        print()
+        profile = import_profile(key) if args.importtime else None
+        print_report(trials[-1]["label"], trials, profile)
+        append_startup_log(trials[-1]["name"], trials)
+
+
+if __name__ == "__main__":
+    main()
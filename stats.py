@@ -0,0 +1,116 @@
+"""Small statistics helpers for latency samples (stdlib only)."""
+
+import math
+import random
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Linear-interpolated percentile, ``p`` in [0, 100]; NaN for no samples."""
+    if not values:
+        return math.nan
+    xs = sorted(values)
+    k  = (len(xs) - 1) * p / 100
+    lo = math.floor(k)
+    hi = math.ceil(k)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+def mean(values: list[float]) -> float:
+    return sum(values) / len(values) if values else math.nan
+
+
+def stdev(values: list[float]) -> float:
+    """Sample standard deviation; 0.0 for fewer than two samples."""
+    if len(values) < 2:
+        return 0.0
+    m = mean(values)
+    return math.sqrt(sum((v - m) ** 2 for v in values) / (len(values) - 1))
+
+
+def bootstrap_ci(
+    values: list[float],
+    stat=mean,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> tuple[float, float]:
+    """Percentile-bootstrap confidence interval for ``stat`` of the samples.
+
+    Seeded, so the same samples always give the same interval.
+    """
+    if not values:
+        return math.nan, math.nan
+    if len(values) == 1:
+        return values[0], values[0]
+    rng   = random.Random(seed)
+    n     = len(values)
+    boots = sorted(stat([values[rng.randrange(n)] for _ in range(n)]) for _ in range(resamples))
+    alpha = (1 - confidence) / 2 * 100
+    return percentile(boots, alpha), percentile(boots, 100 - alpha)
+
+
+def describe(values: list[float]) -> dict:
+    """n, mean, stdev, p50/p90/p99 and a 95% bootstrap CI of the mean."""
+    lo, hi = bootstrap_ci(values)
+    return {
+        "n":     len(values),
+        "mean":  mean(values),
+        "stdev": stdev(values),
+        "p50":   percentile(values, 50),
+        "p90":   percentile(values, 90),
+        "p99":   percentile(values, 99),
+        "ci_lo": lo,
+        "ci_hi": hi,
+    }
+
+
+def mann_whitney_greater(a: list[float], b: list[float]) -> float:
+    """One-sided Mann-Whitney U p-value for "b tends to be larger than a".
+
+    Normal approximation with tie and continuity correction - fine for the
+    sample sizes a multi-iteration run produces (n >= ~8 per side).
+    """
+    n_a, n_b = len(a), len(b)
+    if not n_a or not n_b:
+        return math.nan
+    pooled = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks  = [0.0] * len(pooled)
+    ties   = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t     = j - i + 1
+        ties += t ** 3 - t
+        i     = j + 1
+    n     = n_a + n_b
+    r_b   = sum(r for r, (_, side) in zip(ranks, pooled) if side == 1)
+    u_b   = r_b - n_b * (n_b + 1) / 2
+    var   = n_a * n_b / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u_b - n_a * n_b / 2 - 0.5) / math.sqrt(var)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_diff_ci(
+    a: list[float],
+    b: list[float],
+    stat=mean,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> tuple[float, float]:
+    """Bootstrap CI of ``stat(b) - stat(a)``, resampling each side independently."""
+    if not a or not b:
+        return math.nan, math.nan
+    rng   = random.Random(seed)
+    diffs = sorted(
+        stat([b[rng.randrange(len(b))] for _ in b]) - stat([a[rng.randrange(len(a))] for _ in a])
+        for _ in range(resamples)
+    )
+    alpha = (1 - confidence) / 2 * 100
+    return percentile(diffs, alpha), percentile(diffs, 100 - alpha)
@@ -0,0 +1,35 @@
+import threading
+import time
+
+from profiler import Sampler
+
+
+def _parse() -> None:
+    t = time.thread_time()
+    while time.thread_time() - t < 0.002:
+        pass
+
+
+def test_cpu_before_a_blocking_wait_is_kept():
+    stop, wait = threading.Event(), threading.Event()
+    used = []
+
+    def worker():
+        t = time.thread_time()
+        while not stop.is_set():
+            _parse()
+            wait.wait(0.008)        # threading.py wait: a blocking frame
+        used.append(time.thread_time() - t)
+
+    sampler = Sampler(0.005)
+    sampler.start()
+    thread = threading.Thread(target=worker, name="worker")
+    thread.start()
+    time.sleep(1)
+    stop.set()
+    thread.join()
+    stacks = sampler.stop()
+    charged = sum(w for stack, w in stacks.items() if stack[0][2] == "worker")
+    parsing = sum(w for stack, w in stacks.items() if stack[0][2] == "worker" and stack[-1][2] == "_parse")
+    assert charged > 0.7 * used[0]
+    assert parsing > 0.5 * charged
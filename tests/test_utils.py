@@ -0,0 +1,36 @@
+from utils import _by_question, make_query_runner, normalize_sql, setup_db
+
+
+def _summary_line(sql: str) -> str:
+    return make_query_runner(setup_db())(sql).splitlines()[-1]
+
+
+def test_summary_quoted_column_name():
+    line = _summary_line('SELECT quantity AS "a""b" FROM sales, range(50)')
+    assert line == 'Summary: 900 rows x 1 columns; a"b 3..25'
+
+
+def test_summary_duplicate_column_names_by_position():
+    line = _summary_line("SELECT s1.quantity, 7 AS quantity FROM sales s1, sales s2")
+    assert line == "Summary: 324 rows x 2 columns; quantity 3..25; quantity 7..7"
+
+
+def test_normalize_sql_folds_clause_keywords():
+    upper = "SELECT category, SUM(quantity) FROM sales LEFT JOIN t USING (id) GROUP BY category ORDER BY 2 DESC"
+    lower = "select category, SUM(quantity) from sales left join t using (id) group by category order by 2 desc"
+    assert normalize_sql(upper) == normalize_sql(lower)
+    assert normalize_sql("SELECT * FROM sales WHERE product LIKE 'L%' AND quantity BETWEEN 1 AND 5") == \
+        normalize_sql("select * from sales where product like 'L%' and quantity between 1 and 5")
+    assert normalize_sql("SELECT Product FROM sales") != normalize_sql("SELECT product FROM sales")
+
+
+def test_by_question_keeps_same_text_under_two_ids_apart():
+    results = [
+        {"qid": "a", "question": "Total revenue?"},
+        {"qid": "b", "question": "Total revenue?"},
+        {"qid": "a", "question": "Total revenue?"},
+        {"question": "No id"},
+    ]
+    groups = _by_question(results)
+    assert list(groups) == ["a", "b", "No id"]
+    assert [len(rs) for rs in groups.values()] == [2, 1, 1]
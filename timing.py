@@ -0,0 +1,251 @@
+"""Timed spans per question: LLM round-trips, tool calls, and everything else.
+
+Each ``run_test`` opens a fresh ``SpanLog`` with ``new_log()``; framework
+hooks and ``run_duckdb_query`` then append spans to whichever log is current.
+The log lives in a context variable, so it follows the question into worker
+threads and asyncio tasks that copy the context (LangGraph nodes, ADK tool
+calls) without any global state.
+
+Streaming hooks also stamp every token (chunk with content) onto the open
+LLM span as an offset from ``t0``; ``stream_metrics`` turns those stamps
+into the same TTFT, inter-token latency and decode rate for every framework.
+``tool_batches`` finds the tool calls that answer one model turn and how
+much running them side by side saved; ``prefix_stats`` how much of each
+follow-up prompt repeated the previous one; ``turn_prompts`` how the
+prompt grew from one model turn to the next.
+"""
+
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+# Ollama reports these in nanoseconds on the final chunk of every call
+OLLAMA_DURATIONS = ("load_duration", "prompt_eval_duration", "eval_duration")
+OLLAMA_COUNTS    = {"prompt_eval_count": "prompt_tokens", "eval_count": "eval_tokens"}
+
+
+class SpanLog:
+    """Spans recorded for one question, with start offsets from ``t0``."""
+
+    def __init__(self) -> None:
+        self.t0    = time.perf_counter()
+        self.spans: list[dict] = []
+        self.marks: dict[str, float] = {}
+        self._open: dict[Any, tuple[str, float, dict]] = {}
+
+    def mark(self, name: str) -> None:
+        """Remember the first time ``name`` happened (offset from ``t0``)."""
+        self.marks.setdefault(name, time.perf_counter() - self.t0)
+
+    def stamp(self, attrs: dict) -> None:
+        """Record a token arrival on a span's attribute dict."""
+        attrs.setdefault("tokens", []).append(time.perf_counter() - self.t0)
+
+    def tick(self, key: Any = None) -> None:
+        """Stamp a token on the open span ``key`` (default: the latest opened)."""
+        if key is None:
+            key = next(reversed(self._open), None)
+        opened = self._open.get(key)
+        if opened is not None:
+            self.stamp(opened[2])
+
+    def add(self, kind: str, start: float, end: float, **attrs: Any) -> dict:
+        span = {"kind": kind, "start": start - self.t0, "duration": end - start, **attrs}
+        self.spans.append(span)
+        return span
+
+    def begin(self, key: Any, kind: str, **attrs: Any) -> None:
+        """Open a span that a later callback closes with ``end(key)``."""
+        self._open[key] = (kind, time.perf_counter(), attrs)
+
+    def end(self, key: Any, **attrs: Any) -> Optional[dict]:
+        opened = self._open.pop(key, None)
+        if opened is None:
+            return None
+        kind, start, base = opened
+        return self.add(kind, start, time.perf_counter(), **{**base, **attrs})
+
+    @contextmanager
+    def span(self, kind: str, **attrs: Any):
+        """Time a block; attributes set on the yielded dict land on the span."""
+        extra = dict(attrs)
+        start = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.add(kind, start, time.perf_counter(), **extra)
+
+
+_current: ContextVar[Optional[SpanLog]] = ContextVar("span_log", default=None)
+
+
+def new_log() -> SpanLog:
+    """Start a fresh span log for the current question and make it current."""
+    log = SpanLog()
+    _current.set(log)
+    return log
+
+
+def current_log() -> Optional[SpanLog]:
+    return _current.get()
+
+
+@contextmanager
+def span(kind: str, **attrs: Any):
+    """Time a block into the current log; a no-op when no log is active."""
+    log = _current.get()
+    if log is None:
+        yield dict(attrs)
+        return
+    with log.span(kind, **attrs) as extra:
+        yield extra
+
+
+def ollama_stats(source: Any) -> dict:
+    """Extract Ollama's timing/token fields from a response dict or object.
+
+    Durations are converted to seconds; missing fields are skipped, so this
+    is safe on OpenAI-compat responses that only carry token usage.
+    """
+    get   = source.get if isinstance(source, dict) else lambda k: getattr(source, k, None)
+    stats = {}
+    for field in OLLAMA_DURATIONS:
+        value = get(field)
+        if value is not None:
+            stats[field.removesuffix("_duration")] = value / 1e9
+    for field, name in OLLAMA_COUNTS.items():
+        value = get(field)
+        if value is not None:
+            stats[name] = value
+    return stats
+
+
+def phase_breakdown(spans: list[dict], total: float) -> dict:
+    """Split a question's wall-clock time into inference, tool and other.
+
+    ``other`` is whatever the spans do not cover: prompt building, response
+    parsing, callbacks, graph scheduling - i.e. framework overhead.
+    """
+    llm   = [s for s in spans if s["kind"] == "llm"]
+    tools = [s for s in spans if s["kind"] == "tool"]
+    out   = {
+        "llm":       sum(s["duration"] for s in llm),
+        "tool":      sum(s["duration"] for s in tools),
+        "llm_calls": len(llm),
+    }
+    out["other"] = max(0.0, total - out["llm"] - out["tool"])
+    for key in ("load", "prompt_eval", "eval", "prompt_tokens", "eval_tokens"):
+        values = [s[key] for s in llm if s.get(key) is not None]
+        if values:
+            out[key] = sum(values)
+    return out
+
+
+def stream_metrics(spans: list[dict]) -> dict:
+    """TTFT, inter-token gaps and decode rate from the LLM spans' token stamps.
+
+    ``ttft`` is the first LLM call's start to its first token - the same
+    definition in every framework.  ``itl`` lists the gaps between
+    consecutive tokens within each call; ``decode_tps`` is tokens after the
+    first over the time they took, across all calls.  Empty if nothing
+    streamed.
+    """
+    llm = sorted((s for s in spans if s["kind"] == "llm"), key=lambda s: s["start"])
+    if not any(s.get("tokens") for s in llm):
+        return {}
+    first  = llm[0].get("tokens")
+    itl    = [b - a for s in llm for a, b in itertools.pairwise(s.get("tokens") or [])]
+    decode = sum(s["tokens"][-1] - s["tokens"][0] for s in llm if len(s.get("tokens") or []) > 1)
+    return {
+        "ttft":       first[0] - llm[0]["start"] if first else None,
+        "itl":        itl,
+        "tokens":     sum(len(s.get("tokens") or []) for s in llm),
+        "decode":     decode,
+        "decode_tps": len(itl) / decode if decode > 0 else None,
+    }
+
+
+def tool_batches(spans: list[dict]) -> list[dict]:
+    """Model turns that asked for two or more tool calls.
+
+    A tool span belongs to the latest LLM call that started before it.  Per
+    batch: ``serial`` is the sum of the tool durations (what a for-loop would
+    take), ``wall`` first start to last end, ``saved`` the difference - zero
+    when a framework runs the calls one after another.  Overlapping calls
+    contend for cores (DuckDB is multi-threaded itself), which inflates
+    ``serial``; treat ``saved`` as an upper bound.
+    """
+    llm     = sorted(s["start"] for s in spans if s["kind"] == "llm")
+    batches: dict[int, list[dict]] = {}
+    for s in spans:
+        if s["kind"] == "tool":
+            turn = sum(1 for start in llm if start <= s["start"])
+            batches.setdefault(turn, []).append(s)
+    out = []
+    for tools in batches.values():
+        if len(tools) < 2:
+            continue
+        serial = sum(t["duration"] for t in tools)
+        wall   = max(t["start"] + t["duration"] for t in tools) - min(t["start"] for t in tools)
+        out.append({"calls": len(tools), "serial": serial, "wall": wall, "saved": max(0.0, serial - wall)})
+    return out
+
+
+def prefix_stats(spans: list[dict]) -> dict:
+    """Prompt size of a question's follow-up requests and the part that repeats the previous prompt.
+
+    Reads the ``prompt_chars``/``reused_chars``/``rewritten_chars`` that
+    ``transport`` puts on ``connect`` spans.  ``reuse`` is the reused share
+    of the follow-up prompts, which is what the server can skip
+    re-evaluating.  ``rewritten`` counts characters of earlier prompts that
+    a later turn changed instead of appending to.  It is 0 when every turn
+    only appends to the conversation.
+    """
+    follow = [s for s in spans if s["kind"] == "connect" and "reused_chars" in s]
+    if not follow:
+        return {}
+    chars  = sum(s["prompt_chars"] for s in follow)
+    reused = sum(s["reused_chars"] for s in follow)
+    return {
+        "requests":  len(follow),
+        "chars":     chars,
+        "reused":    reused,
+        "rewritten": sum(s.get("rewritten_chars", 0) for s in follow),
+        "reuse":     reused / chars if chars else 0.0,
+    }
+
+
+def turn_prompts(spans: list[dict]) -> list[dict]:
+    """Prompt size at each model turn of a question, in order.
+
+    Pairs every LLM span with the chat request sent while it was open: its
+    ``prompt_chars`` (on the ``connect`` span, from ``transport``), and the
+    span's own ``prompt_tokens`` and ``prompt_eval`` as the server reported
+    them.  A field the backend does not report is ``None``.
+    """
+    sent  = sorted((s for s in spans if s["kind"] == "connect" and "prompt_chars" in s), key=lambda s: s["start"])
+    turns = []
+    for s in sorted((s for s in spans if s["kind"] == "llm"), key=lambda s: s["start"]):
+        end = s["start"] + s["duration"]
+        req = next((c for c in sent if s["start"] <= c["start"] <= end), None)
+        turns.append({
+            "chars":       req["prompt_chars"] if req else None,
+            "tokens":      s.get("prompt_tokens"),
+            "prompt_eval": s.get("prompt_eval"),
+        })
+    return turns
+
+
+def compaction_stats(spans: list[dict]) -> dict:
+    """Tool results compacted and characters kept out of the prompts (``compact`` spans)."""
+    passes = [s for s in spans if s["kind"] == "compact"]
+    if not passes:
+        return {}
+    return {
+        "mode":    passes[0].get("mode", ""),
+        "results": sum(s.get("results", 0) for s in passes),
+        "chars":   sum(s.get("chars", 0) for s in passes),
+        "time":    sum(s["duration"] for s in passes),
+    }
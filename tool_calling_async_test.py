@@ -0,0 +1,80 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["ollama", "duckdb"]
+# ///
+"""Benchmark: Raw Ollama Python client tool calling, async.
+
+The same loop as ``tool_calling_test.py`` on one shared ``ollama.AsyncClient``
+with a keep-alive connection pool (``transport.client_kwargs``), the same
+policy the ADK and Pydantic AI paths use.  Against the async frameworks this
+is the like-for-like 1x baseline: same event loop, same transport, no
+framework.  Tool calls run off the event loop in the raw benchmark's pool.
+"""
+
+import asyncio
+
+import ollama
+from compaction import compact_messages
+from harness import Adapter, run_script
+from residency import KEEP_ALIVE
+from timing import new_log, span
+from tool_calling_test import (
+    MAX_ITERATIONS, OPTIONS, TOOLS, Turn, add_tool_results, call_tools, con, finish, pool, start_question,
+)
+from transport import client_kwargs
+from utils import MODEL, OLLAMA_HOST
+
+
+async def run_test(
+    question: str, client: ollama.AsyncClient, max_iterations: int = MAX_ITERATIONS, history: list | None = None
+) -> dict:
+    messages        = start_question(question, history)
+    tool_calls_made = 0
+    answer          = None
+    log             = new_log()
+
+    for _ in range(max_iterations):
+        sent = compact_messages(messages)
+        with span("llm") as llm_span:
+            turn = Turn(log, llm_span)
+            stream = await client.chat(
+                model=MODEL, messages=sent, tools=TOOLS, think=False, stream=True,
+                options=OPTIONS, keep_alive=KEEP_ALIVE,
+            )
+            async for chunk in stream:
+                turn.add(chunk)
+        messages.append(turn.message())
+        if not turn.tool_calls:
+            answer = "".join(turn.parts).strip()
+            break
+        results         = await asyncio.to_thread(call_tools, turn.tool_calls)
+        tool_calls_made = add_tool_results(messages, turn.tool_calls, results, tool_calls_made)
+
+    if history is not None:
+        history[:] = messages
+    return finish(log, tool_calls_made, answer)
+
+
+class AsyncRawOllamaAdapter(Adapter):
+    name     = "raw_ollama_async"
+    label    = f"Raw Ollama async ({MODEL})"
+    is_async = True
+
+    def build(self) -> None:
+        # a replaced client is left to the garbage collector: closing it needs the event loop
+        self.client = ollama.AsyncClient(host=OLLAMA_HOST, **client_kwargs(is_async=True))
+
+    async def open_session(self) -> list:
+        return []
+
+    def run(self, question: str, max_iterations: int | None = None, session: list | None = None):
+        return run_test(question, self.client, max_iterations or MAX_ITERATIONS, session)
+
+    def close(self) -> None:
+        if pool is not None:
+            pool.shutdown()
+        con.close()
+
+
+if __name__ == "__main__":
+    run_script(AsyncRawOllamaAdapter(), __doc__)
@@ -2,16 +2,35 @@
 # requires-python = ">=3.11"
 # dependencies = ["ollama", "duckdb"]
 # ///
-"""Benchmark: Raw Ollama Python client tool calling."""
+"""Benchmark: Raw Ollama Python client tool calling.
 
+Several tool calls in one model turn run side by side on a thread pool
+(``BENCH_TOOL_WORKERS``, default 4; 1 runs them one by one), each on its
+own DuckDB cursor; results go back to the model in call order.  The
+client pools keep-alive connections under the shared ``transport`` policy
+and sends the pinned model options from ``residency``;
+``tool_calling_async_test.py`` is the same loop on ``ollama.AsyncClient``.
+The "agent" here is just the client (``build``); a session is the message
+list, which carries over to the next question with ``--lifecycle session``.
+With ``--compact`` the tool results the model has already answered go out
+shortened; the list itself keeps them whole.
+"""
+
+import contextvars
 import os
-import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
+
 import ollama
-from utils import MODEL, QUESTIONS, SEP, setup_db, make_query_runner, print_summary, append_log
+from compaction import compact_messages
+from harness import Adapter, run_script
+from residency import KEEP_ALIVE, model_options
+from timing import SpanLog, new_log, ollama_stats, span, stream_metrics
+from transport import client_kwargs
+from utils import MODEL, OLLAMA_HOST, SEP, setup_db, make_query_runner
 
 con       = setup_db()
 run_query = make_query_runner(con)
+OPTIONS   = model_options()
 
 TOOLS = [
     {
@@ -28,86 +47,150 @@ TOOLS = [
     }
 ]
 
-TOOL_MAP = {"run_duckdb_query": run_query}
+TOOL_MAP     = {"run_duckdb_query": run_query}
+TOOL_WORKERS = int(os.getenv("BENCH_TOOL_WORKERS", "4"))
+pool         = ThreadPoolExecutor(TOOL_WORKERS, thread_name_prefix="tool") if TOOL_WORKERS > 1 else None
+
+
+def call_tool(tc) -> str:
+    return TOOL_MAP[tc.function.name](tc.function.arguments.get("sql", ""))
+
+
+def call_tools(tool_calls: list) -> list[str]:
+    """Results of one turn's tool calls, in call order.
+
+    Each call runs in a copy of the current context so its tool span lands
+    on this question's ``SpanLog``.
+    """
+    if pool is None or len(tool_calls) < 2:
+        return [call_tool(tc) for tc in tool_calls]
+    futures = [pool.submit(contextvars.copy_context().run, call_tool, tc) for tc in tool_calls]
+    return [f.result() for f in futures]
+
 
+SYSTEM_PROMPT = "Use run_duckdb_query tool. sales table: date,product,category,quantity,price,region"
 
-def run_test(question: str, max_iterations: int = 6) -> dict:
+
+def start_question(question: str, history: list | None = None) -> list[dict[str, object]]:
+    """Messages for one question: the system prompt, or the session so far, then the question."""
     print()
     print(SEP)
     print(f"  Q: {question}")
     print(SEP)
-    messages: list[dict[str, object]] = [
-        {"role": "system", "content": "Use run_duckdb_query tool. sales table: date,product,category,quantity,price,region"},
-        {"role": "user",   "content": question},
+    return [
+        *(history or [{"role": "system", "content": SYSTEM_PROMPT}]),
+        {"role": "user", "content": question},
     ]
+
+
+class Turn:
+    """One streamed model reply: its text, tool calls and token stamps."""
+
+    def __init__(self, log: SpanLog, llm_span: dict) -> None:
+        self.log        = log
+        self.llm_span   = llm_span
+        self.parts      = []
+        self.tool_calls = []
+
+    def add(self, chunk) -> None:
+        if getattr(chunk, "done", False):
+            self.llm_span.update(ollama_stats(chunk))
+        chunk_msg = getattr(chunk, "message", None)
+        if not chunk_msg:
+            return
+        if chunk_msg.content or chunk_msg.tool_calls:
+            self.log.stamp(self.llm_span)
+        if chunk_msg.content:
+            self.parts.append(chunk_msg.content)
+        if chunk_msg.tool_calls:
+            self.tool_calls = chunk_msg.tool_calls
+
+    def message(self) -> dict[str, object]:
+        msg: dict[str, object] = {"role": "assistant", "content": "".join(self.parts)}
+        if self.tool_calls:
+            msg["tool_calls"] = self.tool_calls
+        return msg
+
+
+def add_tool_results(messages: list, tool_calls: list, results: list[str], made: int) -> int:
+    """Print and append one turn's tool results; return the running call count."""
+    for tc, result in zip(tool_calls, results):
+        made += 1
+        print()
+        print(f"  [tool call #{made}] {tc.function.name}")
+        print(f"  SQL: {tc.function.arguments.get('sql', '')}")
+        print("  Result:")
+        print(result)
+        messages.append({"role": "tool", "content": result})
+    return made
+
+
+def finish(log: SpanLog, made: int, answer: str | None) -> dict:
+    """Print the outcome and build the result dict; ``answer=None`` means iterations ran out."""
+    print()
+    if answer is None:
+        print("  [!] Max iterations reached.")
+    else:
+        print("  [answer]")
+        print(answer)
+    ttft = stream_metrics(log.spans).get("ttft")
+    return {"success": bool(answer), "tool_calls": made, "ttft": ttft, "answer": answer or "", "spans": log.spans}
+
+
+MAX_ITERATIONS = 6
+
+
+def run_test(
+    question: str, client: ollama.Client, max_iterations: int = MAX_ITERATIONS, history: list | None = None
+) -> dict:
+    messages        = start_question(question, history)
     tool_calls_made = 0
-    ttft            = None          # captured on first LLM call only
+    answer          = None
+    log             = new_log()
 
     for _ in range(max_iterations):
-        t_call = time.time()
-        stream = ollama.chat(model=MODEL, messages=messages, tools=TOOLS, think=False, stream=True)
-
-        content_parts = []
-        tool_calls = []
-        for chunk in stream:
-            if ttft is None:            # first token of first call
-                ttft = time.time() - t_call
-            chunk_msg = getattr(chunk, "message", None)
-            if not chunk_msg:
-                continue
-            if chunk_msg.content:
-                content_parts.append(chunk_msg.content)
-            if chunk_msg.tool_calls:
-                tool_calls = chunk_msg.tool_calls
-
-        assistant_msg: dict[str, object] = {
-            "role": "assistant",
-            "content": "".join(content_parts),
-        }
-        if tool_calls:
-            assistant_msg["tool_calls"] = tool_calls
-        messages.append(assistant_msg)
-
-        if tool_calls:
-            for tc in tool_calls:
-                tool_calls_made += 1
-                fn     = tc.function.name
-                sql    = tc.function.arguments.get("sql", "")
-                result = TOOL_MAP[fn](sql)
-                print()
-                print(f"  [tool call #{tool_calls_made}] {fn}")
-                print(f"  SQL: {sql}")
-                print("  Result:")
-                print(result)
-                messages.append({"role": "tool", "content": result})
-        else:
-            answer = str(assistant_msg["content"]).strip()
-            print()
-            print("  [answer]")
-            print(answer)
-            return {"success": bool(answer), "tool_calls": tool_calls_made, "ttft": ttft}
+        sent = compact_messages(messages)       # --compact: older tool results shortened
+        with span("llm") as llm_span:
+            turn = Turn(log, llm_span)
+            for chunk in client.chat(
+                model=MODEL, messages=sent, tools=TOOLS, think=False, stream=True,
+                options=OPTIONS, keep_alive=KEEP_ALIVE,
+            ):
+                turn.add(chunk)
+        messages.append(turn.message())
+        if not turn.tool_calls:
+            answer = "".join(turn.parts).strip()
+            break
+        tool_calls_made = add_tool_results(messages, turn.tool_calls, call_tools(turn.tool_calls), tool_calls_made)
 
-    print()
-    print("  [!] Max iterations reached.")
-    return {"success": False, "tool_calls": tool_calls_made, "ttft": ttft}
+    if history is not None:
+        history[:] = messages
+    return finish(log, tool_calls_made, answer)
+
+
+class RawOllamaAdapter(Adapter):
+    name   = "raw_ollama"
+    label  = f"Raw Ollama ({MODEL})"
+    client = None
+
+    def build(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = ollama.Client(host=OLLAMA_HOST, **client_kwargs())
+
+    def open_session(self) -> list:
+        return []
+
+    def run(self, question: str, max_iterations: int | None = None, session: list | None = None) -> dict:
+        return run_test(question, self.client, max_iterations or MAX_ITERATIONS, session)
+
+    def close(self) -> None:
+        if pool is not None:
+            pool.shutdown()
+        if self.client is not None:
+            self.client.close()
+        con.close()
 
 
 if __name__ == "__main__":
-    if os.getenv("BENCH_WARMUP"):
-        print("  (packages ready)")
-        sys.exit(0)
-
-    results, times, ttfts = [], [], []
-    for q in QUESTIONS:
-        t0      = time.time()
-        r       = run_test(q)
-        elapsed = time.time() - t0
-        r["time"] = elapsed
-        results.append(r)
-        times.append(elapsed)
-        if r.get("ttft") is not None:
-            ttfts.append(r["ttft"])
-
-    print_summary(f"Raw Ollama ({MODEL})", results, times, ttfts or None)
-    append_log("raw_ollama", results, times, ttfts or None)
-    con.close()
+    run_script(RawOllamaAdapter(), __doc__)
@@ -0,0 +1,132 @@
+"""One HTTP connection policy for every framework, with connection setup timing.
+
+Each framework brings its own HTTP client: the Ollama client and
+``ChatOllama`` use ``httpx.Client``, Pydantic AI an ``AsyncOpenAI`` on
+``httpx.AsyncClient``, ADK goes through LiteLLM.  Left at their defaults
+they pool, time out and keep connections alive differently, and that
+transport difference shows up as "framework overhead".  Every benchmark
+builds its client from ``client_kwargs`` instead:
+
+- ``BENCH_HTTP_POOL``: connections per client, all kept alive (default 16)
+- ``BENCH_HTTP_KEEPALIVE``: idle seconds before a pooled connection closes
+  (default 60)
+- ``BENCH_HTTP_TIMEOUT``: read timeout in seconds (default 600)
+
+A request hook hands httpcore a trace callback that records one
+``connect`` span per request on the current ``timing.SpanLog``.  The span
+has ``new`` set when the request had to open a connection and lasts as long
+as the TCP connect plus any TLS handshake.  A reused connection gives a
+zero-length span.
+
+The hook also reads the chat request body.  It records how much of the
+prompt (tool schemas, then messages) is an unchanged prefix of the previous
+request in the same question, as ``prompt_chars`` and ``reused_chars`` on
+the ``connect`` span, and how much of the previous prompt was changed
+rather than appended to (``rewritten_chars``).  The server can only skip re-evaluating a prefix that
+stays the same.  A framework that rewrites its system prompt or reorders
+messages between turns loses that, and ``timing.prefix_stats`` shows it.
+"""
+
+import json
+import os
+import time
+import weakref
+from typing import Any, Optional
+
+import httpx
+
+from timing import SpanLog, current_log
+
+POOL_SIZE = int(os.getenv("BENCH_HTTP_POOL", "16"))
+KEEPALIVE = float(os.getenv("BENCH_HTTP_KEEPALIVE", "60"))
+TIMEOUT   = httpx.Timeout(float(os.getenv("BENCH_HTTP_TIMEOUT", "600")), connect=10.0)
+LIMITS    = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE, keepalive_expiry=KEEPALIVE)
+
+# Last prompt sent per question, for the prefix comparison
+_last_prompt: "weakref.WeakKeyDictionary[SpanLog, str]" = weakref.WeakKeyDictionary()
+
+
+def prompt_text(request: httpx.Request) -> Optional[str]:
+    """Canonical prompt of a chat request (native or OpenAI-compatible); ``None`` otherwise.
+
+    One line per tool schema and message, so a turn that only appends
+    messages keeps the previous prompt as an exact prefix.
+    """
+    try:
+        body = json.loads(request.content)
+    except (httpx.RequestNotRead, ValueError):
+        return None
+    if not isinstance(body, dict) or "messages" not in body:
+        return None
+    items = [*(body.get("tools") or []), *body["messages"]]
+    return "\n".join(json.dumps(item, sort_keys=True, separators=(",", ":")) for item in items)
+
+
+class ConnectTrace:
+    """httpcore ``trace`` extension for one request."""
+
+    def __init__(self, prompt: Optional[str] = None) -> None:
+        self.log     = current_log()
+        self.stages: dict[str, float] = {}
+        self.prompt: dict[str, int]   = {}
+        self._start: dict[str, float] = {}
+        self._first  = None
+        self._done   = False
+        if prompt is not None and self.log is not None:
+            prev = _last_prompt.get(self.log)
+            _last_prompt[self.log] = prompt
+            self.prompt["prompt_chars"] = len(prompt)
+            if prev is not None:
+                reused = len(os.path.commonprefix([prev, prompt]))
+                self.prompt["reused_chars"]    = reused
+                self.prompt["rewritten_chars"] = len(prev) - reused
+
+    def __call__(self, event: str, info: dict) -> None:
+        now = time.perf_counter()
+        if event.startswith(("connection.connect_", "connection.start_tls")):
+            stage = "tls" if "start_tls" in event else "tcp"
+            if event.endswith(".started"):
+                self._start[stage] = now
+                self._first = self._first or now
+            elif stage in self._start:
+                self.stages[stage] = now - self._start.pop(stage)
+        elif event.endswith("send_request_headers.started") and not self._done:
+            # first byte of the request: the connection is ready
+            self._done = True
+            if self.log is not None:
+                self.log.add("connect", self._first or now, now, new=bool(self.stages), **self.stages, **self.prompt)
+
+    async def atrace(self, event: str, info: dict) -> None:
+        self(event, info)
+
+
+def _hook(request: httpx.Request) -> None:
+    request.extensions["trace"] = ConnectTrace(prompt_text(request))
+
+
+async def _ahook(request: httpx.Request) -> None:
+    request.extensions["trace"] = ConnectTrace(prompt_text(request)).atrace
+
+
+def client_kwargs(is_async: bool = False) -> dict[str, Any]:
+    """Keyword arguments for an ``httpx`` (or ``ollama``) client under the shared policy."""
+    return {
+        "limits":      LIMITS,
+        "timeout":     TIMEOUT,
+        "event_hooks": {"request": [_ahook if is_async else _hook]},
+    }
+
+
+def http_client() -> httpx.Client:
+    return httpx.Client(**client_kwargs())
+
+
+def async_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(**client_kwargs(is_async=True))
+
+
+def connection_stats(spans: list[dict]) -> dict:
+    """Requests, new connections and their setup time from ``connect`` spans."""
+    conns = [s for s in spans if s["kind"] == "connect"]
+    new   = [s["duration"] for s in conns if s.get("new")]
+    return {"requests": len(conns), "new": len(new), "setup": sum(new)} if conns else {}
@@ -1,14 +1,45 @@
 """Shared constants, DB setup, and helpers for all benchmark scripts."""
 
+import argparse
+import os
+import re
+import threading
+import time
 import duckdb
-from datetime import datetime
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
+from compaction import MODE as COMPACT_MODE, MODES as COMPACT_MODES
+from datagen import load_dataset
+from memory import MemoryProbe, memory_summary
+from results_db import RESULTS_DB, store_run
+from stats import describe, percentile
+from timing import compaction_stats, phase_breakdown, prefix_stats, span, stream_metrics, tool_batches, turn_prompts
+from transport import connection_stats
+from workload import Checkpoint, Workload, as_workload, limits, parse_shard
 
 MODEL    = "qwen3:8b"
 LOG_FILE = Path(__file__).parent / "bench_results.log"
 SEP      = chr(9552) * 62
 
+# Model endpoint shared by every script; point it at mock_ollama.py (or any
+# Ollama-compatible server) with OLLAMA_HOST=http://127.0.0.1:11435.
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+if "://" not in OLLAMA_HOST:
+    OLLAMA_HOST = f"http://{OLLAMA_HOST}"
+BACKEND     = os.getenv("BENCH_BACKEND", "ollama")
+# Larger synthetic sales table: a row count ("1M") or a file from datagen.py
+DATASET     = os.getenv("BENCH_DATASET")
+# Caps on one tool result handed to the model (rows kept, characters of text)
+MAX_ROWS    = int(os.getenv("BENCH_MAX_ROWS", "100"))
+MAX_CHARS   = int(os.getenv("BENCH_MAX_CHARS", "8000"))
+# Per-question lines in the summary; large workloads list only the first ones
+MAX_LISTED  = 20
+# Model turns shown in the prompt-per-turn line
+MAX_TURNS   = 6
+
 QUESTIONS = [
     "What is the total revenue per category?",
     "Which region had the highest total revenue?",
@@ -18,8 +49,27 @@ QUESTIONS = [
 ]
 
 
-def setup_db() -> duckdb.DuckDBPyConnection:
-    """Return an in-memory DuckDB connection pre-loaded with sample sales data."""
+_DATABASES: dict[Optional[str], duckdb.DuckDBPyConnection] = {}
+_db_lock = threading.Lock()
+
+
+def setup_db(dataset: Optional[str] = DATASET) -> duckdb.DuckDBPyConnection:
+    """Return a DuckDB connection to the ``sales`` table, by default the sample rows.
+
+    With ``dataset`` (``BENCH_DATASET``) the table comes from ``datagen.py``
+    instead: generated in memory for a row count, or opened from a
+    ``.parquet`` / ``.duckdb`` file written by ``datagen.py --out``.  Each
+    dataset is built once per process; every call gets its own cursor on
+    it, so the scripts in one harness and the grader share one copy.
+    Closing a cursor leaves the database open.
+    """
+    with _db_lock:
+        if dataset not in _DATABASES:
+            _DATABASES[dataset] = load_dataset(dataset) if dataset else _sample_db()
+        return _DATABASES[dataset].cursor()
+
+
+def _sample_db() -> duckdb.DuckDBPyConnection:
     con = duckdb.connect()
     con.execute("""
         CREATE TABLE sales (
@@ -55,24 +105,221 @@ def setup_db() -> duckdb.DuckDBPyConnection:
     return con
 
 
-def fmt_table(result) -> str:
-    """Format a DuckDB query result as a plain-text table string."""
-    cols = [d[0] for d in result.description]
-    rows = result.fetchall()
-    if not rows:
+def _fmt_value(v) -> str:
+    return "NULL" if v is None else str(v)
+
+
+def _summary(result, cols: list[str], kept: list[tuple], seen: int, batch: int) -> tuple[int, str]:
+    """Total row count and min/max of numeric/date columns over the whole result.
+
+    A relation is aggregated inside DuckDB, which runs its query a second
+    time but stays vectorized.  Columns are renamed by position (``c0``,
+    ``c1``, ...) first, so duplicate or quoted names cannot mix them up.  A
+    plain cursor result is drained in batches, keeping nothing but the
+    counters.
+    """
+    ordered = [
+        i for i, v in enumerate(kept[0])
+        if isinstance(v, (int, float, Decimal, date)) and not isinstance(v, bool)
+    ] if kept else []
+    if hasattr(result, "aggregate"):
+        names = ", ".join(f"c{i}" for i in range(len(cols)))
+        exprs = ["count(*)"] + [f"min(c{i}), max(c{i})" for i in ordered]
+        agg   = result.query("_summary", f"SELECT {', '.join(exprs)} FROM _summary AS _summary({names})").fetchone()
+        total = agg[0]
+        lows  = agg[1::2]
+        highs = agg[2::2]
+    else:
+        total = seen
+        lows  = [min((r[i] for r in kept if r[i] is not None), default=None) for i in ordered]
+        highs = [max((r[i] for r in kept if r[i] is not None), default=None) for i in ordered]
+        while rows := result.fetchmany(batch):
+            total += len(rows)
+            for k, i in enumerate(ordered):
+                vals = [r[i] for r in rows if r[i] is not None]
+                if vals:
+                    lows[k]  = min(vals) if lows[k] is None else min(lows[k], min(vals))
+                    highs[k] = max(vals) if highs[k] is None else max(highs[k], max(vals))
+    stats = "; ".join(f"{cols[i]} {lo}..{hi}" for i, lo, hi in zip(ordered, lows, highs))
+    return total, stats
+
+
+def fmt_table(
+    result,
+    max_rows: int = MAX_ROWS,
+    max_chars: int = MAX_CHARS,
+    info: Optional[dict] = None,
+) -> str:
+    """Format a DuckDB query result as a plain-text table string.
+
+    Rows are fetched in batches and at most ``max_rows`` are kept, and the
+    text stops before ``max_chars``.  A truncated table ends with a notice
+    and a summary (total rows, min..max of numeric/date columns), so a
+    careless ``SELECT *`` costs neither memory nor prompt tokens.  ``info``,
+    if given, receives ``rows`` (total) and ``truncated``.
+    """
+    cols  = [d[0] for d in result.description]
+    batch = min(1024, max_rows + 1)
+    kept  = []
+    while len(kept) <= max_rows and (rows := result.fetchmany(batch)):
+        kept.extend(rows)
+    seen = len(kept)
+    more = seen > max_rows
+    kept = kept[:max_rows]
+    if not kept:
+        if info is not None:
+            info.update(rows=0, truncated=False)
         return "No results."
     widths = [
-        max(len(str(c)), max(len(str(r[i])) for r in rows))
+        max(len(str(c)), max(len(_fmt_value(r[i])) for r in kept))
         for i, c in enumerate(cols)
     ]
     fmt   = "  ".join(f"{{:<{w}}}" for w in widths)
     lines = [fmt.format(*cols), "  ".join("-" * w for w in widths)]
-    lines += [fmt.format(*[str(v) for v in row]) for row in rows]
+    size  = sum(len(line) + 1 for line in lines)
+    shown = 0
+    for row in kept:
+        line = fmt.format(*[_fmt_value(v) for v in row])
+        if size + len(line) + 1 > max_chars:
+            break
+        lines.append(line)
+        size  += len(line) + 1
+        shown += 1
+    truncated = more or shown < len(kept)
+    total     = seen
+    if truncated:
+        total, stats = _summary(result, cols, kept, seen, batch)
+        lines.append(f"... truncated: showing {shown} of {total:,} rows (limit {max_rows} rows / {max_chars:,} chars)")
+        lines.append(f"Summary: {total:,} rows x {len(cols)} columns" + (f"; {stats}" if stats else ""))
+    if info is not None:
+        info.update(rows=total, truncated=truncated)
     return "\n".join(lines)
 
 
+# Tokens of a SQL string: quoted literals/identifiers (kept verbatim), line comments,
+# whitespace, words, other (never swallowing the start of a "--" comment)
+_SQL_TOKENS   = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|\s+|\w+|(?:(?!--)[^'"\s\w])+""")
+# Words DuckDB never takes as a bare column name (reserved, type/function and
+# column-name keywords), so folding their case is safe; headers echo them folded anyway
+_SQL_KEYWORDS = {
+    "all", "and", "anti", "any", "as", "asc", "asof", "between", "by", "case", "cast", "cross",
+    "desc", "distinct", "else", "end", "except", "exists", "false", "from", "full", "group",
+    "having", "ilike", "in", "inner", "intersect", "is", "join", "lateral", "left", "like",
+    "limit", "natural", "not", "null", "offset", "on", "or", "order", "outer", "positional",
+    "qualify", "right", "select", "semi", "then", "true", "union", "using", "when", "where",
+    "window", "with",
+}
+_READ_ONLY    = re.compile(r"^(select|with|from|values|table|show|describe|summarize|pivot|unpivot)\b", re.I)
+
+
+def normalize_sql(sql: str) -> str:
+    """Cache key for a query: keyword case, whitespace and ``--`` comments folded.
+
+    ``SELECT  category, SUM(x)`` and ``select category,SUM(x);`` share a key.
+    Quoted text is never touched.  Identifiers keep their case, including an
+    alias after ``AS`` that happens to be a keyword, because DuckDB echoes
+    them in the result's column headers.  Operators keep their spacing
+    (``5 - -3`` is not ``5 --3``); only spaces next to parentheses and commas
+    are dropped.  SQL the tokenizer cannot split safely (dollar quotes,
+    backslash escapes, block comments, an unclosed quote) is its own key.
+    """
+    sql = sql.strip().rstrip(";").strip()
+    if any(s in sql for s in ("$", "\\", "/*")):
+        return sql
+    toks = _SQL_TOKENS.findall(sql)
+    if "".join(toks) != sql:
+        return sql
+    out, prev = [], ""
+    for tok in toks:
+        if tok.isspace() or tok.startswith("--"):
+            if out and out[-1] != " ":
+                out.append(" ")
+            continue
+        if tok.lower() in _SQL_KEYWORDS and prev != "as":
+            tok = tok.lower()
+        out.append(tok)
+        prev = tok.lower()
+    key = [
+        tok for i, tok in enumerate(out)
+        if not (tok == " " and ((i > 0 and out[i - 1] in "(),") or (i + 1 < len(out) and out[i + 1] in "(),")))
+    ]
+    return "".join(key).strip()
+
+
+class QueryCache:
+    """Bounded LRU of formatted query results, keyed by normalized SQL.
+
+    Disabled while ``maxsize`` is 0.  Only read-only statements are cached;
+    any other statement through the runner (INSERT, UPDATE, CREATE OR
+    REPLACE ...) clears it, and code that changes ``sales`` behind the
+    runner's back calls ``invalidate()``.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.maxsize   = maxsize
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock     = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            out = self._entries.get(key)
+            if out is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return out
+
+    def put(self, key: str, out: str) -> None:
+        with self._lock:
+            self._entries[key] = out
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+
+# Every runner's cache, so --query-cache can size them after module import
+_CACHES: list[QueryCache] = []
+
+
+def configure_query_cache(maxsize: int) -> None:
+    """Resize (0 disables) the result cache of every query runner."""
+    for cache in _CACHES:
+        cache.resize(maxsize)
+
+
 def make_query_runner(con: duckdb.DuckDBPyConnection):
-    """Return a run_duckdb_query function bound to the given connection."""
+    """Return a run_duckdb_query function bound to the given connection.
+
+    Each thread gets its own cursor (a DuckDB connection is not safe to
+    share across threads), so concurrent questions can query in parallel.
+    Results go through a ``QueryCache`` (``run_duckdb_query.cache``), off
+    unless sized with ``--query-cache N`` or ``BENCH_QUERY_CACHE``.
+    """
+    local = threading.local()
+    cache = QueryCache(int(os.getenv("BENCH_QUERY_CACHE", "0")))
+    _CACHES.append(cache)
+
+    def cursor() -> duckdb.DuckDBPyConnection:
+        cur = getattr(local, "cur", None)
+        if cur is None:
+            cur = local.cur = con.cursor()
+        return cur
+
     def run_duckdb_query(sql: str) -> str:
         """Execute a SQL query on DuckDB and return results as a table.
 
@@ -87,18 +334,396 @@ def make_query_runner(con: duckdb.DuckDBPyConnection):
         Returns:
             Query results formatted as a plain-text table.
         """
-        try:
-            return fmt_table(con.execute(sql))
-        except Exception as e:
-            return f"Query error: {e}"
+        with span("tool", name="run_duckdb_query", sql=sql) as s:
+            key = normalize_sql(sql) if cache.maxsize else None
+            out = None
+            if key is not None and _READ_ONLY.match(key):
+                out      = cache.get(key)
+                s["cache"] = "hit" if out is not None else "miss"
+            if out is None:
+                try:
+                    rel = cursor().sql(sql)
+                    out = fmt_table(rel, info=s) if rel is not None else "OK (statement executed, no result)."
+                    if s.get("cache") == "miss":
+                        cache.put(key, out)
+                    elif key is not None:
+                        cache.invalidate()      # a write may have changed sales
+                except Exception as e:
+                    out = f"Query error: {e}"
+            s["chars"] = len(out)
+        return out
+
+    run_duckdb_query.cache = cache
     return run_duckdb_query
 
 
+def _levels(value: str) -> list[int]:
+    levels = [int(v) for v in value.split(",") if v.strip()]
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("expected positive integers, e.g. 1,2,4,8")
+    return levels
+
+
+def _rates(value: str) -> list[float]:
+    rates = [float(v) for v in value.split(",") if v.strip()]
+    if not rates or min(rates) <= 0:
+        raise argparse.ArgumentTypeError("expected positive arrival rates, e.g. 0.5,1,2,4")
+    return rates
+
+
+def _shard(value: str) -> tuple[int, int]:
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def make_parser(description: Optional[str] = None) -> argparse.ArgumentParser:
+    """Command-line options shared by every benchmark script and the harness."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--concurrency", type=_levels, metavar="N[,N...]",
+        help="run a throughput sweep at these concurrency levels, e.g. 1,2,4,8,16",
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=0, metavar="N",
+        help="rounds over all questions to run first and discard (default 0)",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=1, metavar="N",
+        help="measured rounds over all questions (default 1)",
+    )
+    parser.add_argument(
+        "--query-cache", type=int, default=int(os.getenv("BENCH_QUERY_CACHE", "0")), metavar="N",
+        help="cache up to N run_duckdb_query results (LRU, normalized SQL); 0 = off (default)",
+    )
+    parser.add_argument(
+        "--memory", action="store_true",
+        help="trace Python allocations (tracemalloc) per question; slows the run",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="sample client CPU per question (model wait excluded); speedscope files in profiles/",
+    )
+    parser.add_argument(
+        "--profile-interval", type=float, default=5.0, metavar="MS",
+        help="sampling interval for --profile in milliseconds (default 5)",
+    )
+    parser.add_argument(
+        "--lifecycle", choices=["fresh", "shared", "session"], default="shared",
+        help="new agent per question, one agent with a new session per question (default),"
+             " or one long-lived session",
+    )
+    parser.add_argument(
+        "--model-state", choices=["warm", "cold"], default="warm",
+        help="load the model once before measuring (default) or unload it before every question",
+    )
+    parser.add_argument(
+        "--compact", choices=COMPACT_MODES, default=COMPACT_MODE,
+        help="shorten tool results the model already answered before the next call (default off)",
+    )
+    load = parser.add_argument_group("open-loop load (loadgen.py)")
+    load.add_argument(
+        "--rate", type=_rates, metavar="R[,R...]",
+        help="fire questions at these arrival rates (questions/s), independent of completions",
+    )
+    load.add_argument(
+        "--arrivals", choices=["poisson", "bursty", "uniform"], default="poisson",
+        help="inter-arrival times (default poisson)",
+    )
+    load.add_argument("--duration", type=float, default=30.0, metavar="S", help="seconds of arrivals per rate (default 30)")
+    load.add_argument(
+        "--max-inflight", type=int, default=int(os.getenv("OLLAMA_NUM_PARALLEL", "0")), metavar="N",
+        help="questions served at once; the rest queue (default OLLAMA_NUM_PARALLEL, else unbounded)",
+    )
+    load.add_argument("--slo", type=float, default=10.0, metavar="S", help="response time counted as good (default 10s)")
+    work = parser.add_argument_group("workload (workload.py)")
+    work.add_argument("--workload", type=Path, metavar="FILE", help="questions from .jsonl, .parquet or .txt instead of QUESTIONS")
+    work.add_argument("--shard", type=_shard, default=(0, 1), metavar="K/N", help="take every N-th question starting at K")
+    work.add_argument("--limit", type=int, metavar="N", help="stop after N questions (per round)")
+    work.add_argument("--checkpoint", type=Path, metavar="FILE", help="append finished questions here; rerun to resume")
+    return parser
+
+
+def parse_args(description: Optional[str] = None) -> argparse.Namespace:
+    return make_parser(description).parse_args()
+
+
+def workload_from_args(args: argparse.Namespace) -> Workload:
+    """The ``--workload/--shard/--limit`` selection, or the built-in QUESTIONS."""
+    return Workload(args.workload, questions=QUESTIONS, shard=args.shard, limit=args.limit)
+
+
+def tag_result(r: dict, rec: dict, rnd: int, elapsed: float) -> dict:
+    r.setdefault("time", elapsed)
+    r["question"]  = rec["question"]
+    r["iteration"] = rnd
+    r["qid"]       = rec["id"]
+    for key in ("tags", "expected", "sql"):
+        if rec.get(key):
+            r[key] = rec[key]
+    return r
+
+
+def run_rounds(
+    run_one,
+    questions: Union[list, Workload],
+    warmup: int = 0,
+    iterations: int = 1,
+    probe: Optional[MemoryProbe] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> list:
+    """Run ``warmup`` discarded rounds, then ``iterations`` measured ones.
+
+    Returns one result per measured question, tagged with ``question``,
+    ``qid`` and ``iteration``; ``time`` is wall-clock unless run_one already
+    set it.  ``probe`` adds memory fields (RSS by default) outside the timed
+    region.  With a ``checkpoint``, measured questions already in it are
+    skipped and their stored results come first.
+    """
+    probe   = probe or MemoryProbe()
+    results = list(checkpoint.results) if checkpoint else []
+    for rnd in range(-warmup, iterations):
+        if warmup or iterations > 1:
+            label = f"warmup {rnd + warmup + 1}/{warmup}" if rnd < 0 else f"iteration {rnd + 1}/{iterations}"
+            print(f"\n  --- {label} ---")
+        for rec in as_workload(questions):
+            if rnd >= 0 and checkpoint and checkpoint.has(rec["id"], rnd):
+                continue
+            probe.before()
+            t0      = time.time()
+            r       = run_one(rec["question"], **limits(rec))
+            elapsed = time.time() - t0
+            probe.after(r, measured=rnd >= 0)
+            if rnd >= 0:
+                results.append(tag_result(r, rec, rnd, elapsed))
+                if checkpoint:
+                    checkpoint.add(r)
+    return results
+
+
+async def run_rounds_async(
+    run_one,
+    questions: Union[list, Workload],
+    warmup: int = 0,
+    iterations: int = 1,
+    probe: Optional[MemoryProbe] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> list:
+    """Async twin of ``run_rounds`` for coroutine-based benchmarks."""
+    probe   = probe or MemoryProbe()
+    results = list(checkpoint.results) if checkpoint else []
+    for rnd in range(-warmup, iterations):
+        if warmup or iterations > 1:
+            label = f"warmup {rnd + warmup + 1}/{warmup}" if rnd < 0 else f"iteration {rnd + 1}/{iterations}"
+            print(f"\n  --- {label} ---")
+        for rec in as_workload(questions):
+            if rnd >= 0 and checkpoint and checkpoint.has(rec["id"], rnd):
+                continue
+            probe.before()
+            t0      = time.time()
+            r       = await run_one(rec["question"], **limits(rec))
+            elapsed = time.time() - t0
+            probe.after(r, measured=rnd >= 0)
+            if rnd >= 0:
+                results.append(tag_result(r, rec, rnd, elapsed))
+                if checkpoint:
+                    checkpoint.add(r)
+    return results
+
+
+def _phases(results: list) -> list:
+    """Per-question phase breakdowns for results that carry spans."""
+    return [phase_breakdown(r["spans"], r["time"]) for r in results if "spans" in r]
+
+
+def _avg(phases: list, key: str) -> float:
+    return sum(p.get(key, 0.0) for p in phases) / len(phases)
+
+
+def _by_question(results: list) -> dict:
+    """Group results by workload id (else question text), in first-seen order.
+
+    Two records may ask the same text under different ids; they stay apart.
+    """
+    groups: dict = {}
+    for r in results:
+        key = r["qid"] if r.get("qid") is not None else r.get("question", "")
+        groups.setdefault(key, []).append(r)
+    return groups
+
+
+def _fmt_dist(d: dict, unit: str = "s", prec: int = 2) -> str:
+    f = f"{{:.{prec}f}}{unit}"
+    return (
+        f"mean {f.format(d['mean'])}  sd {f.format(d['stdev'])}"
+        f"  p50 {f.format(d['p50'])}  p90 {f.format(d['p90'])}  p99 {f.format(d['p99'])}"
+        f"  95% CI [{f.format(d['ci_lo'])}, {f.format(d['ci_hi'])}]"
+    )
+
+
+def _cache_stats(results: list) -> dict:
+    """Query cache hits/misses and their mean latency, from the tool spans."""
+    spans = [s for r in results for s in r.get("spans") or [] if s.get("cache")]
+    if not spans:
+        return {}
+    hits   = [s["duration"] for s in spans if s["cache"] == "hit"]
+    misses = [s["duration"] for s in spans if s["cache"] == "miss"]
+    return {
+        "hits":     len(hits),
+        "misses":   len(misses),
+        "rate":     len(hits) / len(spans),
+        "hit_avg":  sum(hits) / len(hits) if hits else 0.0,
+        "miss_avg": sum(misses) / len(misses) if misses else 0.0,
+    }
+
+
+def _streaming(results: list) -> dict:
+    """Inter-token gaps pooled over all questions, and the overall decode rate."""
+    per_q  = [stream_metrics(r.get("spans") or []) for r in results]
+    itl    = [g for m in per_q for g in m.get("itl", [])]
+    decode = sum(m.get("decode", 0.0) for m in per_q)
+    if not itl:
+        return {}
+    return {
+        "itl_p50":    percentile(itl, 50),
+        "itl_p90":    percentile(itl, 90),
+        "itl_p99":    percentile(itl, 99),
+        "tokens":     sum(m.get("tokens", 0) for m in per_q),
+        "decode_tps": len(itl) / decode if decode > 0 else 0.0,
+    }
+
+
+def _parallel_tools(results: list) -> dict:
+    """Multi-call turns per question and the tool time saved by overlapping them."""
+    per_q = {}
+    for r in results:
+        batches = tool_batches(r.get("spans") or [])
+        if batches:
+            q = per_q.setdefault(r.get("question", ""), {"turns": 0, "calls": 0, "serial": 0.0, "saved": 0.0, "n": 0})
+            q["n"]      += 1
+            q["turns"]  += len(batches)
+            q["calls"]  += sum(b["calls"] for b in batches)
+            q["serial"] += sum(b["serial"] for b in batches)
+            q["saved"]  += sum(b["saved"] for b in batches)
+    if not per_q:
+        return {}
+    return {
+        "turns":       sum(q["turns"] for q in per_q.values()),
+        "calls":       sum(q["calls"] for q in per_q.values()),
+        "serial":      sum(q["serial"] for q in per_q.values()),
+        "saved":       sum(q["saved"] for q in per_q.values()),
+        "saved_per_q": sum(q["saved"] for q in per_q.values()) / len(results),
+        "questions":   per_q,
+    }
+
+
+def _connections(results: list) -> dict:
+    """HTTP requests, new connections and setup time pooled over all questions."""
+    stats = connection_stats([s for r in results for s in r.get("spans") or []])
+    if not stats:
+        return {}
+    return {
+        **stats,
+        "reused":    1 - stats["new"] / stats["requests"],
+        "setup_avg": stats["setup"] / stats["new"] if stats["new"] else 0.0,
+    }
+
+
+def _lifecycle(results: list) -> dict:
+    """Agent/session setup and teardown per question, next to the question time."""
+    rs = [r for r in results if "setup" in r]
+    if not rs:
+        return {}
+    setup    = [r["setup"] for r in rs]
+    teardown = sum(r["teardown"] for r in rs) / len(rs)
+    avg_time = sum(r["time"] for r in rs) / len(rs)
+    return {
+        "mode":      rs[0].get("lifecycle", ""),
+        "setup":     sum(setup) / len(rs),
+        "setup_max": max(setup),
+        "teardown":  teardown,
+        "share":     (sum(setup) / len(rs) + teardown) / avg_time if avg_time > 0 else 0.0,
+    }
+
+
+def _residency(results: list) -> dict:
+    """Model state counts with mean time per state, and prompt-prefix reuse."""
+    out: dict = {}
+    states: dict[str, list] = {}
+    for r in results:
+        if r.get("model_state"):
+            states.setdefault(r["model_state"], []).append(r["time"])
+    if states:
+        out["states"] = {k: (len(v), sum(v) / len(v)) for k, v in states.items()}
+        out["ctx"]    = sorted({r["num_ctx"] for r in results if r.get("num_ctx")})
+    ps = prefix_stats([s for r in results for s in r.get("spans") or []])
+    if ps:
+        out["prefix"] = ps
+    return out
+
+
+def _accuracy(results: list) -> dict:
+    """Graded answers (``answers.grade``): correct count, SQL check, goodput."""
+    graded = [r for r in results if r.get("correct") is not None]
+    if not graded:
+        return {}
+    correct = sum(1 for r in graded if r["correct"])
+    checked = [r["sql_ok"] for r in graded if "sql_ok" in r]
+    busy    = sum(r["time"] for r in results)
+    return {
+        "graded":  len(graded),
+        "correct": correct,
+        "sql":     (sum(checked), len(checked)),
+        "goodput": correct / busy if busy > 0 else 0.0,
+        "wrong":   [r for r in graded if not r["correct"]],
+    }
+
+
+def _context(results: list) -> dict:
+    """Mean prompt size per model turn, and what compaction kept out of the prompts."""
+    per_turn: dict[int, list] = {}
+    for r in results:
+        for i, t in enumerate(turn_prompts(r.get("spans") or [])):
+            per_turn.setdefault(i, []).append(t)
+
+    def mean(ts: list, key: str) -> Optional[float]:
+        values = [t[key] for t in ts if t[key] is not None]
+        return sum(values) / len(values) if values else None
+
+    turns = [{k: mean(ts, k) for k in ("chars", "tokens", "prompt_eval")} for _, ts in sorted(per_turn.items())]
+    out: dict = {}
+    if any(t["chars"] is not None for t in turns):
+        chars        = [t["chars"] for t in turns if t["chars"] is not None]
+        out["turns"] = turns
+        out["growth"] = (chars[-1] - chars[0]) / (len(chars) - 1) if len(chars) > 1 else 0.0
+    cs = compaction_stats([s for r in results for s in r.get("spans") or []])
+    if cs:
+        sent = sum(t["chars"] or 0 for r in results for t in turn_prompts(r.get("spans") or []))
+        out["compact"] = {**cs, "share": cs["chars"] / (sent + cs["chars"]) if sent else 0.0}
+    return out
+
+
+def _print_memory(results: list, allocators: Optional[list]) -> None:
+    mem = memory_summary(results)
+    if not mem:
+        return
+    print(f"  RSS              : {mem['rss']:.0f}MB  (peak {mem['peak_rss']:.0f}MB, {mem['rss_growth']:+.2f}MB/Q)")
+    if "py_peak" in mem:
+        print(f"  Python heap      : {mem['py_retained']:.1f}MB live  (peak +{mem['py_peak']:.1f}MB/Q,"
+              f" retained {mem['py_growth'] * 1024:+.0f}KB/Q)")
+    if allocators:
+        print("  Top allocators   : (live growth since the first measured question)")
+    for a in allocators or []:
+        print(f"     {a['size'] * 1024:+8.0f}KB {a['count']:+7d} blocks  {a['where']}")
+
+
 def print_summary(
     name: str,
     results: list,
     times: list,
     ttfts: Optional[list] = None,
+    allocators: Optional[list] = None,
 ) -> None:
     passed    = sum(1 for r in results if r["success"])
     avg_calls = sum(r["tool_calls"] for r in results) / len(results)
@@ -108,34 +733,183 @@ def print_summary(
     print(f"  SUMMARY  ({name})")
     print(SEP)
     print(f"  Passed           : {passed}/{len(results)}")
+    ac = _accuracy(results)
+    if ac:
+        sql_ok, sql_n = ac["sql"]
+        print(f"  Correct          : {ac['correct']}/{ac['graded']} ({ac['correct'] / ac['graded']:.0%})"
+              + (f", right SQL {sql_ok}/{sql_n}" if sql_n else "")
+              + (f"; {len(results) - ac['graded']} ungraded" if ac["graded"] < len(results) else ""))
+        print(f"  Goodput          : {ac['goodput']:.3f} correct answers/s of question time")
+        for r in ac["wrong"][:3]:
+            print(f"     wrong: {r['question'][:50]}  (missing {', '.join(map(_fmt_value, r.get('missing', [])))})")
     print(f"  Avg tool calls/Q : {avg_calls:.1f}")
     print(f"  Avg time/Q       : {avg_time:.2f}s")
     if ttfts:
         avg_ttft = sum(ttfts) / len(ttfts)
         print(f"  Avg TTFT/Q       : {avg_ttft:.3f}s")
-    for i, (q, r) in enumerate(zip(QUESTIONS, results), 1):
-        status   = "OK" if r["success"] else "FAIL"
-        ttft_str = f"  ttft={r['ttft']:.3f}s" if r.get("ttft") is not None else ""
-        print(f"  [{status}] Q{i} - {r['tool_calls']} call(s)  {r['time']:.1f}s{ttft_str}  |  {q[:40]}")
+    phases = _phases(results)
+    if phases:
+        detail = ", ".join(
+            f"{label} {_avg(phases, key):.2f}s"
+            for key, label in (("prompt_eval", "prompt eval"), ("eval", "decode"), ("load", "load"))
+            if any(key in p for p in phases)
+        )
+        print(f"  Avg inference/Q  : {_avg(phases, 'llm'):.2f}s  ({_avg(phases, 'llm_calls'):.1f} LLM calls"
+              + (f"; {detail}" if detail else "") + ")")
+        print(f"  Avg tool time/Q  : {_avg(phases, 'tool'):.3f}s")
+        tools = [t for r in results for t in r.get("spans") or [] if t["kind"] == "tool" and "chars" in t]
+        if tools:
+            cut = sum(1 for t in tools if t.get("truncated"))
+            print(f"  Tool results     : {sum(t['chars'] for t in tools) / len(tools):,.0f} chars avg,"
+                  f" max {max(t['chars'] for t in tools):,}" + (f", {cut} truncated" if cut else ""))
+        qc = _cache_stats(results)
+        if qc:
+            print(f"  Query cache      : {qc['hits']} hits / {qc['misses']} misses ({qc['rate']:.0%})"
+                  f"  hit {qc['hit_avg'] * 1000:.2f}ms vs miss {qc['miss_avg'] * 1000:.2f}ms avg")
+        pt = _parallel_tools(results)
+        if pt:
+            print(f"  Parallel tools   : {pt['turns']} multi-call turns ({pt['calls']} calls),"
+                  f" {pt['serial'] * 1000:.1f}ms serial -> saved {pt['saved'] * 1000:.1f}ms"
+                  f" ({pt['saved_per_q'] * 1000:.2f}ms/Q)")
+            for q, b in pt["questions"].items():
+                print(f"     {b['saved'] / b['n'] * 1000:7.2f}ms saved/run  {b['calls'] / b['n']:.1f} calls  {q[:50]}")
+        print(f"  Avg other/Q      : {_avg(phases, 'other'):.2f}s  (framework overhead)")
+    st = _streaming(results)
+    if st:
+        print(f"  Inter-token      : p50 {st['itl_p50'] * 1000:.1f}ms  p90 {st['itl_p90'] * 1000:.1f}ms"
+              f"  p99 {st['itl_p99'] * 1000:.1f}ms  ({st['tokens']} streamed tokens)")
+        print(f"  Decode           : {st['decode_tps']:.1f} tok/s")
+    cs = _connections(results)
+    if cs:
+        print(f"  Connections      : {cs['new']} new / {cs['requests']} requests ({cs['reused']:.0%} reused),"
+              f" setup {cs['setup_avg'] * 1000:.2f}ms avg, {cs['setup'] / len(results) * 1000:.2f}ms/Q")
+    lc = _lifecycle(results)
+    if lc:
+        print(f"  Lifecycle        : {lc['mode']}, setup {lc['setup'] * 1000:.1f}ms/Q (max {lc['setup_max'] * 1000:.1f}ms),"
+              f" teardown {lc['teardown'] * 1000:.1f}ms/Q  (+{lc['share']:.1%} on top of time/Q)")
+    rs = _residency(results)
+    if "states" in rs:
+        ctx = f"; num_ctx {', '.join(map(str, rs['ctx']))}" if rs["ctx"] else ""
+        print("  Model state      : " + ", ".join(
+            f"{k} {n}/{len(results)} ({t:.2f}s/Q)" for k, (n, t) in sorted(rs["states"].items(), key=lambda kv: -kv[1][0])
+        ) + ctx)
+    if "prefix" in rs:
+        ps = rs["prefix"]
+        print(f"  Prompt prefix    : {ps['reuse']:.0%} of follow-up prompts reused from the previous request,"
+              f" {ps['rewritten']:,} chars rewritten ({ps['requests']} requests, {ps['chars'] / ps['requests']:,.0f} chars avg)")
+    cx = _context(results)
+    if "turns" in cx:
+        print("  Prompt per turn  : " + "   ".join(
+            f"{i}: {t['chars']:,.0f} ch" + (f" / {t['tokens']:,.0f} tok" if t["tokens"] is not None else "")
+            + (f" / {t['prompt_eval']:.2f}s" if t["prompt_eval"] is not None else "")
+            for i, t in enumerate(cx["turns"][:MAX_TURNS], 1) if t["chars"] is not None
+        ) + f"  ({cx['growth']:+,.0f} ch/turn)")
+    if "compact" in cx:
+        cp = cx["compact"]
+        print(f"  Compaction       : {cp['mode']}, {cp['results']} tool results shortened, {cp['chars']:,} chars kept out"
+              f" of prompts ({cp['share']:.0%}), {cp['time'] / len(results) * 1000:.2f}ms/Q")
+    _print_memory(results, allocators)
+    groups = _by_question(results)
+    if len(results) > len(groups):
+        print(f"  Samples          : {len(results)} ({len(results) // len(groups)} per question)")
+        print(f"  Time/Q           : {_fmt_dist(describe(times))}")
+        if ttfts:
+            print(f"  TTFT/Q           : {_fmt_dist(describe(ttfts), prec=3)}")
+        for i, (key, rs) in enumerate(list(groups.items())[:MAX_LISTED], 1):
+            q     = rs[0].get("question") or str(key)
+            ok    = sum(1 for r in rs if r["success"])
+            q_tt  = [r["ttft"] for r in rs if r.get("ttft") is not None]
+            print(f"  Q{i} [{ok}/{len(rs)} OK]  {q[:50]}")
+            print(f"     time  {_fmt_dist(describe([r['time'] for r in rs]))}")
+            if q_tt:
+                print(f"     ttft  {_fmt_dist(describe(q_tt), prec=3)}")
+        _more(len(groups))
+        print()
+        return
+    for i, r in enumerate(results[:MAX_LISTED], 1):
+        q         = r.get("question") or str(r.get("qid", ""))
+        status    = "FAIL" if not r["success"] else "WRONG" if r.get("correct") is False else "OK"
+        ttft_str  = f"  ttft={r['ttft']:.3f}s" if r.get("ttft") is not None else ""
+        phase_str = ""
+        if "spans" in r:
+            p = phase_breakdown(r["spans"], r["time"])
+            phase_str = f"  [llm {p['llm']:.1f}s  tool {p['tool']:.2f}s  other {p['other']:.1f}s]"
+        print(f"  [{status}] Q{i} - {r['tool_calls']} call(s)  {r['time']:.1f}s{ttft_str}{phase_str}  |  {q[:40]}")
+    _more(len(groups))
     print()
 
 
+def _more(n: int) -> None:
+    if n > MAX_LISTED:
+        print(f"  ... {n - MAX_LISTED:,} more questions (results_db.py has them all)")
+
+
 def append_log(
     name: str,
     results: list,
     times: list,
     ttfts: Optional[list] = None,
+    allocators: Optional[list] = None,
 ) -> None:
-    """Append a one-line benchmark summary to bench_results.log."""
+    """Append a one-line summary to bench_results.log and store the full run.
+
+    Per-question rows and spans go to the DuckDB results store
+    (``results_db.py``), which is what ``results_db.py compare`` reads.
+    """
     passed    = sum(1 for r in results if r["success"])
     avg_calls = sum(r["tool_calls"] for r in results) / len(results)
     avg_time  = sum(times) / len(times)
     ts        = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     ttft_part = f" | TTFT {sum(ttfts)/len(ttfts):5.3f}s" if ttfts else ""
+    phases    = _phases(results)
+    phase_part = (
+        f" | llm {_avg(phases, 'llm'):5.2f}s tool {_avg(phases, 'tool'):5.3f}s"
+        f" other {_avg(phases, 'other'):5.2f}s"
+    ) if phases else ""
+    dist_part = ""
+    if len(results) > len(_by_question(results)):
+        d = describe(times)
+        dist_part = (
+            f" | n={d['n']} p50 {d['p50']:5.2f}s p90 {d['p90']:5.2f}s p99 {d['p99']:5.2f}s"
+            f" CI {d['ci_lo']:.2f}-{d['ci_hi']:.2f}s"
+        )
+    st       = _streaming(results)
+    itl_part = (
+        f" | itl p50 {st['itl_p50'] * 1000:.1f}ms p99 {st['itl_p99'] * 1000:.1f}ms"
+        f" decode {st['decode_tps']:.1f} tok/s"
+    ) if st else ""
+    qc       = _cache_stats(results)
+    qc_part  = f" | cache {qc['rate']:.0%} hit" if qc else ""
+    pt       = _parallel_tools(results)
+    pt_part  = f" | par tools -{pt['saved_per_q'] * 1000:.1f}ms/q" if pt else ""
+    cs       = _connections(results)
+    cs_part  = f" | conn {cs['reused']:.0%} reused" if cs else ""
+    lc       = _lifecycle(results)
+    lc_part  = f" | {lc['mode']} setup {(lc['setup'] + lc['teardown']) * 1000:.1f}ms/q" if lc else ""
+    ac       = _accuracy(results)
+    ac_part  = f" | correct {ac['correct']}/{ac['graded']} goodput {ac['goodput']:.3f}/s" if ac else ""
+    rs       = _residency(results)
+    rs_part  = "".join((
+        " | " + " ".join(f"{k} {n}" for k, (n, _) in rs["states"].items()) if "states" in rs else "",
+        f" | prefix {rs['prefix']['reuse']:.0%}" if "prefix" in rs else "",
+    ))
+    cx       = _context(results)
+    cx_part  = "".join((
+        f" | prompt {cx['growth']:+,.0f}ch/turn" if "turns" in cx else "",
+        f" | compact {cx['compact']['mode']} -{cx['compact']['share']:.0%}" if "compact" in cx else "",
+    ))
+    mem      = memory_summary(results)
+    mem_part = (
+        f" | rss {mem['rss']:.0f}MB peak {mem['peak_rss']:.0f}MB"
+        + (f" py +{mem['py_growth'] * 1024:.0f}KB/q" if "py_growth" in mem else "")
+    ) if mem else ""
+    back_part = f" | backend {BACKEND}" if BACKEND != "ollama" else ""
+    data_part = f" | dataset {DATASET}" if DATASET else ""
     line = (
-        f"{ts} | {name:<26} | {passed}/{len(results)} passed"
-        f" | avg {avg_time:5.2f}s{ttft_part} | {avg_calls:.1f} calls/q\n"
+        f"{ts} | {name:<26} | {passed}/{len(results)} passed{ac_part}"
+        f" | avg {avg_time:5.2f}s{ttft_part} | {avg_calls:.1f} calls/q{phase_part}{qc_part}{pt_part}{itl_part}{cs_part}{lc_part}{rs_part}{cx_part}{dist_part}{mem_part}{back_part}{data_part}\n"
     )
     with open(LOG_FILE, "a") as f:
         f.write(line)
-    print(f"  appended to {LOG_FILE.name}")
+    run_id = store_run(name, results, model=MODEL, backend=BACKEND, allocators=allocators)
+    print(f"  appended to {LOG_FILE.name}; run {run_id} stored in {RESULTS_DB.name}")
@@ -0,0 +1,182 @@
+"""Question workloads: the five built-in questions, or large files streamed lazily.
+
+A workload file is JSONL (one object per line), Parquet, or plain text (one
+question per line).  Every record becomes a dict with:
+
+- ``id``:             stable key for checkpoints (default: position in the file)
+- ``question``:       the prompt, the only required field
+- ``expected``:       reference answer text (optional)
+- ``sql``:            reference query (optional)
+- ``tags``:           list of labels, e.g. ``["multi-query", "ratio"]`` (optional)
+- ``max_iterations``: per-question cap on model turns (optional)
+
+Records are read as they are needed.  JSONL goes line by line and Parquet
+through DuckDB in batches, so a file with 50,000 questions never sits in
+memory.  ``--shard K/N`` keeps every N-th record starting at K, letting N
+processes split one file with no overlap.  ``--checkpoint FILE`` appends
+each finished measured question (result and spans) to a JSONL file.
+Rerun with the same arguments after a crash and the run skips what is
+already there, then reports old and new results together.
+
+    uv run tool_calling_test.py --workload data/questions.jsonl --limit 1000 --checkpoint ckpt/raw.jsonl
+    uv run tool_calling_test.py --workload data/questions.parquet --shard 0/4 --checkpoint ckpt/raw-0.jsonl
+"""
+
+import itertools
+import json
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+import duckdb
+
+FIELDS = ("id", "question", "expected", "sql", "tags", "max_iterations")
+BATCH  = 1024
+
+
+def _jsonl(path: Path) -> Iterator[dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _parquet(path: Path) -> Iterator[dict]:
+    con = duckdb.connect()
+    try:
+        cur  = con.execute("SELECT * FROM read_parquet(?)", [path.as_posix()])
+        cols = [d[0] for d in cur.description]
+        while batch := cur.fetchmany(BATCH):
+            for row in batch:
+                yield dict(zip(cols, row))
+    finally:
+        con.close()
+
+
+def _text(path: Path) -> Iterator[dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield {"question": line.strip()}
+
+
+def normalize(raw: dict | str, position: int) -> dict:
+    """Record dict with the known fields (a bare string is just the question)."""
+    if isinstance(raw, str):
+        raw = {"question": raw}
+    if not raw.get("question"):
+        raise ValueError(f"workload record {position} has no 'question'")
+    rec = {k: raw[k] for k in FIELDS if raw.get(k) is not None}
+    rec["id"]   = str(rec.get("id", position))
+    rec["tags"] = list(rec.get("tags") or [])
+    return rec
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """``"K/N"`` -> (K, N) with 0 <= K < N."""
+    k, _, n = value.partition("/")
+    shard = int(k), int(n or 0)
+    if not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"expected K/N with 0 <= K < N, got {value!r}")
+    return shard
+
+
+class Workload:
+    """Re-iterable stream of question records; each pass re-reads the source."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        questions: Optional[list[str]] = None,
+        shard: tuple[int, int] = (0, 1),
+        limit: Optional[int] = None,
+    ) -> None:
+        self.path      = Path(path) if path else None
+        self.questions = questions or []
+        self.shard     = shard
+        self.limit     = limit
+        if self.path and not self.path.exists():
+            raise FileNotFoundError(f"workload not found: {self.path}")
+
+    def _source(self) -> Iterator[dict | str]:
+        if self.path is None:
+            return iter(self.questions)
+        if self.path.suffix == ".jsonl":
+            return _jsonl(self.path)
+        if self.path.suffix == ".parquet":
+            return _parquet(self.path)
+        return _text(self.path)
+
+    def __iter__(self) -> Iterator[dict]:
+        k, n = self.shard
+        mine = (
+            normalize(raw, i) if self.path else {**normalize(raw, i), "id": f"q{i + 1}"}
+            for i, raw in enumerate(self._source()) if i % n == k
+        )
+        return itertools.islice(mine, self.limit)
+
+    def texts(self) -> Iterator[str]:
+        return (r["question"] for r in self)
+
+    def describe(self) -> str:
+        name = self.path.name if self.path else "built-in questions"
+        if self.shard[1] > 1:
+            name += f", shard {self.shard[0]}/{self.shard[1]}"
+        return name + (f", first {self.limit}" if self.limit else "")
+
+
+class Checkpoint:
+    """Append-only JSONL of finished measured questions, reloaded on resume."""
+
+    def __init__(self, path: Path) -> None:
+        self.path    = Path(path)
+        self.results = self._load() if self.path.exists() else []
+        self.done    = {(r.get("qid"), r.get("iteration")) for r in self.results}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f      = open(self.path, "a")
+
+    def _load(self) -> list[dict]:
+        """Finished results; a last line cut short by a crash is dropped from the file."""
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        results = []
+        for i, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                if i < len(lines) - 1:
+                    raise ValueError(f"checkpoint {self.path}: line {i + 1} is not JSON") from None
+                # partial write at the end: cut it off so the next record starts on a fresh line
+                print(f"  checkpoint {self.path}: dropped an incomplete last record")
+                with open(self.path, "r+b") as f:
+                    f.truncate(sum(len(x) for x in lines[:i]))
+                return results
+        if lines and not lines[-1].endswith(b"\n"):
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+        return results
+
+    def has(self, qid: str, iteration: int) -> bool:
+        return (qid, iteration) in self.done
+
+    def add(self, r: dict) -> None:
+        """Persist one result before the next question starts."""
+        self._f.write(json.dumps(r, default=str) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.done.add((r.get("qid"), r.get("iteration")))
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def as_workload(questions) -> Workload:
+    """A ``Workload`` as is; a plain list of question strings wrapped in one."""
+    return questions if isinstance(questions, Workload) else Workload(questions=list(questions))
+
+
+def limits(rec: dict) -> dict:
+    """Keyword arguments for ``Adapter.run`` from a record's limits."""
+    return {"max_iterations": rec["max_iterations"]} if rec.get("max_iterations") else {}